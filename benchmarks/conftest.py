@@ -0,0 +1,27 @@
+import platform
+from importlib.metadata import version, PackageNotFoundError
+import boto3
+import pytest
+
+PACKAGES = ["bedrock-snippet", "boto3", "botocore", "pydantic"]
+
+
+def pytest_benchmark_update_machine_info(config, machine_info):
+    # saved with every result file, so that runs can be compared across releases
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    machine_info["package_versions"] = versions
+    machine_info["python_implementation"] = platform.python_implementation()
+
+
+@pytest.fixture(scope="session")
+def session() -> boto3.Session:
+    return boto3.Session(
+        aws_access_key_id="dummy-access-key",
+        aws_secret_access_key="dummy-secret-key",
+        region_name="us-east-1",
+    )
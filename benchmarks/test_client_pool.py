@@ -0,0 +1,18 @@
+import pytest
+from bedrock_snippet.services.client_pool import ClientPool
+
+
+@pytest.mark.parametrize(
+    "service_name", ["bedrock", "bedrock-agent", "bedrock-runtime"]
+)
+def test_cold_client(benchmark, session, service_name):
+    benchmark(session.client, service_name)
+
+
+@pytest.mark.parametrize(
+    "service_name", ["bedrock", "bedrock-agent", "bedrock-runtime"]
+)
+def test_pooled_client(benchmark, session, service_name):
+    pool = ClientPool()
+    client = pool.client(session, service_name)
+    assert benchmark(pool.client, session, service_name) is client
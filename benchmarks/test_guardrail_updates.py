@@ -0,0 +1,69 @@
+import pytest
+from bedrock_snippet.services import (
+    ClientPool,
+    GuardrailManagementService,
+    ResolutionCache,
+)
+from tests.stubs import serve, unhandled_operation
+
+GUARDRAIL_ID = "abcdefgh1234"
+GUARDRAIL_ARN = f"arn:aws:bedrock:us-east-1:123456789012:guardrail/{GUARDRAIL_ID}"
+WORD_COUNT = 10_000
+
+
+def guardrail_handler(word_count: int):
+    guardrail = {
+        "name": "bench-guardrail",
+        "guardrailId": GUARDRAIL_ID,
+        "guardrailArn": GUARDRAIL_ARN,
+        "version": "DRAFT",
+        "blockedInputMessaging": "Blocked input.",
+        "blockedOutputsMessaging": "Blocked output.",
+        "wordPolicy": {"words": [{"text": f"word-{i}"} for i in range(word_count)]},
+    }
+
+    def handler(operation_name, params):
+        if operation_name == "ListGuardrails":
+            return {
+                "guardrails": [
+                    {
+                        "name": guardrail["name"],
+                        "id": GUARDRAIL_ID,
+                        "arn": GUARDRAIL_ARN,
+                    }
+                ]
+            }
+        elif operation_name == "GetGuardrail":
+            return guardrail
+        elif operation_name == "UpdateGuardrail":
+            # the word policy is kept, so that every round diffs against the same words
+            return {"guardrailId": GUARDRAIL_ID}
+        unhandled_operation(operation_name, params)
+
+    return handler
+
+
+@pytest.fixture(scope="module")
+def service(session):
+    client_pool = ClientPool()
+    serve(client_pool.client(session, "bedrock"), guardrail_handler(WORD_COUNT - 1))
+    return GuardrailManagementService(
+        "bench-guardrail",
+        session,
+        resolution_cache=ResolutionCache(),
+        client_pool=client_pool,
+    )
+
+
+def test_update_guardrail_words(benchmark, service):
+    words = [f"new-word-{i}" for i in range(WORD_COUNT)]
+    assert benchmark(service.update_guardrail, restricted_words=words)
+
+
+def test_add_word(benchmark, service):
+    assert benchmark(service.add_words, ["new-word"])
+
+
+def test_update_unchanged_words(benchmark, service):
+    words = [f"word-{i}" for i in range(WORD_COUNT - 1)]
+    assert not benchmark(service.update_guardrail, restricted_words=words)
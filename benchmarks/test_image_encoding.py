@@ -0,0 +1,54 @@
+import tracemalloc
+import pytest
+from base64 import b64encode
+from bedrock_snippet.models.prompt import (
+    AnthropicMessage,
+    AnthropicContentBlock,
+    AnthropicImageContent,
+)
+from bedrock_snippet.models.request import AnthropicModelRequestBody
+from bedrock_snippet.services.image_encoding import open_image, write_base64
+
+IMAGE_SIZE = 8 * 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def image_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("images") / "image.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * (IMAGE_SIZE // 256))
+    return path
+
+
+def encode_copying(image_path) -> bytes:
+    # previous path: read, encode, decode to str, wrap in models and serialize
+    with open(image_path, "rb") as file:
+        data = b64encode(file.read()).decode("utf8")
+    source = AnthropicImageContent(media_type="image/png", data=data)
+    message = AnthropicMessage(
+        role="user", content=[AnthropicContentBlock(type="image", source=source)]
+    )
+    return AnthropicModelRequestBody(messages=[message]).model_dump_json().encode()
+
+
+def encode_streaming(image_path) -> bytearray:
+    body = bytearray(b'{"messages":[{"role":"user","content":[{"type":"image","data":"')
+    with open_image(image_path) as image:
+        write_base64(image, body)
+    body += b'"}]}]}'
+    return body
+
+
+def peak_memory(function, *args) -> int:
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("encode", [encode_copying, encode_streaming])
+def test_encode_image(benchmark, image_path, encode):
+    benchmark.extra_info["peak_bytes"] = peak_memory(encode, image_path)
+    benchmark.extra_info["image_bytes"] = image_path.stat().st_size
+    benchmark(encode, image_path)
@@ -0,0 +1,54 @@
+import pytest
+from bedrock_snippet.services import (
+    ClientPool,
+    PromptInvocationService,
+    ResolutionCache,
+)
+from tests.stubs import (
+    serve,
+    prompt_agent_handler,
+    model_response,
+    unhandled_operation,
+)
+
+IMAGE_SIZE = 1024 * 1024
+
+
+def runtime_handler(operation_name, params):
+    if operation_name == "InvokeModel":
+        return model_response("Hello!")
+    unhandled_operation(operation_name, params)
+
+
+@pytest.fixture(scope="module")
+def service(session):
+    client_pool = ClientPool()
+    serve(client_pool.client(session, "bedrock-agent"), prompt_agent_handler("bench"))
+    serve(client_pool.client(session, "bedrock-runtime"), runtime_handler)
+    return PromptInvocationService(
+        "bench", session, resolution_cache=ResolutionCache(), client_pool=client_pool
+    )
+
+
+@pytest.fixture(scope="module")
+def image_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("images") / "image.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * (IMAGE_SIZE // 256))
+    return path
+
+
+def test_invoke_text(benchmark, service):
+    # request building, botocore serialization and response parsing; the call itself is stubbed
+    text = benchmark(service.invoke_text, {"name": "dummy.kim"}, True)
+    assert text == "Hello!"
+
+
+def test_invoke_rendered(benchmark, service):
+    text = benchmark(service.invoke_rendered, {"name": "dummy.kim"}, True)
+    assert text == "Hello!"
+
+
+def test_invoke_multimodal(benchmark, service, image_path):
+    benchmark.extra_info["image_bytes"] = IMAGE_SIZE
+    text = benchmark(service.invoke_multimodal, image_path, True)
+    assert text == "Hello!"
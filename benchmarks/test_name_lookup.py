@@ -0,0 +1,68 @@
+import pytest
+from bedrock_snippet.services import (
+    ClientPool,
+    PromptManagementService,
+    ResolutionCache,
+)
+from bedrock_snippet.services.resolution import find_summary, index_summaries
+from tests.stubs import serve
+
+PAGE_SIZE = 100
+
+
+def list_prompts_handler(prompt_count: int):
+    summaries = [
+        {
+            "name": f"prompt-{i}",
+            "id": f"{i:010d}",
+            "arn": f"arn:aws:bedrock:us-east-1:123456789012:prompt/{i:010d}",
+            "version": "DRAFT",
+            "createdAt": "2025-01-01T00:00:00Z",
+            "updatedAt": "2025-01-01T00:00:00Z",
+        }
+        for i in range(prompt_count)
+    ]
+
+    def handler(operation_name, params):
+        start = int(params.get("nextToken", 0))
+        page = {"promptSummaries": summaries[start : start + PAGE_SIZE]}
+        if start + PAGE_SIZE < prompt_count:
+            page["nextToken"] = str(start + PAGE_SIZE)
+        return page
+
+    return handler
+
+
+@pytest.fixture(scope="module")
+def client(session):
+    return serve(session.client("bedrock-agent"), list_prompts_handler(10_000))
+
+
+@pytest.mark.parametrize("position", [0, 5_000, 9_999])
+def test_find_prompt(benchmark, client, position):
+    summary = benchmark(find_summary, client, f"prompt-{position}")
+    assert summary.get("id") == f"{position:010d}"
+
+
+def test_index_prompts(benchmark, client):
+    index = benchmark(index_summaries, client)
+    assert len(index) == 10_000
+
+
+@pytest.mark.parametrize("prompt_count", [100, 1_000, 10_000])
+def test_get_prompt_id(benchmark, session, prompt_count):
+    # cold lookup of the last prompt, i.e. a resolution cache miss walking every page
+    client_pool = ClientPool()
+    serve(
+        client_pool.client(session, "bedrock-agent"),
+        list_prompts_handler(prompt_count),
+    )
+    cache = ResolutionCache()
+    service = PromptManagementService(
+        f"prompt-{prompt_count - 1}",
+        session,
+        resolution_cache=cache,
+        client_pool=client_pool,
+    )
+    prompt_id = benchmark.pedantic(service._get_prompt_id, setup=cache.clear, rounds=20)
+    assert prompt_id == f"{prompt_count - 1:010d}"
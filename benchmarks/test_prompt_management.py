@@ -0,0 +1,50 @@
+import pytest
+from bedrock_snippet.services import (
+    ClientPool,
+    PromptManagementService,
+    ResolutionCache,
+)
+from tests.stubs import serve, prompt_info, unhandled_operation
+
+PAGE_SIZE = 100
+
+
+def prompt_versions_handler(version_count: int):
+    info = prompt_info("bench-prompt")
+    summary = {k: info[k] for k in ("name", "id", "arn", "version", "updatedAt")}
+    versions = [{**summary, "version": str(v)} for v in range(1, version_count + 1)]
+
+    def handler(operation_name, params):
+        if operation_name == "ListPrompts":
+            if "promptIdentifier" not in params:
+                return {"promptSummaries": [summary]}
+            start = int(params.get("nextToken", 0))
+            page = {"promptSummaries": versions[start : start + PAGE_SIZE]}
+            if start + PAGE_SIZE < version_count:
+                page["nextToken"] = str(start + PAGE_SIZE)
+            return page
+        elif operation_name == "GetPrompt":
+            return {**info, "version": params.get("promptVersion", "DRAFT")}
+        elif operation_name == "ListTagsForResource":
+            return {"tags": {"version": params["resourceArn"].rsplit(":", 1)[-1]}}
+        unhandled_operation(operation_name, params)
+
+    return handler
+
+
+@pytest.mark.parametrize("version_count", [10, 100, 500])
+def test_list_available_prompt_versions(benchmark, session, version_count):
+    client_pool = ClientPool()
+    serve(
+        client_pool.client(session, "bedrock-agent"),
+        prompt_versions_handler(version_count),
+    )
+    service = PromptManagementService(
+        "bench-prompt",
+        session,
+        resolution_cache=ResolutionCache(),
+        client_pool=client_pool,
+    )
+    versions = benchmark(service.list_available_prompt_versions)
+    assert len(versions) == version_count + 1
+    assert versions[0]["version"] == "DRAFT"
@@ -0,0 +1,39 @@
+import re
+import pytest
+from bedrock_snippet.models.prompt import PromptVariant
+from bedrock_snippet.services.prompt_rendering import PromptRenderer, CompiledTemplate
+from tests.stubs import prompt_info
+
+USER_PROMPT = "Summarize the review of {{product}} written by {{name}}:\n{{review}}"
+VARIABLES = {"product": "keyboard", "name": "dummy.kim", "review": "Great! " * 200}
+
+
+@pytest.fixture(scope="module")
+def variant() -> PromptVariant:
+    variant = prompt_info("bench-prompt", user_prompt=USER_PROMPT)["variants"][0]
+    variant["templateConfiguration"]["chat"]["inputVariables"] = [
+        {"name": name} for name in VARIABLES
+    ]
+    return PromptVariant(**variant)
+
+
+def test_compile(benchmark, variant):
+    benchmark(PromptRenderer, variant)
+
+
+def test_render_compiled_template(benchmark):
+    template = CompiledTemplate(USER_PROMPT)
+    assert "dummy.kim" in benchmark(template.render, VARIABLES)
+
+
+def test_render_request_body(benchmark, variant):
+    renderer = PromptRenderer(variant)
+    body = benchmark(renderer.render, VARIABLES)
+    assert "dummy.kim" in body.messages[0].content[0].text
+
+
+def test_render_regex_substitution(benchmark):
+    # baseline: substituting variables with a regular expression on every render
+    pattern = re.compile(r"\{\{([0-9a-zA-Z_-]+)\}\}")
+    text = benchmark(pattern.sub, lambda m: VARIABLES[m.group(1)], USER_PROMPT)
+    assert "dummy.kim" in text
@@ -0,0 +1,56 @@
+import json
+import pytest
+from base64 import b64encode
+from bedrock_snippet.models.prompt import AnthropicMessage, AnthropicContentBlock
+from bedrock_snippet.models.request import (
+    AnthropicModelRequestBody,
+    AnthropicModelRequest,
+)
+from tests.stubs import MODEL_ID
+
+TEXT = "Summarize the review of keyboard written by dummy.kim:\n" + "Great! " * 200
+IMAGE = b64encode(b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4096).decode("utf8")
+GUARDRAIL = {"guardrailIdentifier": "abcdefgh1234", "guardrailVersion": "1"}
+BLOCKS = {
+    "text": {"type": "text", "text": TEXT},
+    "image": {
+        "type": "image",
+        "source": {"type": "base64", "media_type": "image/png", "data": IMAGE},
+    },
+}
+
+
+def model_path(block: dict) -> dict:
+    # previous path: nested models, the body dumped by the request validator, then the request dumped again
+    message = AnthropicMessage(role="user", content=[AnthropicContentBlock(**block)])
+    body = AnthropicModelRequestBody(
+        system="You are a helpful assistant.", messages=[message], temperature=0.0
+    )
+    request = AnthropicModelRequest(modelId=MODEL_ID, body=body, **GUARDRAIL)
+    return request.model_dump(exclude_none=True)
+
+
+def fast_path(block: dict) -> dict:
+    body = AnthropicModelRequestBody(
+        system="You are a helpful assistant.",
+        messages=[{"role": "user", "content": [block]}],
+        temperature=0.0,
+    )
+    return AnthropicModelRequest.serialize(MODEL_ID, body, **GUARDRAIL)
+
+
+@pytest.mark.parametrize("block", ["text", "image"])
+@pytest.mark.parametrize("path", [model_path, fast_path])
+def test_serialize_request(benchmark, path, block):
+    request = benchmark(path, BLOCKS[block])
+    assert json.loads(request["body"]) == json.loads(model_path(BLOCKS[block])["body"])
+    assert request["guardrailVersion"] == "1"
+
+
+@pytest.mark.parametrize("size", [1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024])
+@pytest.mark.parametrize("path", [model_path, fast_path])
+def test_serialize_payload_size(benchmark, path, size):
+    block = {"type": "text", "text": "Great! " * (size // 7)}
+    benchmark.extra_info["payload_bytes"] = len(block["text"])
+    request = benchmark(path, block)
+    assert len(request["body"]) > len(block["text"])
@@ -0,0 +1,55 @@
+import random
+import re
+import string
+import pytest
+from bedrock_snippet.services.word_filter import WordFilter
+
+WORD_COUNT = 10_000
+TEXT_SIZE = 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def words():
+    rng = random.Random(0)
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        for _ in range(WORD_COUNT)
+    ]
+
+
+@pytest.fixture(scope="module")
+def text():
+    # prose-like text without listed words, so that every scan covers the whole input
+    rng = random.Random(1)
+    pieces, size = [], 0
+    while size < TEXT_SIZE:
+        piece = "".join(rng.choices(string.ascii_letters, k=rng.randint(1, 3)))
+        pieces.append(piece)
+        size += len(piece) + 1
+    return " ".join(pieces)[:TEXT_SIZE]
+
+
+def record_throughput(benchmark, size: int):
+    # there are no stats when benchmarks are disabled, i.e. run once as plain tests
+    if benchmark.stats:
+        benchmark.extra_info["mb_per_second"] = size / 1e6 / benchmark.stats["mean"]
+
+
+def test_compile(benchmark, words):
+    assert len(benchmark(WordFilter, words)) == len(set(words))
+
+
+def test_scan(benchmark, words, text):
+    word_filter = WordFilter(words)
+    assert benchmark(word_filter.find, text) is None
+    record_throughput(benchmark, len(text))
+
+
+def test_scan_regex_alternation(benchmark, words, text):
+    # baseline: a single case-insensitive alternation of all words, on a slice as it backtracks at each position
+    pattern = re.compile(
+        r"\b(?:" + "|".join(map(re.escape, words)) + r")\b", re.IGNORECASE
+    )
+    text = text[: TEXT_SIZE // 64]
+    assert benchmark.pedantic(pattern.search, (text,), rounds=3) is None
+    record_throughput(benchmark, len(text))
@@ -2,7 +2,7 @@ import os
 import boto3
 import streamlit as st
 from dotenv import load_dotenv
-from bedrock_snippet.old_services.prompt_management import PromptManagementService
+from bedrock_snippet.services import PromptInvocationService
 
 
 @st.cache_resource
@@ -14,6 +14,12 @@ def start_session() -> boto3.Session:
     )
 
 
+# the service holds the prompt definition it loaded, so it is rebuilt to pick up DRAFT edits
+@st.cache_resource(ttl=300)
+def load_invocation_service(prompt_name: str) -> PromptInvocationService:
+    return PromptInvocationService(prompt_name, session)
+
+
 session = start_session()
 prompt_name = st.text_input("prompt name (REQUIRED)")
 system_prompt = st.text_area("system prompt (REQUIRED)", height=300)
@@ -27,8 +33,16 @@ with st.expander("Prompt Configuration", expanded=False):
         "max tokens", min_value=100, max_value=2000, value=2000
     )
     top_k = st.number_input("top K", min_value=1, max_value=1000, value=50)
+variables = {}
+if prompt_name:
+    service = load_invocation_service(prompt_name)
+    with st.expander("Prompt Variables", expanded=True):
+        for variable in service.required_variables:
+            variables[variable] = st.text_input(variable)
 col1, col2 = st.columns(2)
 with col1:
-    st.button("generate")
+    generate = st.button("generate")
 with col2:
     st.button("create snapshot", type="primary")
+if generate and prompt_name:
+    st.write_stream(service.stream_text(variables))
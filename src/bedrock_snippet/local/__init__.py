@@ -0,0 +1,3 @@
+from bedrock_snippet.local.server import LocalBedrock, LocalBedrockError
+
+__all__ = ["LocalBedrock", "LocalBedrockError"]
@@ -0,0 +1,36 @@
+import argparse
+from bedrock_snippet.local.server import LocalBedrock
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve local stand-ins of the Bedrock endpoints for offline load tests."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--response-chars", type=int, default=400)
+    parser.add_argument("--stream-interval", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    server = LocalBedrock(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        response_chars=args.response_chars,
+        stream_interval=args.stream_interval,
+        seed=args.seed,
+    )
+    print(f"Serving Bedrock stand-in at {server.endpoint_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
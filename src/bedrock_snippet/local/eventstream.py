@@ -0,0 +1,39 @@
+import struct
+import zlib
+from typing import Dict
+
+_STRING_HEADER = 7
+
+
+def encode_event(event_type: str, payload: bytes) -> bytes:
+    """
+    Single message of the `application/vnd.amazon.eventstream` encoding that botocore decodes for event stream
+    operations such as `invoke_model_with_response_stream`.
+    """
+    return encode_message(
+        {
+            ":event-type": event_type,
+            ":content-type": "application/json",
+            ":message-type": "event",
+        },
+        payload,
+    )
+
+
+def encode_message(headers: Dict[str, str], payload: bytes) -> bytes:
+    encoded_headers = b""
+    for name, value in headers.items():
+        name, value = name.encode("utf8"), value.encode("utf8")
+        encoded_headers += struct.pack(
+            f"!B{len(name)}sBH{len(value)}s",
+            len(name),
+            name,
+            _STRING_HEADER,
+            len(value),
+            value,
+        )
+    total_length = 12 + len(encoded_headers) + len(payload) + 4
+    prelude = struct.pack("!II", total_length, len(encoded_headers))
+    prelude += struct.pack("!I", zlib.crc32(prelude))
+    message = prelude + encoded_headers + payload
+    return message + struct.pack("!I", zlib.crc32(message))
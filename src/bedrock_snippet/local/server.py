@@ -0,0 +1,759 @@
+import base64
+import json
+import random
+import re
+import string
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List, Tuple, Callable
+from urllib.parse import urlsplit, parse_qsl, unquote
+from bedrock_snippet.local.eventstream import encode_event
+from bedrock_snippet.services.word_filter import WordFilter
+
+ACCOUNT_ID = "123456789012"
+FOUNDATION_MODELS = [
+    {
+        "modelId": "anthropic.claude-3-5-sonnet-20240620-v1:0",
+        "modelName": "Claude 3.5 Sonnet",
+        "providerName": "Anthropic",
+        "inputModalities": ["TEXT", "IMAGE"],
+        "outputModalities": ["TEXT"],
+        "responseStreamingSupported": True,
+    },
+    {
+        "modelId": "anthropic.claude-3-haiku-20240307-v1:0",
+        "modelName": "Claude 3 Haiku",
+        "providerName": "Anthropic",
+        "inputModalities": ["TEXT", "IMAGE"],
+        "outputModalities": ["TEXT"],
+        "responseStreamingSupported": True,
+    },
+]
+Response = Tuple[int, Dict[str, str], bytes]
+Rate = float | Dict[str, float]
+# operations taking the lock only around reads of shared state, so that invocations are served concurrently
+UNLOCKED_OPERATIONS = {
+    "InvokeModel",
+    "InvokeModelWithResponseStream",
+    "ListFoundationModels",
+}
+
+
+class LocalBedrockError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _json(payload: Dict[str, Any], status: int = 200) -> Response:
+    return status, {"Content-Type": "application/json"}, json.dumps(payload).encode()
+
+
+def _per_operation(value: Rate, operation_name: str) -> float:
+    if isinstance(value, dict):
+        return value.get(operation_name, value.get("*", 0.0))
+    return value
+
+
+def _paginate(
+    items: List[Dict[str, Any]], query: Dict[str, str], result_key: str, page_size: int
+) -> Dict[str, Any]:
+    start = int(query.get("nextToken", 0))
+    size = min(int(query.get("maxResults", page_size)), page_size)
+    page = {result_key: items[start : start + size]}
+    if start + size < len(items):
+        page["nextToken"] = str(start + size)
+    return page
+
+
+class LocalBedrock:
+    """
+    In-memory stand-in for the `bedrock`, `bedrock-agent` and `bedrock-runtime` endpoints, served over HTTP on
+    localhost so that unmodified boto3 clients can be pointed at it with `endpoint_url`, e.g. through
+    `ClientPool(endpoint_url=server.endpoint_url)`. Prompts, prompt versions, guardrails, guardrail versions,
+    tags and foundation model listing are kept in memory; `invoke_model` and its streaming variant answer with
+    generated text of `response_chars` characters, rendering prompt ARNs and applying guardrail word policies.
+
+    `latency`, `throttle_rate` and `error_rate` are either a number or a mapping of operation name (e.g.
+    "InvokeModel", "*" for any other) to a number. Each call sleeps `latency` seconds, then fails with a
+    ThrottlingException (HTTP 429) or ServiceUnavailableException (HTTP 503) with the given probabilities.
+    Streams are sent in chunks of `stream_chunk_chars` characters, `stream_interval` seconds apart. Random
+    draws are seeded with `seed`, so a run can be reproduced. Signatures are not checked. Management calls are
+    serialized, while invocations only hold the lock while reading prompts and guardrails.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Rate = 0.0,
+        throttle_rate: Rate = 0.0,
+        error_rate: Rate = 0.0,
+        response_chars: int = 400,
+        stream_chunk_chars: int = 20,
+        stream_interval: float = 0.0,
+        page_size: int = 100,
+        region_name: str = "us-east-1",
+        seed: Optional[int] = None,
+    ):
+        assert response_chars > 0, "Response chars must be greater than 0"
+        assert stream_chunk_chars > 0, "Stream chunk chars must be greater than 0"
+        assert page_size > 0, "Page size must be greater than 0"
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.response_chars = response_chars
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_interval = stream_interval
+        self.page_size = page_size
+        self.region_name = region_name
+        self.calls: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._prompts: Dict[str, Dict[str, Any]] = {}
+        self._guardrails: Dict[str, Dict[str, Any]] = {}
+        self._tags: Dict[str, Dict[str, str]] = {}
+        # (guardrail id, version, updatedAt) -> filter, so that filters built from replaced words never match
+        self._word_filters: Dict[Tuple[str, str, str], WordFilter] = {}
+        self._routes = self._build_routes()
+        self._server = ThreadingHTTPServer((host, port), _handler_class(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalBedrock":
+        assert self._thread is None, "Server is already started"
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="local-bedrock", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """
+        Serve on the calling thread until `stop` is called from another thread.
+        """
+        self._server.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def reset(self):
+        """
+        Forget every resource and call count.
+        """
+        with self._lock:
+            self._prompts.clear()
+            self._guardrails.clear()
+            self._tags.clear()
+            self._word_filters.clear()
+            self.calls.clear()
+
+    def __enter__(self) -> "LocalBedrock":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handle(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Response | Tuple[int, Dict[str, str], List[bytes]]:
+        url = urlsplit(target)
+        segments = [unquote(segment) for segment in url.path.split("/")[1:]]
+        query = dict(parse_qsl(url.query))
+        for route_method, pattern, operation_name, action in self._routes:
+            if route_method != method or not pattern.match(url.path):
+                continue
+            with self._lock:
+                self.calls[operation_name] = self.calls.get(operation_name, 0) + 1
+                throttled = self._random.random() < _per_operation(
+                    self.throttle_rate, operation_name
+                )
+                failed = self._random.random() < _per_operation(
+                    self.error_rate, operation_name
+                )
+            latency = _per_operation(self.latency, operation_name)
+            if latency > 0:
+                time.sleep(latency)
+            try:
+                if throttled:
+                    raise LocalBedrockError(429, "ThrottlingException", "Rate exceeded")
+                if failed:
+                    raise LocalBedrockError(
+                        503, "ServiceUnavailableException", "Service unavailable"
+                    )
+                payload = json.loads(body) if body else {}
+                if operation_name in UNLOCKED_OPERATIONS:
+                    return action(segments, query, headers, payload)
+                with self._lock:
+                    return action(segments, query, headers, payload)
+            except LocalBedrockError as e:
+                return self._error(e.status, e.code, str(e))
+        return self._error(404, "UnknownOperationException", f"{method} {url.path}")
+
+    def _build_routes(self) -> List[Tuple[str, re.Pattern, str, Callable]]:
+        routes = [
+            ("GET", r"/prompts/", "ListPrompts", self._list_prompts),
+            ("POST", r"/prompts/", "CreatePrompt", self._create_prompt),
+            ("GET", r"/prompts/[^/]+/", "GetPrompt", self._get_prompt),
+            ("PUT", r"/prompts/[^/]+/", "UpdatePrompt", self._update_prompt),
+            ("DELETE", r"/prompts/[^/]+/", "DeletePrompt", self._delete_prompt),
+            (
+                "POST",
+                r"/prompts/[^/]+/versions",
+                "CreatePromptVersion",
+                self._create_prompt_version,
+            ),
+            ("GET", r"/tags/[^/]+", "ListTagsForResource", self._list_prompt_tags),
+            ("GET", r"/guardrails", "ListGuardrails", self._list_guardrails),
+            ("POST", r"/guardrails", "CreateGuardrail", self._create_guardrail),
+            ("GET", r"/guardrails/[^/]+", "GetGuardrail", self._get_guardrail),
+            ("PUT", r"/guardrails/[^/]+", "UpdateGuardrail", self._update_guardrail),
+            (
+                "POST",
+                r"/guardrails/[^/]+",
+                "CreateGuardrailVersion",
+                self._create_guardrail_version,
+            ),
+            ("DELETE", r"/guardrails/[^/]+", "DeleteGuardrail", self._delete_guardrail),
+            (
+                "POST",
+                r"/listTagsForResource",
+                "ListTagsForResource",
+                self._list_guardrail_tags,
+            ),
+            (
+                "GET",
+                r"/foundation-models",
+                "ListFoundationModels",
+                self._list_foundation_models,
+            ),
+            ("POST", r"/model/[^/]+/invoke", "InvokeModel", self._invoke_model),
+            (
+                "POST",
+                r"/model/[^/]+/invoke-with-response-stream",
+                "InvokeModelWithResponseStream",
+                self._invoke_model_with_response_stream,
+            ),
+        ]
+        return [
+            (method, re.compile(f"^{path}$"), operation_name, action)
+            for method, path, operation_name, action in routes
+        ]
+
+    @staticmethod
+    def _error(status: int, code: str, message: str) -> Response:
+        return (
+            status,
+            {"Content-Type": "application/json", "x-amzn-ErrorType": code},
+            json.dumps({"message": message}).encode(),
+        )
+
+    def _new_id(self, alphabet: str, length: int) -> str:
+        return "".join(self._random.choice(alphabet) for _ in range(length))
+
+    def _arn(self, resource_type: str, resource_id: str) -> str:
+        return f"arn:aws:bedrock:{self.region_name}:{ACCOUNT_ID}:{resource_type}/{resource_id}"
+
+    @staticmethod
+    def _resource_id(identifier: str) -> Tuple[str, Optional[str]]:
+        """
+        Resource id and optional version of an id or (versioned) ARN.
+        """
+        if not identifier.startswith("arn:"):
+            return identifier, None
+        resource_id, _, version = identifier.rsplit("/", 1)[1].partition(":")
+        return resource_id, version or None
+
+    # bedrock-agent
+
+    def _prompt(self, identifier: str) -> Dict[str, Any]:
+        prompt = self._prompts.get(self._resource_id(identifier)[0])
+        if prompt is None:
+            raise LocalBedrockError(
+                404, "ResourceNotFoundException", f"Prompt {identifier} not found"
+            )
+        return prompt
+
+    def _prompt_version(self, identifier: str, version: Optional[str]):
+        prompt = self._prompt(identifier)
+        version = version or self._resource_id(identifier)[1] or "DRAFT"
+        info = prompt["versions"].get(version)
+        if info is None:
+            raise LocalBedrockError(
+                404, "ResourceNotFoundException", f"Prompt version {version} not found"
+            )
+        return info
+
+    def _list_prompts(self, segments, query, headers, payload) -> Response:
+        if "promptIdentifier" in query:
+            versions = self._prompt(query["promptIdentifier"])["versions"].values()
+        else:
+            versions = [
+                prompt["versions"]["DRAFT"] for prompt in self._prompts.values()
+            ]
+        summaries = [
+            {
+                key: info.get(key)
+                for key in (
+                    "name",
+                    "description",
+                    "id",
+                    "arn",
+                    "version",
+                    "createdAt",
+                    "updatedAt",
+                )
+                if info.get(key) is not None
+            }
+            for info in versions
+        ]
+        return _json(_paginate(summaries, query, "promptSummaries", self.page_size))
+
+    def _create_prompt(self, segments, query, headers, payload) -> Response:
+        if any(
+            p["versions"]["DRAFT"]["name"] == payload["name"]
+            for p in self._prompts.values()
+        ):
+            raise LocalBedrockError(
+                409, "ConflictException", f"Prompt {payload['name']} already exists"
+            )
+        prompt_id = self._new_id(string.ascii_uppercase + string.digits, 10)
+        now = _now()
+        info = {
+            **{k: v for k, v in payload.items() if k not in ("tags", "clientToken")},
+            "id": prompt_id,
+            "arn": self._arn("prompt", prompt_id),
+            "version": "DRAFT",
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        self._prompts[prompt_id] = {"versions": {"DRAFT": info}, "next_version": 1}
+        self._tags[info["arn"]] = dict(payload.get("tags") or {})
+        return _json(info, 201)
+
+    def _get_prompt(self, segments, query, headers, payload) -> Response:
+        return _json(self._prompt_version(segments[1], query.get("promptVersion")))
+
+    def _update_prompt(self, segments, query, headers, payload) -> Response:
+        draft = self._prompt(segments[1])["versions"]["DRAFT"]
+        for key in ("description", "variants", "defaultVariant"):
+            draft.pop(key, None)
+        draft.update(payload)
+        draft["updatedAt"] = _now()
+        return _json(draft)
+
+    def _delete_prompt(self, segments, query, headers, payload) -> Response:
+        prompt = self._prompt(segments[1])
+        version = query.get("promptVersion")
+        if version is None:
+            for info in prompt["versions"].values():
+                self._tags.pop(info["arn"], None)
+            del self._prompts[prompt["versions"]["DRAFT"]["id"]]
+        else:
+            info = self._prompt_version(segments[1], version)
+            del prompt["versions"][version]
+            self._tags.pop(info["arn"], None)
+        return _json({"id": segments[1], "version": version})
+
+    def _create_prompt_version(self, segments, query, headers, payload) -> Response:
+        prompt = self._prompt(segments[1])
+        version = str(prompt["next_version"])
+        prompt["next_version"] += 1
+        draft = prompt["versions"]["DRAFT"]
+        now = _now()
+        info = {
+            **json.loads(json.dumps(draft)),
+            "arn": f"{draft['arn']}:{version}",
+            "version": version,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        if payload.get("description") is not None:
+            info["description"] = payload["description"]
+        prompt["versions"][version] = info
+        self._tags[info["arn"]] = dict(payload.get("tags") or {})
+        return _json(info, 201)
+
+    def _list_prompt_tags(self, segments, query, headers, payload) -> Response:
+        return _json({"tags": self._tags.get(segments[1], {})})
+
+    # bedrock
+
+    def _guardrail(self, identifier: str) -> Dict[str, Any]:
+        guardrail = self._guardrails.get(self._resource_id(identifier)[0])
+        if guardrail is None:
+            raise LocalBedrockError(
+                404, "ResourceNotFoundException", f"Guardrail {identifier} not found"
+            )
+        return guardrail
+
+    def _guardrail_version(self, identifier: str, version: Optional[str]):
+        guardrail = self._guardrail(identifier)
+        version = version or self._resource_id(identifier)[1] or "DRAFT"
+        info = guardrail["versions"].get(version)
+        if info is None:
+            raise LocalBedrockError(
+                404,
+                "ResourceNotFoundException",
+                f"Guardrail version {version} not found",
+            )
+        return info
+
+    @staticmethod
+    def _word_policy(config: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if config is None:
+            return None
+        return {
+            "words": [{"text": w["text"]} for w in config.get("wordsConfig") or []],
+            "managedWordLists": [
+                {"type": w["type"]} for w in config.get("managedWordListsConfig") or []
+            ],
+        }
+
+    def _list_guardrails(self, segments, query, headers, payload) -> Response:
+        if "guardrailIdentifier" in query:
+            versions = self._guardrail(query["guardrailIdentifier"])[
+                "versions"
+            ].values()
+        else:
+            versions = [g["versions"]["DRAFT"] for g in self._guardrails.values()]
+        summaries = [
+            {
+                "id": info["guardrailId"],
+                "arn": info["guardrailArn"],
+                "status": info["status"],
+                "name": info["name"],
+                "description": info.get("description"),
+                "version": info["version"],
+                "createdAt": info["createdAt"],
+                "updatedAt": info["updatedAt"],
+            }
+            for info in versions
+        ]
+        return _json(_paginate(summaries, query, "guardrails", self.page_size))
+
+    def _create_guardrail(self, segments, query, headers, payload) -> Response:
+        if any(
+            g["versions"]["DRAFT"]["name"] == payload["name"]
+            for g in self._guardrails.values()
+        ):
+            raise LocalBedrockError(
+                409, "ConflictException", f"Guardrail {payload['name']} already exists"
+            )
+        guardrail_id = self._new_id(string.ascii_lowercase + string.digits, 12)
+        now = _now()
+        info = {
+            "name": payload["name"],
+            "guardrailId": guardrail_id,
+            "guardrailArn": self._arn("guardrail", guardrail_id),
+            "version": "DRAFT",
+            "status": "READY",
+            "description": payload.get("description"),
+            "blockedInputMessaging": payload["blockedInputMessaging"],
+            "blockedOutputsMessaging": payload["blockedOutputsMessaging"],
+            "wordPolicy": self._word_policy(payload.get("wordPolicyConfig")),
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        self._guardrails[guardrail_id] = {
+            "versions": {"DRAFT": info},
+            "next_version": 1,
+        }
+        self._tags[info["guardrailArn"]] = {
+            tag["key"]: tag["value"] for tag in payload.get("tags") or []
+        }
+        return _json(
+            {
+                "guardrailId": guardrail_id,
+                "guardrailArn": info["guardrailArn"],
+                "version": "DRAFT",
+                "createdAt": now,
+            },
+            202,
+        )
+
+    def _get_guardrail(self, segments, query, headers, payload) -> Response:
+        info = self._guardrail_version(segments[1], query.get("guardrailVersion"))
+        return _json({k: v for k, v in info.items() if v is not None})
+
+    def _update_guardrail(self, segments, query, headers, payload) -> Response:
+        draft = self._guardrail(segments[1])["versions"]["DRAFT"]
+        draft.update(
+            name=payload["name"],
+            description=payload.get("description"),
+            blockedInputMessaging=payload["blockedInputMessaging"],
+            blockedOutputsMessaging=payload["blockedOutputsMessaging"],
+            wordPolicy=self._word_policy(payload.get("wordPolicyConfig")),
+            updatedAt=_now(),
+        )
+        for key in list(self._word_filters):
+            if key[:2] == (draft["guardrailId"], "DRAFT"):
+                del self._word_filters[key]
+        return _json(
+            {
+                "guardrailId": draft["guardrailId"],
+                "guardrailArn": draft["guardrailArn"],
+                "version": "DRAFT",
+                "updatedAt": draft["updatedAt"],
+            },
+            202,
+        )
+
+    def _create_guardrail_version(self, segments, query, headers, payload) -> Response:
+        guardrail = self._guardrail(segments[1])
+        version = str(guardrail["next_version"])
+        guardrail["next_version"] += 1
+        draft = guardrail["versions"]["DRAFT"]
+        now = _now()
+        guardrail["versions"][version] = {
+            **json.loads(json.dumps(draft)),
+            "version": version,
+            "description": payload.get("description", draft.get("description")),
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        return _json({"guardrailId": draft["guardrailId"], "version": version}, 202)
+
+    def _delete_guardrail(self, segments, query, headers, payload) -> Response:
+        guardrail = self._guardrail(segments[1])
+        version = query.get("guardrailVersion")
+        draft = guardrail["versions"]["DRAFT"]
+        if version is None:
+            del self._guardrails[draft["guardrailId"]]
+            self._tags.pop(draft["guardrailArn"], None)
+        else:
+            self._guardrail_version(segments[1], version)
+            del guardrail["versions"][version]
+        return _json({}, 202)
+
+    def _list_guardrail_tags(self, segments, query, headers, payload) -> Response:
+        tags = self._tags.get(payload.get("resourceARN"), {})
+        return _json({"tags": [{"key": k, "value": v} for k, v in tags.items()]})
+
+    def _list_foundation_models(self, segments, query, headers, payload) -> Response:
+        return _json({"modelSummaries": FOUNDATION_MODELS})
+
+    # bedrock-runtime
+
+    def _complete(
+        self, model_id: str, headers: Dict[str, str], payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Anthropic messages response for a request body, rendering the prompt first if `model_id` is a prompt ARN.
+        """
+        texts = self._request_texts(model_id, payload)
+        input_tokens = sum(len(text) for text in texts) // 4 + 1
+        guardrail_identifier = headers.get("x-amzn-bedrock-guardrailidentifier")
+        with self._lock:
+            message_id = self._new_id(string.ascii_letters + string.digits, 24)
+        result = {
+            "id": f"msg_{message_id}",
+            "type": "message",
+            "role": "assistant",
+            "model": model_id,
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+        }
+        if guardrail_identifier is not None:
+            words, blocked_messaging = self._guardrail_filter(
+                guardrail_identifier,
+                headers.get("x-amzn-bedrock-guardrailversion", "DRAFT"),
+            )
+            if any(words.find(text) is not None for text in texts):
+                return {
+                    **result,
+                    "content": [{"type": "text", "text": blocked_messaging}],
+                    "usage": {"input_tokens": 0, "output_tokens": 0},
+                    "amazon-bedrock-guardrailAction": "INTERVENED",
+                }
+        max_chars = payload.get("max_tokens", self.response_chars) * 4
+        text = ("lorem ipsum " * (self.response_chars // 12 + 1))[
+            : min(self.response_chars, max_chars)
+        ]
+        result = {
+            **result,
+            "content": [{"type": "text", "text": text}],
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": len(text) // 4 + 1,
+            },
+        }
+        if guardrail_identifier is not None:
+            result["amazon-bedrock-guardrailAction"] = "NONE"
+        return result
+
+    def _guardrail_filter(
+        self, identifier: str, version: str
+    ) -> Tuple[WordFilter, str]:
+        """
+        Word filter and blocked input message of a guardrail version. Filters are compiled outside the lock.
+        """
+        with self._lock:
+            info = self._guardrail_version(identifier, version)
+            key = (info["guardrailId"], info["version"], info["updatedAt"])
+            words = self._word_filters.get(key)
+            blocked_messaging = info["blockedInputMessaging"]
+            if words is None:
+                word_texts = [
+                    word["text"]
+                    for word in (info.get("wordPolicy") or {}).get("words", [])
+                ]
+        if words is None:
+            words = WordFilter(word_texts)
+            with self._lock:
+                words = self._word_filters.setdefault(key, words)
+        return words, blocked_messaging
+
+    def _request_texts(self, model_id: str, payload: Dict[str, Any]) -> List[str]:
+        if not model_id.startswith("arn:") or ":prompt/" not in model_id:
+            texts = [payload.get("system") or ""]
+            for message in payload.get("messages", []):
+                content = message.get("content")
+                if isinstance(content, str):
+                    texts.append(content)
+                else:
+                    texts.extend(block.get("text", "") for block in content)
+            return texts
+        with self._lock:
+            info = self._prompt_version(model_id, None)
+            chat = info["variants"][0]["templateConfiguration"]["chat"]
+            templates = [block["text"] for block in chat.get("system", [])]
+            for message in chat["messages"]:
+                templates.extend(block["text"] for block in message["content"])
+        variables = {
+            name: value.get("text")
+            for name, value in payload.get("promptVariables", {}).items()
+        }
+        return [
+            re.sub(
+                r"{{\s*(\w+)\s*}}",
+                lambda m: variables.get(m.group(1), m.group(0)),
+                template,
+            )
+            for template in templates
+        ] + list(variables.values())
+
+    def _invoke_model(self, segments, query, headers, payload) -> Response:
+        result = self._complete(segments[1], headers, payload)
+        return _json(result)
+
+    def _invoke_model_with_response_stream(
+        self, segments, query, headers, payload
+    ) -> Tuple[int, Dict[str, str], List[bytes]]:
+        result = self._complete(segments[1], headers, payload)
+        text = result["content"][0]["text"]
+        events = [
+            {
+                "type": "message_start",
+                "message": {
+                    **{
+                        k: v for k, v in result.items() if k not in ("content", "usage")
+                    },
+                    "content": [],
+                    "usage": {"input_tokens": result["usage"]["input_tokens"]},
+                },
+            },
+            {
+                "type": "content_block_start",
+                "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            },
+            *(
+                {
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {
+                        "type": "text_delta",
+                        "text": text[i : i + self.stream_chunk_chars],
+                    },
+                }
+                for i in range(0, len(text), self.stream_chunk_chars)
+            ),
+            {"type": "content_block_stop", "index": 0},
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": result["usage"]["output_tokens"]},
+            },
+            {
+                "type": "message_stop",
+                "amazon-bedrock-invocationMetrics": {
+                    "inputTokenCount": result["usage"]["input_tokens"],
+                    "outputTokenCount": result["usage"]["output_tokens"],
+                },
+            },
+        ]
+        guardrail_action = result.get("amazon-bedrock-guardrailAction")
+        if guardrail_action is not None:
+            events[-1]["amazon-bedrock-guardrailAction"] = guardrail_action
+        messages = [
+            encode_event(
+                "chunk",
+                json.dumps(
+                    {"bytes": base64.b64encode(json.dumps(e).encode()).decode()}
+                ).encode(),
+            )
+            for e in events
+        ]
+        return (
+            200,
+            {
+                "Content-Type": "application/vnd.amazon.eventstream",
+                "X-Amzn-Bedrock-Content-Type": "application/json",
+            },
+            messages,
+        )
+
+
+def _handler_class(server: LocalBedrock):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _dispatch(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            headers = {k.lower(): v for k, v in self.headers.items()}
+            status, response_headers, payload = server.handle(
+                self.command, self.path, headers, body
+            )
+            self.send_response(status)
+            for key, value in response_headers.items():
+                self.send_header(key, value)
+            if isinstance(payload, bytes):
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            # event streams are sent chunk by chunk, like a model generating tokens
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for index, message in enumerate(payload):
+                if index and server.stream_interval > 0:
+                    time.sleep(server.stream_interval)
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(message), message))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+        do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -2,6 +2,16 @@ from bedrock_snippet.models.guardrail.configuration import (
     GuardrailWordPolicyConfig,
     GuardrailWordConfig,
     Tag,
+    RestrictedWords,
+    validate_restricted_words,
+    word_policy_config,
 )
 
-__all__ = ["GuardrailWordPolicyConfig", "GuardrailWordConfig", "Tag"]
+__all__ = [
+    "GuardrailWordPolicyConfig",
+    "GuardrailWordConfig",
+    "Tag",
+    "RestrictedWords",
+    "validate_restricted_words",
+    "word_policy_config",
+]
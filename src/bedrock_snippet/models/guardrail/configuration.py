@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Annotated, List
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Optional, Annotated, List, Iterable, Dict, Any
 
 
 class Tag(BaseModel):
@@ -39,3 +39,27 @@ class GuardrailWordPolicyConfig(BaseModel):
             ),
         ]
     ] = None
+
+
+RestrictedWords = Annotated[
+    List[Annotated[str, Field(min_length=1, max_length=100)]],
+    Field(min_length=1, max_length=10000),
+]
+_restricted_words_adapter = TypeAdapter(RestrictedWords)
+
+
+def validate_restricted_words(words: Iterable[str]) -> List[str]:
+    """
+    Validate a whole word list against the constraints of GuardrailWordConfig and GuardrailWordPolicyConfig in
+    a single pydantic-core pass, without building a model per word.
+    """
+    return _restricted_words_adapter.validate_python(
+        words if isinstance(words, list) else list(words)
+    )
+
+
+def word_policy_config(words: List[str]) -> Dict[str, Any]:
+    """
+    `wordPolicyConfig` request parameter of already validated words.
+    """
+    return {"wordsConfig": [{"text": word} for word in words]}
@@ -24,7 +24,7 @@ class Message(BaseModel):
 
 class AnthropicImageContent(BaseModel):
     type: str = "base64"
-    media_type: str = Field(..., pattern="^image/(jpg|png|webp|gif)$")
+    media_type: str = Field(..., pattern="^image/(jpe?g|png|webp|gif)$")
     data: str = Field(..., description="The base64 encoded image.")
 
 
@@ -1,56 +1,56 @@
-from typing import List, Annotated, Optional, Self
-from pydantic import BaseModel, Field, model_validator
+from typing import List, Annotated, Optional, Self, Dict, Any, Tuple, Type
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 from bedrock_snippet.models.prompt.content import AnthropicMessage
 
 
 class AnthropicModelRequestBody(BaseModel):
-    # system: Optional[str] = Field(
-    #     default=None,
-    #     description="The text in the system prompt.",
-    # )
-    messages: List[AnthropicMessage] = (
-        Field(..., description="Contains messages in the chat for the prompt."),
+    system: Optional[str] = Field(
+        default=None,
+        description="The text in the system prompt.",
+    )
+    messages: List[AnthropicMessage] = Field(
+        ..., description="Contains messages in the chat for the prompt."
+    )
+    max_tokens: Annotated[
+        int,
+        Field(
+            default=2000,
+            ge=0,
+            le=4096,
+            description="The maximum number of tokens to return in the response.",
+        ),
+    ]
+    stop_sequences: Annotated[
+        List[str],
+        Field(
+            default_factory=list,
+            min_length=0,
+            max_length=4,
+            description="A list of strings that define sequences after which the model will stop generating.",
+        ),
+    ]
+    temperature: Annotated[
+        float,
+        Field(
+            default=1.0,
+            ge=0.0,
+            le=1.0,
+            description="Choose a lower value for more predictable outputs and a higher value for more random outputs.",
+        ),
+    ]
+    top_p: Annotated[
+        float,
+        Field(
+            default=1.0,
+            ge=0.0,
+            le=1.0,
+            description="The percentage of most-likely candidates that the model considers for the next token.",
+        ),
+    ]
+    top_k: Optional[Annotated[int, Field(ge=1, le=500)]] = Field(
+        default=None,
+        description="Determines how many of the most likely tokens should be considered when generating a response.",
     )
-    # max_tokens: Annotated[
-    #     int,
-    #     Field(
-    #         default=2000,
-    #         ge=0,
-    #         le=4096,
-    #         description="The maximum number of tokens to return in the response.",
-    #     ),
-    # ]
-    # stop_sequences: Annotated[
-    #     List[str],
-    #     Field(
-    #         default_factory=list,
-    #         min_length=0,
-    #         max_length=4,
-    #         description="A list of strings that define sequences after which the model will stop generating.",
-    #     ),
-    # ]
-    # temperature: Annotated[
-    #     float,
-    #     Field(
-    #         default=1.0,
-    #         ge=0.0,
-    #         le=1.0,
-    #         description="Choose a lower value for more predictable outputs and a higher value for more random outputs.",
-    #     ),
-    # ]
-    # top_p: Annotated[
-    #     float,
-    #     Field(
-    #         default=1.0,
-    #         ge=0.0,
-    #         le=1.0,
-    #         description="The percentage of most-likely candidates that the model considers for the next token.",
-    #     ),
-    # ]
-    # top_k: Annotated[int, Field(ge=1, le=500)] = Field(
-    #     default=100,
-    #     description="Determines how many of the most likely tokens should be considered when generating a response.",
-    # )
     anthropic_version: str = Field(
         default="bedrock-2023-05-31", description="Anthropic version"
     )
@@ -96,6 +96,48 @@ class AnthropicModelRequest(BaseModel):
         ]
     ] = None
 
+    @classmethod
+    def fast_params(
+        cls,
+        modelId: str,
+        guardrailIdentifier: Optional[str] = None,
+        guardrailVersion: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Request parameters without body for a trusted `modelId` (e.g. taken from a validated prompt variant),
+        validating only the guardrail fields.
+        """
+        params = {
+            "modelId": modelId,
+            "accept": "application/json",
+            "contentType": "application/json",
+        }
+        if guardrailIdentifier is not None:
+            params.update(
+                validate_fields(
+                    cls,
+                    guardrailIdentifier=guardrailIdentifier,
+                    guardrailVersion=guardrailVersion,
+                )
+            )
+        return params
+
+    @classmethod
+    def serialize(
+        cls,
+        modelId: str,
+        body: AnthropicModelRequestBody,
+        guardrailIdentifier: Optional[str] = None,
+        guardrailVersion: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fast path of `AnthropicModelRequest(...).model_dump(exclude_none=True)` for trusted internal data: the
+        body is serialized once, straight to bytes, and is not validated again.
+        """
+        params = cls.fast_params(modelId, guardrailIdentifier, guardrailVersion)
+        params["body"] = _body_adapter.dump_json(body, exclude_none=True)
+        return params
+
     @model_validator(mode="after")
     def encode_body(self) -> Self:
         assert isinstance(
@@ -103,3 +145,30 @@ class AnthropicModelRequest(BaseModel):
         ), "Pass raw AnthropicModelRequestBody instance without json encode"
         self.body = self.body.model_dump_json(exclude_none=True)
         return self
+
+
+_body_adapter = TypeAdapter(AnthropicModelRequestBody)
+_field_adapters: Dict[Tuple[Type[BaseModel], str], TypeAdapter] = {}
+
+
+def validate_fields(model: Type[BaseModel], **values) -> Dict[str, Any]:
+    """
+    Validate some fields of `model` on their own, with a cached TypeAdapter per field, instead of constructing
+    and validating a whole model instance.
+    """
+    validated = {}
+    for name, value in values.items():
+        adapter = _field_adapters.get((model, name))
+        if adapter is None:
+            if name not in model.model_fields:
+                raise ValueError(f"{model.__name__} has no field '{name}'")
+            field = model.model_fields[name]
+            annotation = (
+                Annotated[field.annotation, *field.metadata]
+                if field.metadata
+                else field.annotation
+            )
+            adapter = TypeAdapter(annotation)
+            _field_adapters[(model, name)] = adapter
+        validated[name] = adapter.validate_python(value)
+    return validated
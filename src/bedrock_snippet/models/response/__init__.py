@@ -0,0 +1,4 @@
+from bedrock_snippet.models.response.invocation import InvocationBatchResult
+from bedrock_snippet.models.response.word_import import RejectedWord, WordImportReport
+
+__all__ = ["InvocationBatchResult", "RejectedWord", "WordImportReport"]
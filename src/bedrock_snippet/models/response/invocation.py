@@ -0,0 +1,21 @@
+from typing import Any, Dict, List
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class InvocationBatchResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    results: List[Any] = Field(
+        ...,
+        description="Result of each input in input order. None if the input failed.",
+    )
+    errors: Dict[int, Exception] = Field(
+        default_factory=dict,
+        description="Exception raised for each failed input index.",
+    )
+    elapsed_seconds: float = Field(..., description="Wall clock time of the batch.")
+    throughput: float = Field(..., description="Completed invocations per second.")
+    latency_percentiles: Dict[str, float] = Field(
+        default_factory=dict,
+        description="p50, p90, p99 and max latency of single invocations in seconds.",
+    )
@@ -0,0 +1,28 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class RejectedWord(BaseModel):
+    line: int = Field(..., description="1-based line number of the word in the source.")
+    text: str = Field(..., description="The word after normalization.")
+    reason: str = Field(
+        ...,
+        pattern=r"^(too_long|limit_exceeded)$",
+        description="Why the word was not imported.",
+    )
+
+
+class WordImportReport(BaseModel):
+    words: List[str] = Field(
+        ..., description="Normalized and de-duplicated words in source order."
+    )
+    duplicates: int = Field(
+        default=0, description="Number of words skipped as case-insensitive duplicates."
+    )
+    rejected_count: int = Field(
+        default=0, description="Number of words rejected for exceeding a limit."
+    )
+    rejects: List[RejectedWord] = Field(
+        default_factory=list,
+        description="Rejected words, truncated to the first ones reported by the importer.",
+    )
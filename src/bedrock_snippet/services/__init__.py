@@ -1,9 +1,58 @@
 from bedrock_snippet.services.prompt_management import PromptManagementService
 from bedrock_snippet.services.invoke_prompt import PromptInvocationService
+from bedrock_snippet.services.async_invoke_prompt import AsyncPromptInvocationService
 from bedrock_snippet.services.guardrail_management import GuardrailManagementService
+from bedrock_snippet.services.response_stream import InvocationStream
+from bedrock_snippet.services.prompt_rendering import PromptRenderer
+from bedrock_snippet.services.conversation import Conversation
+from bedrock_snippet.services.word_filter import WordFilter, GuardrailWordFilter
+from bedrock_snippet.services.word_import import read_restricted_words
+from bedrock_snippet.services.rate_limit import RateLimiter
+from bedrock_snippet.services.token_accounting import (
+    TokenBudget,
+    TokenBudgetExceeded,
+    TokenAccountant,
+)
+from bedrock_snippet.services.client_pool import ClientPool
+from bedrock_snippet.services.routing import InvocationRouter
+from bedrock_snippet.services.instrumentation import (
+    Instrumentation,
+    CallRecord,
+    OpenTelemetryExporter,
+)
+from bedrock_snippet.services.snapshot_store import PromptSnapshotStore
+from bedrock_snippet.services.response_cache import (
+    MemoryResponseCache,
+    SqliteResponseCache,
+)
+from bedrock_snippet.services.resolution import (
+    ResolutionCache,
+    warm_resolution_cache,
+)
 
 __all__ = [
     "PromptManagementService",
     "PromptInvocationService",
+    "AsyncPromptInvocationService",
     "GuardrailManagementService",
+    "InvocationStream",
+    "PromptRenderer",
+    "Conversation",
+    "WordFilter",
+    "GuardrailWordFilter",
+    "read_restricted_words",
+    "RateLimiter",
+    "TokenBudget",
+    "TokenBudgetExceeded",
+    "TokenAccountant",
+    "ClientPool",
+    "InvocationRouter",
+    "Instrumentation",
+    "CallRecord",
+    "OpenTelemetryExporter",
+    "PromptSnapshotStore",
+    "MemoryResponseCache",
+    "SqliteResponseCache",
+    "ResolutionCache",
+    "warm_resolution_cache",
 ]
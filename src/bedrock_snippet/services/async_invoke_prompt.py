@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import pathlib
+
+import boto3
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Iterable, List
+from bedrock_snippet.services.invoke_prompt import PromptInvocationService
+from bedrock_snippet.services.rate_limit import RateLimiter
+from bedrock_snippet.services.instrumentation import Instrumentation
+
+
+class AsyncPromptInvocationService:
+    """
+    asyncio front of PromptInvocationService. Blocking botocore calls are offloaded to a thread pool owned by
+    this service, so coroutines awaiting an invocation never block the event loop. Requests are built with the
+    same models (AnthropicModelRequest, AnthropicModelRequestBody) as the synchronous service.
+    """
+
+    def __init__(self, service: PromptInvocationService, max_workers: int = 64):
+        assert max_workers > 0, "Max workers must be greater than 0"
+        self._service = service
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bedrock-invoke"
+        )
+
+    @classmethod
+    async def create(
+        cls,
+        prompt_name: str,
+        session: boto3.Session,
+        version: Optional[int] = None,
+        max_workers: int = 64,
+        rate_limiter: Optional[RateLimiter] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ) -> "AsyncPromptInvocationService":
+        """
+        Build the underlying service off the event loop, sizing its connection pool to `max_workers`
+        so that every worker thread can keep a request in flight.
+        """
+        loop = asyncio.get_running_loop()
+        service = await loop.run_in_executor(
+            None,
+            functools.partial(
+                PromptInvocationService,
+                prompt_name,
+                session,
+                version,
+                client_config=Config(max_pool_connections=max_workers),
+                rate_limiter=rate_limiter,
+                instrumentation=instrumentation,
+            ),
+        )
+        return cls(service, max_workers)
+
+    async def invoke_multimodal(
+        self,
+        image_path: pathlib.Path,
+        return_result_only: bool = False,
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+    ):
+        return await self._run(
+            self._service.invoke_multimodal,
+            image_path,
+            return_result_only=return_result_only,
+            guardrail_identifier=guardrail_identifier,
+            guardrail_version=guardrail_version,
+        )
+
+    async def invoke_text(
+        self,
+        prompt_variables: Dict[str, str],
+        return_result_only: bool = False,
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+    ):
+        return await self._run(
+            self._service.invoke_text,
+            prompt_variables,
+            return_result_only=return_result_only,
+            guardrail_identifier=guardrail_identifier,
+            guardrail_version=guardrail_version,
+        )
+
+    async def invoke_text_many(
+        self,
+        inputs: Iterable[Dict[str, str]],
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> List:
+        """
+        Invoke every set of prompt variables concurrently and return results in input order.
+        Keyword arguments are passed to `invoke_text`.
+        """
+        return await asyncio.gather(
+            *(self.invoke_text(variables, **kwargs) for variables in inputs),
+            return_exceptions=return_exceptions,
+        )
+
+    async def invoke_multimodal_many(
+        self,
+        image_paths: Iterable[pathlib.Path],
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> List:
+        return await asyncio.gather(
+            *(self.invoke_multimodal(path, **kwargs) for path in image_paths),
+            return_exceptions=return_exceptions,
+        )
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncPromptInvocationService":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(method, *args, **kwargs)
+        )
@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Hashable
+import boto3
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
+
+
+class ClientPool:
+    """
+    Process-wide registry of boto3 clients. Creating a client takes tens of milliseconds and every client owns
+    its own connection pool, so services asking for the same session, credentials, region, service and
+    configuration share one client. boto3 clients are thread-safe once created; creation itself is serialized
+    here. Clients are never shared across sessions, so event hooks registered on a session apply to every client
+    the pool returns for it. A session's clients are dropped once the session is garbage collected, and beyond
+    `max_clients` the least recently used client is evicted.
+    With `endpoint_url`, every client of the pool sends its requests there instead of the AWS endpoints, e.g. to
+    a `bedrock_snippet.local.LocalBedrock` server.
+    """
+
+    def __init__(
+        self,
+        max_pool_connections: int = 50,
+        connect_timeout: float = 10,
+        read_timeout: float = 60,
+        tcp_keepalive: bool = True,
+        endpoint_url: Optional[str] = None,
+        max_clients: int = 256,
+    ):
+        assert max_clients > 0, "Max clients must be greater than 0"
+        self._default_config = Config(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            tcp_keepalive=tcp_keepalive,
+        )
+        self._endpoint_url = endpoint_url
+        self._max_clients = max_clients
+        self._clients: OrderedDict[Hashable, Tuple[Any, Any]] = OrderedDict()
+        # id(session) -> finalizer dropping the session's clients
+        self._sessions: Dict[int, weakref.finalize] = {}
+        # reentrant, as a finalizer may run on garbage collection while the lock is held
+        self._lock = threading.RLock()
+
+    def client(
+        self,
+        session: boto3.Session,
+        service_name: str,
+        config: Optional[Config] = None,
+        region_name: Optional[str] = None,
+    ):
+        """
+        Return the session's shared client for its credentials and region, or `region_name` if given. `config`
+        is merged over the pool defaults, so e.g. a larger `max_pool_connections` yields a separate client.
+        """
+        config = (
+            self._default_config.merge(config)
+            if config is not None
+            else self._default_config
+        )
+        credentials = session.get_credentials()
+        region_name = region_name if region_name is not None else session.region_name
+        key = (
+            id(session),
+            self._credentials_key(credentials),
+            region_name,
+            service_name,
+            self._config_key(config),
+        )
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients.move_to_end(key)
+                return entry[0]
+            if id(session) not in self._sessions:
+                self._sessions[id(session)] = weakref.finalize(
+                    session, self._forget_session, id(session)
+                )
+            # keep credentials referenced so that id() based keys are never reused
+            entry = self._clients[key] = (
+                session.client(
+                    service_name,
+                    region_name=region_name,
+                    config=config,
+                    endpoint_url=self._endpoint_url,
+                ),
+                credentials,
+            )
+            while len(self._clients) > self._max_clients:
+                self._clients.popitem(last=False)
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            for finalizer in self._sessions.values():
+                finalizer.detach()
+            self._sessions.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def _forget_session(self, session_id: int):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            for key in [key for key in self._clients if key[0] == session_id]:
+                del self._clients[key]
+
+    @staticmethod
+    def _credentials_key(credentials) -> Hashable:
+        if credentials is None:
+            return None
+        elif isinstance(credentials, RefreshableCredentials):
+            # keys rotate on refresh, the credentials object itself is stable
+            return "refreshable", id(credentials)
+        secret = hashlib.sha256(
+            (credentials.secret_key or "").encode("utf8")
+        ).hexdigest()
+        return credentials.access_key, secret, credentials.token
+
+    @staticmethod
+    def _config_key(config: Config) -> Hashable:
+        return tuple(
+            (name, repr(getattr(config, name, None)))
+            for name in sorted(Config.OPTION_DEFAULTS)
+        )
+
+
+default_client_pool = ClientPool()
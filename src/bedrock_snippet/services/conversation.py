@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from typing import List, Optional, Iterable
+from bedrock_snippet.models.prompt import AnthropicMessage
+from bedrock_snippet.models.request import AnthropicModelRequestBody
+from bedrock_snippet.services.image_encoding import (
+    ImageSource,
+    open_image,
+    guess_media_type,
+    peek,
+)
+from bedrock_snippet.services.request_body import write_text_block, write_image_block
+from bedrock_snippet.services.token_accounting import (
+    IMAGE_TOKENS,
+    IMAGE_HEADER_SIZE,
+    estimate_text_tokens,
+    estimate_image_tokens,
+)
+
+
+@dataclass
+class _Turn:
+    role: str
+    serialized: bytearray
+    tokens: int
+    texts: List[str]
+
+
+class Conversation:
+    """
+    Multi-turn Anthropic conversation holding every message as serialized JSON. A message is serialized once
+    when added, so building the body of the next request only joins bytes, however long the history or many
+    its images. With `max_history_tokens`, the oldest turns are dropped when building a body whose estimated size
+    of system prompt and messages exceeds the budget; the history always starts with a user turn and keeps the
+    latest one.
+    """
+
+    def __init__(
+        self,
+        body: AnthropicModelRequestBody,
+        max_history_tokens: Optional[int] = None,
+    ):
+        if max_history_tokens is not None:
+            assert max_history_tokens > 0, "Max history tokens must be greater than 0"
+        head = (
+            body.model_copy(update={"messages": []})
+            .model_dump_json(exclude_none=True)
+            .encode("utf8")
+        )
+        prefix, suffix = head.split(b'"messages":[]')
+        self._prefix = prefix + b'"messages":['
+        self._suffix = b"]" + suffix
+        self.temperature = body.temperature
+        self.max_tokens = body.max_tokens
+        self.max_history_tokens = max_history_tokens
+        self.dropped_turns = 0
+        self._system_tokens = estimate_text_tokens(body.system or "")
+        self._turns: List[_Turn] = []
+        for message in body.messages:
+            self.add_message(message)
+
+    def add_message(self, message: AnthropicMessage) -> "Conversation":
+        if not message.content:
+            raise ValueError("Message must have content")
+        serialized = bytearray(
+            message.model_dump_json(exclude_none=True).encode("utf8")
+        )
+        tokens = sum(
+            estimate_text_tokens(block.text) if block.type == "text" else IMAGE_TOKENS
+            for block in message.content
+        )
+        texts = [block.text for block in message.content if block.type == "text"]
+        self._append(message.role, serialized, tokens, texts)
+        return self
+
+    def add_user(
+        self,
+        text: Optional[str] = None,
+        images: Iterable[ImageSource] = (),
+    ) -> "Conversation":
+        """
+        Append a user turn of the images followed by the text, base64 encoding each image straight into the
+        serialized turn. Consecutive user turns are merged into one message.
+        """
+        serialized = bytearray(b'{"role":"user","content":[')
+        tokens = 0
+        for source in images:
+            with open_image(source) as image:
+                header = peek(image, IMAGE_HEADER_SIZE)
+                media_type = guess_media_type(source, header)
+                serialized += b"," if tokens else b""
+                write_image_block(image, media_type, serialized)
+            tokens += estimate_image_tokens(header)
+        if text is not None:
+            serialized += b"," if tokens else b""
+            write_text_block(text, serialized)
+            tokens += estimate_text_tokens(text)
+        if not tokens:
+            raise ValueError("User turn must have text or images")
+        serialized += b"]}"
+        self._append("user", serialized, tokens, [text] if text is not None else [])
+        return self
+
+    def add_assistant(self, text: str) -> "Conversation":
+        serialized = bytearray(b'{"role":"assistant","content":[')
+        write_text_block(text, serialized)
+        serialized += b"]}"
+        self._append("assistant", serialized, estimate_text_tokens(text), [text])
+        return self
+
+    def body(self) -> bytearray:
+        if not self._turns:
+            raise ValueError("Conversation has no messages")
+        if self._turns[-1].role != "user":
+            raise ValueError("Conversation must end with a user turn")
+        self._trim()
+        body = bytearray(self._prefix)
+        for index, turn in enumerate(self._turns):
+            if index:
+                body += b","
+            body += turn.serialized
+        body += self._suffix
+        return body
+
+    @property
+    def roles(self) -> List[str]:
+        return [turn.role for turn in self._turns]
+
+    @property
+    def user_texts(self) -> List[str]:
+        """
+        Texts of the latest user turn.
+        """
+        for turn in reversed(self._turns):
+            if turn.role == "user":
+                return turn.texts
+        return []
+
+    @property
+    def estimated_tokens(self) -> int:
+        return self._system_tokens + sum(turn.tokens for turn in self._turns)
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def _append(self, role: str, serialized: bytearray, tokens: int, texts: List[str]):
+        last = self._turns[-1] if self._turns else None
+        if last is not None and last.role == role:
+            # splice the new content blocks into the last message: `...]}` + `,` + blocks + `]}`
+            content = serialized[serialized.index(b"[") + 1 :]
+            del last.serialized[-2:]
+            last.serialized += b","
+            last.serialized += content
+            last.tokens += tokens
+            last.texts += texts
+        else:
+            self._turns.append(_Turn(role, serialized, tokens, texts))
+
+    def _trim(self):
+        if self.max_history_tokens is None:
+            return
+        while len(self._turns) > 1 and self.estimated_tokens > self.max_history_tokens:
+            self._drop_first()
+            # history must start with a user turn
+            while len(self._turns) > 1 and self._turns[0].role != "user":
+                self._drop_first()
+
+    def _drop_first(self):
+        self._turns.pop(0)
+        self.dropped_turns += 1
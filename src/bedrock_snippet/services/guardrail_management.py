@@ -1,40 +1,81 @@
 import boto3
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Iterable
 from bedrock_snippet.models.guardrail import *
 from bedrock_snippet.models.request import (
     CreateGuardrailRequest,
     UpdateGuardrailRequest,
 )
+from bedrock_snippet.models.response import WordImportReport
+from bedrock_snippet.services.word_filter import GuardrailWordFilter
+from bedrock_snippet.services.client_pool import ClientPool, default_client_pool
+from bedrock_snippet.services.instrumentation import Instrumentation
+from bedrock_snippet.services.resolution import (
+    ResolutionCache,
+    default_resolution_cache,
+    find_summary,
+    iter_summaries,
+    resolution_key,
+)
 
 
 class GuardrailManagementService:
 
-    def __init__(self, guardrail_name: str, session: boto3.Session):
+    def __init__(
+        self,
+        guardrail_name: str,
+        session: boto3.Session,
+        resolution_cache: Optional[ResolutionCache] = None,
+        client_pool: Optional[ClientPool] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         self._guardrail_name = guardrail_name
         self._session = session
-        self._client = session.client("bedrock")
+        self._client_pool = (
+            client_pool if client_pool is not None else default_client_pool
+        )
+        self._client = self._client_pool.client(session, "bedrock")
+        if instrumentation is not None:
+            instrumentation.attach(self._client)
+        self._resolution_cache = (
+            resolution_cache
+            if resolution_cache is not None
+            else default_resolution_cache
+        )
+        self._resolution_key = resolution_key(session, "bedrock", guardrail_name)
 
     def create_guardrail(
         self,
         description: str,
         blocked_input_message: str,
         blocked_output_message: str,
-        restricted_words: List[str],
+        restricted_words: List[str] | WordImportReport,
     ):
+        """
+        `restricted_words` may be a report of `read_restricted_words`, whose words are used without revalidation.
+        """
         assert (
             not self._is_guardrail_created()
         ), f"Guardrail with name '{self._guardrail_name}' already exists."
-        words_config = GuardrailWordPolicyConfig(
-            wordsConfig=[GuardrailWordConfig(text=word) for word in restricted_words]
-        )
+        restricted_words = self._validate_words(restricted_words)
         request = CreateGuardrailRequest(
             name=self._guardrail_name,
             description=description,
             blockedInputMessaging=blocked_input_message,
             blockedOutputsMessaging=blocked_output_message,
-            wordPolicyConfig=words_config,
         )
-        self._client.create_guardrail(**request.model_dump(exclude_none=True))
+        response = self._client.create_guardrail(
+            **request.model_dump(exclude_none=True),
+            wordPolicyConfig=word_policy_config(restricted_words),
+        )
+        self._resolution_cache.put(
+            self._resolution_key,
+            {
+                "name": self._guardrail_name,
+                "id": response.get("guardrailId"),
+                "arn": response.get("guardrailArn"),
+            },
+        )
 
     def create_guardrail_version(self, description: Optional[str] = None):
         if description is None:
@@ -59,94 +100,198 @@ class GuardrailManagementService:
                 guardrailVersion=str(version),
             )
 
+    def get_word_filter(self, version: Optional[int] = None) -> GuardrailWordFilter:
+        """
+        Word policy of the guardrail version compiled for local checks, see `PromptInvocationService`.
+        """
+        return GuardrailWordFilter.from_guardrail(self.get_guardrail(version))
+
     def get_guardrail_id(self) -> str:
-        guardrails = self._client.list_guardrails().get("guardrails")
-        test_guardrail = [
-            g for g in guardrails if g.get("name") == self._guardrail_name
-        ]
-        assert (
-            test_guardrail
-        ), f"Guardrail with name '{self._guardrail_name}' doesn't exist"
-        return test_guardrail[0].get("id")
+        summary = self._get_guardrail_summary()
+        assert summary, f"Guardrail with name '{self._guardrail_name}' doesn't exist"
+        return summary.get("id")
 
-    def list_available_guardrail_versions(self):
-        result = []
-        version = 0
-        guardrail_info = self.get_guardrail()
-        guardrail_arn = guardrail_info.get("guardrailArn")
-        resource_info = self._client.list_tags_for_resource(resourceARN=guardrail_arn)
-        result.append(
+    def list_available_guardrail_versions(
+        self, summary_only: bool = False, max_workers: int = 8
+    ):
+        """
+        Versions are discovered with a single (paginated) version listing, then every version is fetched
+        concurrently. Version 0 denotes the working draft. With `summary_only`, tags are not requested and
+        each row only carries version, word count and update time.
+        """
+        summary = self._get_guardrail_summary()
+        assert summary, f"Guardrail '{self._guardrail_name}' is not created"
+        guardrail_id, guardrail_arn = summary.get("id"), summary.get("arn")
+        versions = sorted(
             {
-                "version": version,
-                "wordPolicy": resource_info.get("wordPolicy"),
-                "tags": resource_info.get("tags"),
+                0 if g.get("version") == "DRAFT" else int(g.get("version"))
+                for g in iter_summaries(self._client, guardrailIdentifier=guardrail_id)
             }
+            | {0}
         )
-        while True:
-            version += 1
-            try:
-                resource_info = self._client.list_tags_for_resource(
-                    resourceARN=f"{guardrail_arn}:{version}"
-                )
-                result.append(
-                    {
-                        "version": version,
-                        "wordPolicy": resource_info.get("wordPolicy"),
-                        "tags": resource_info.get("tags"),
-                    }
-                )
-            except self._client.exceptions.ResourceNotFoundException:
-                return result
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            result = executor.map(
+                lambda v: self._describe_guardrail_version(
+                    guardrail_id, guardrail_arn, v, summary_only
+                ),
+                versions,
+            )
+            return [version_info for version_info in result if version_info is not None]
 
     def update_guardrail(
         self,
         description: Optional[str] = None,
         blocked_input_message: Optional[str] = None,
         blocked_output_message: Optional[str] = None,
-        restricted_words: Optional[List[str]] = None,
-    ):
+        restricted_words: Optional[List[str] | WordImportReport] = None,
+    ) -> bool:
+        """
+        Arguments left as None keep their current value, and the update is skipped if nothing changes.
+        `restricted_words` are validated in a single pass, unless given as a report of `read_restricted_words`.
+        Returns whether the guardrail was updated.
+        """
         guardrail_info = self.get_guardrail()
         if restricted_words is not None:
-            words_config = GuardrailWordPolicyConfig(
-                wordsConfig=[
-                    GuardrailWordConfig(text=word) for word in restricted_words
-                ]
-            )
-        else:
-            words_config = GuardrailWordPolicyConfig(
-                wordsConfig=[
-                    GuardrailWordConfig(text=word.get("text"))
-                    for word in guardrail_info.get("wordPolicy").get("words")
-                ]
+            restricted_words = self._validate_words(restricted_words)
+        return self._update_guardrail(
+            guardrail_info,
+            description,
+            blocked_input_message,
+            blocked_output_message,
+            restricted_words,
+        )
+
+    def add_words(self, words: Iterable[str]) -> bool:
+        """
+        Add words missing from the current word policy, validating only the added ones. Words are compared
+        case-insensitively, like Bedrock matches them. Returns whether the guardrail was updated.
+        """
+        guardrail_info = self.get_guardrail()
+        current_words = self._current_words(guardrail_info)
+        current = {word.casefold() for word in current_words}
+        added = []
+        for word in words:
+            if word.casefold() not in current:
+                current.add(word.casefold())
+                added.append(word)
+        if not added:
+            return False
+        added = validate_restricted_words(added)
+        restricted_words = current_words + added
+        assert (
+            len(restricted_words) <= 10000
+        ), f"Guardrail can't have more than 10000 words, got {len(restricted_words)}"
+        return self._update_guardrail(guardrail_info, restricted_words=restricted_words)
+
+    def remove_words(self, words: Iterable[str]) -> bool:
+        """
+        Remove words from the current word policy, compared case-insensitively. Returns whether the guardrail was
+        updated.
+        """
+        guardrail_info = self.get_guardrail()
+        current_words = self._current_words(guardrail_info)
+        removed = {word.casefold() for word in words}
+        restricted_words = [
+            word for word in current_words if word.casefold() not in removed
+        ]
+        if len(restricted_words) == len(current_words):
+            return False
+        assert restricted_words, "Guardrail must keep at least one word"
+        return self._update_guardrail(guardrail_info, restricted_words=restricted_words)
+
+    def delete_guardrail(self):
+        self._client.delete_guardrail(guardrailIdentifier=self.get_guardrail_id())
+        self._resolution_cache.invalidate(self._resolution_key)
+
+    def _describe_guardrail_version(
+        self, guardrail_id: str, guardrail_arn: str, version: int, summary_only: bool
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            if version == 0:
+                guardrail_info = self._client.get_guardrail(
+                    guardrailIdentifier=guardrail_id
+                )
+                resource_arn = guardrail_arn
+            else:
+                guardrail_info = self._client.get_guardrail(
+                    guardrailIdentifier=guardrail_id, guardrailVersion=str(version)
+                )
+                resource_arn = f"{guardrail_arn}:{version}"
+            word_policy = guardrail_info.get("wordPolicy")
+            if summary_only:
+                return {
+                    "version": version,
+                    "wordCount": len((word_policy or {}).get("words", [])),
+                    "updatedAt": guardrail_info.get("updatedAt"),
+                }
+            resource_info = self._client.list_tags_for_resource(
+                resourceARN=resource_arn
             )
+        except self._client.exceptions.ResourceNotFoundException:
+            return None  # version deleted after it was listed
+        return {
+            "version": version,
+            "wordPolicy": word_policy,
+            "tags": resource_info.get("tags"),
+        }
+
+    def _update_guardrail(
+        self,
+        guardrail_info: Dict[str, Any],
+        description: Optional[str] = None,
+        blocked_input_message: Optional[str] = None,
+        blocked_output_message: Optional[str] = None,
+        restricted_words: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        `restricted_words` must be validated already; words of the current policy are sent as they are.
+        """
+        current_words = self._current_words(guardrail_info)
+        updates = {
+            "description": description,
+            "blockedInputMessaging": blocked_input_message,
+            "blockedOutputsMessaging": blocked_output_message,
+        }
+        changed = {
+            key: value
+            for key, value in updates.items()
+            if value is not None and value != guardrail_info.get(key)
+        }
+        if restricted_words is None or set(restricted_words) == set(current_words):
+            if not changed:
+                return False
+            restricted_words = current_words
+        current = {key: guardrail_info.get(key) for key in updates}
         request = UpdateGuardrailRequest(
             name=self._guardrail_name,
-            description=(
-                description
-                if description is not None
-                else guardrail_info.get("description")
-            ),
             guardrailIdentifier=self.get_guardrail_id(),
-            blockedInputMessaging=(
-                blocked_input_message
-                if blocked_input_message is not None
-                else guardrail_info.get("blockedInputMessaging")
-            ),
-            blockedOutputsMessaging=(
-                blocked_output_message
-                if blocked_output_message is not None
-                else guardrail_info.get("blockedOutputsMessaging")
-            ),
-            wordPolicyConfig=words_config,
+            **{**current, **changed},
         )
-        self._client.update_guardrail(**request.model_dump(exclude_none=True))
+        params = request.model_dump(exclude_none=True)
+        if restricted_words:
+            params["wordPolicyConfig"] = word_policy_config(restricted_words)
+        self._client.update_guardrail(**params)
+        return True
 
-    def delete_guardrail(self):
-        self._client.delete_guardrail(guardrailIdentifier=self.get_guardrail_id())
+    @staticmethod
+    def _validate_words(words: List[str] | WordImportReport) -> List[str]:
+        if isinstance(words, WordImportReport):
+            assert words.words, "Imported word list is empty"
+            return words.words
+        return validate_restricted_words(words)
+
+    @staticmethod
+    def _current_words(guardrail_info: Dict[str, Any]) -> List[str]:
+        word_policy = guardrail_info.get("wordPolicy") or {}
+        return [word.get("text") for word in word_policy.get("words", [])]
 
     def _is_guardrail_created(self) -> bool:
-        guardrails = self._client.list_guardrails().get("guardrails")
-        for guardrail in guardrails:
-            if guardrail.get("name") == self._guardrail_name:
-                return True
-        return False
+        return self._get_guardrail_summary() is not None
+
+    def _get_guardrail_summary(self) -> Optional[Dict[str, Any]]:
+        summary = self._resolution_cache.get(self._resolution_key)
+        if summary is None:
+            summary = find_summary(self._client, self._guardrail_name)
+            if summary is not None:
+                self._resolution_cache.put(self._resolution_key, summary)
+        return summary
@@ -0,0 +1,135 @@
+import base64
+import io
+import math
+import mmap
+import os
+import pathlib
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+ImageSource = str | pathlib.Path | bytes | bytearray | memoryview | BinaryIO
+
+# multiple of 3, so that concatenated chunk encodings equal the encoding of the whole input
+CHUNK_SIZE = 3 * 64 * 1024
+
+MEDIA_TYPES = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+}
+
+# media subtype to Pillow format, including the common non-standard image/jpg
+PILLOW_FORMATS = {
+    "jpg": "JPEG",
+    "jpeg": "JPEG",
+    "png": "PNG",
+    "gif": "GIF",
+    "webp": "WEBP",
+}
+
+
+def guess_media_type(source: ImageSource, header: bytes) -> str:
+    """
+    Media type from the file suffix for paths, otherwise from the leading magic bytes of the image.
+    """
+    if isinstance(source, (str, pathlib.Path)):
+        suffix = pathlib.Path(source).suffix[1:].lower()
+        if suffix in MEDIA_TYPES:
+            return MEDIA_TYPES[suffix]
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    elif header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    elif header[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    elif header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    raise ValueError("Unsupported image format, expected one of jpeg, png, gif, webp")
+
+
+@contextmanager
+def open_image(source: ImageSource) -> Iterator[memoryview | BinaryIO]:
+    """
+    Expose an image source without copying it: files are memory-mapped, bytes-like objects are wrapped in a
+    memoryview and file-like objects are passed through to be read chunk by chunk. File-like objects must be
+    seekable unless the media type is given.
+    """
+    if isinstance(source, (str, pathlib.Path)):
+        with open(source, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield view
+                finally:
+                    view.release()
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield memoryview(source)
+    else:
+        yield source
+
+
+def peek(image: memoryview | BinaryIO, size: int = 16) -> bytes:
+    if isinstance(image, memoryview):
+        return bytes(image[:size])
+    header = image.read(size)
+    image.seek(-len(header), io.SEEK_CUR)
+    return header
+
+
+def write_base64(image: memoryview | BinaryIO, out: bytearray):
+    """
+    Append the base64 encoding of the image to `out` in fixed size chunks, so that at most one chunk and its
+    encoding exist besides `out` at any time.
+    """
+    if isinstance(image, memoryview):
+        for start in range(0, len(image), CHUNK_SIZE):
+            out += base64.b64encode(image[start : start + CHUNK_SIZE])
+        return
+    remainder = b""
+    while chunk := image.read(CHUNK_SIZE):
+        chunk = remainder + chunk
+        cut = len(chunk) - len(chunk) % 3
+        out += base64.b64encode(chunk[:cut])
+        remainder = chunk[cut:]
+    out += base64.b64encode(remainder)
+
+
+def downsize(image: memoryview | BinaryIO, max_pixels: int, media_type: str):
+    """
+    Re-encode the image at a lower resolution if it has more than `max_pixels` pixels. Returns None if the
+    image is within the budget, with a file-like image back at its original position. Requires Pillow, and
+    in-memory images are copied once to be decoded.
+    """
+    subtype = media_type.split("/")[-1].lower()
+    if subtype not in PILLOW_FORMATS:
+        raise ValueError(f"Unsupported media type {media_type!r} to downsize")
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise ImportError(
+            "Pillow is required to downsize images: pip install 'bedrock-snippet[image]'"
+        ) from e
+    in_memory = isinstance(image, memoryview)
+    stream = io.BytesIO(image) if in_memory else image
+    position = None if in_memory else image.tell()
+    with Image.open(stream) as decoded:
+        width, height = decoded.size
+        if width * height <= max_pixels:
+            if position is not None:
+                image.seek(position)
+            return None
+        scale = math.sqrt(max_pixels / (width * height))
+        resized = decoded.resize(
+            (max(1, int(width * scale)), max(1, int(height * scale)))
+        )
+        image_format = PILLOW_FORMATS[subtype]
+        if image_format == "JPEG" and resized.mode not in ("RGB", "L"):
+            resized = resized.convert("RGB")
+        out = io.BytesIO()
+        resized.save(out, format=image_format)
+        return out.getbuffer()
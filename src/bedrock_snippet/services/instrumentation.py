@@ -0,0 +1,311 @@
+import bisect
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Any, Iterable
+
+# upper bounds in seconds, from name lookups to long generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+logger = logging.getLogger(__name__)
+
+_START_KEY = "bedrock_snippet_instrumentation_start"
+_REQUEST_BYTES_KEY = "bedrock_snippet_instrumentation_request_bytes"
+
+
+@dataclass
+class CallRecord:
+    service: str
+    operation: str
+    start_time: float
+    duration: float
+    status_code: Optional[int]
+    error_code: Optional[str]
+    retries: int
+    request_bytes: int
+    response_bytes: int
+    model_id: Optional[str] = None
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Instrumentation:
+    """
+    Metrics of every API call made by the clients it is attached to, fed by botocore's event hooks: latency
+    histograms, call and error counts, retries and payload bytes per service and operation, plus model token usage
+    reported by `PromptInvocationService`. Every finished call is also passed as a `CallRecord` to the callbacks,
+    e.g. an `OpenTelemetryExporter`; a failing callback is logged and doesn't fail the call. Clients without an
+    attached instrumentation carry no hooks, so disabled instrumentation costs nothing.
+
+    Clients from a `ClientPool` are shared, so attaching to one also records calls of other services using it.
+    """
+
+    def __init__(
+        self,
+        callbacks: Iterable[Callable[[CallRecord], None]] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        self._callbacks = list(callbacks)
+        self._buckets = tuple(sorted(buckets))
+        assert self._buckets, "At least one bucket is required"
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], _Histogram] = {}
+        # (service, operation, status) -> count
+        self._calls: Dict[Tuple[str, str, str], int] = {}
+        self._retries: Dict[Tuple[str, str], int] = {}
+        self._request_bytes: Dict[Tuple[str, str], int] = {}
+        self._response_bytes: Dict[Tuple[str, str], int] = {}
+        # (model id, "input" | "output") -> tokens
+        self._tokens: Dict[Tuple[str, str], int] = {}
+        self._attached = weakref.WeakSet()
+
+    def add_callback(self, callback: Callable[[CallRecord], None]):
+        self._callbacks.append(callback)
+
+    def attach(self, client):
+        """
+        Register the hooks on a boto3 client, once per client. Returns the client.
+        """
+        with self._lock:
+            if client in self._attached:
+                return client
+            self._attached.add(client)
+        events = client.meta.events
+        events.register("before-parameter-build.*.*", self._on_start)
+        events.register("request-created.*.*", self._on_request)
+        events.register("after-call.*.*", self._on_response)
+        events.register("after-call-error.*.*", self._on_error)
+        return client
+
+    def record_usage(self, model_id: str, usage: Optional[Dict[str, int]]):
+        """
+        Add the `usage` of an Anthropic model response to the token counts of the model.
+        """
+        if not usage:
+            return
+        with self._lock:
+            for direction in ("input", "output"):
+                tokens = usage.get(f"{direction}_tokens")
+                if tokens:
+                    key = (model_id, direction)
+                    self._tokens[key] = self._tokens.get(key, 0) + tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the metrics per "service.operation": calls, errors, retries, payload bytes and latency
+        (count, sum, mean), plus tokens per model.
+        """
+        with self._lock:
+            operations = {}
+            for (service, operation), histogram in self._histograms.items():
+                key = (service, operation)
+                operations[f"{service}.{operation}"] = {
+                    "calls": histogram.count,
+                    "errors": sum(
+                        count
+                        for (s, o, status), count in self._calls.items()
+                        if (s, o) == key and status != "ok"
+                    ),
+                    "retries": self._retries.get(key, 0),
+                    "request_bytes": self._request_bytes.get(key, 0),
+                    "response_bytes": self._response_bytes.get(key, 0),
+                    "latency_sum": histogram.sum,
+                    "latency_mean": histogram.sum / histogram.count,
+                }
+            tokens: Dict[str, Dict[str, int]] = {}
+            for (model_id, direction), count in self._tokens.items():
+                tokens.setdefault(model_id, {"input": 0, "output": 0})[
+                    direction
+                ] = count
+            return {"operations": operations, "tokens": tokens}
+
+    def prometheus(self, prefix: str = "bedrock") -> str:
+        """
+        Metrics in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        with self._lock:
+            lines += [
+                f"# HELP {prefix}_api_call_duration_seconds Latency of Bedrock API calls including retries.",
+                f"# TYPE {prefix}_api_call_duration_seconds histogram",
+            ]
+            for (service, operation), histogram in sorted(self._histograms.items()):
+                labels = f'service="{service}",operation="{operation}"'
+                cumulative = 0
+                for bound, count in zip(self._buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f'{prefix}_api_call_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines += [
+                    f'{prefix}_api_call_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}',
+                    f"{prefix}_api_call_duration_seconds_sum{{{labels}}} {histogram.sum}",
+                    f"{prefix}_api_call_duration_seconds_count{{{labels}}} {histogram.count}",
+                ]
+            lines += [
+                f"# HELP {prefix}_api_calls_total Bedrock API calls by outcome.",
+                f"# TYPE {prefix}_api_calls_total counter",
+            ]
+            for (service, operation, status), count in sorted(self._calls.items()):
+                lines.append(
+                    f'{prefix}_api_calls_total{{service="{service}",operation="{operation}",status="{status}"}} {count}'
+                )
+            for name, values, help_text in (
+                ("api_retries_total", self._retries, "Retried attempts of API calls."),
+                ("api_request_bytes_total", self._request_bytes, "Request bytes."),
+                ("api_response_bytes_total", self._response_bytes, "Response bytes."),
+            ):
+                lines += [
+                    f"# HELP {prefix}_{name} {help_text}",
+                    f"# TYPE {prefix}_{name} counter",
+                ]
+                for (service, operation), value in sorted(values.items()):
+                    lines.append(
+                        f'{prefix}_{name}{{service="{service}",operation="{operation}"}} {value}'
+                    )
+            lines += [
+                f"# HELP {prefix}_model_tokens_total Tokens reported by model responses.",
+                f"# TYPE {prefix}_model_tokens_total counter",
+            ]
+            for (model_id, direction), count in sorted(self._tokens.items()):
+                lines.append(
+                    f'{prefix}_model_tokens_total{{model="{model_id}",direction="{direction}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._calls.clear()
+            self._retries.clear()
+            self._request_bytes.clear()
+            self._response_bytes.clear()
+            self._tokens.clear()
+
+    def _on_start(self, params, model, context, **kwargs):
+        context[_START_KEY] = (
+            model.service_model.service_name,
+            model.name,
+            params.get("modelId"),
+            time.time(),
+            time.perf_counter(),
+        )
+
+    def _on_request(self, request, **kwargs):
+        body = request.body
+        if isinstance(body, (bytes, bytearray, str)):
+            request.context[_REQUEST_BYTES_KEY] = len(body)
+
+    def _on_response(self, http_response, parsed, context, **kwargs):
+        error_code = parsed["Error"].get("Code") if "Error" in parsed else None
+        self._record(
+            context,
+            http_response.status_code,
+            error_code,
+            parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0),
+            int(http_response.headers.get("content-length") or 0),
+        )
+
+    def _on_error(self, exception, context, **kwargs):
+        # connection errors and timeouts, raised before any response
+        self._record(context, None, type(exception).__name__, 0, 0)
+
+    def _record(
+        self,
+        context: Dict[str, Any],
+        status_code: Optional[int],
+        error_code: Optional[str],
+        retries: int,
+        response_bytes: int,
+    ):
+        start = context.pop(_START_KEY, None)
+        if start is None:
+            return
+        service, operation, model_id, start_time, start_counter = start
+        duration = time.perf_counter() - start_counter
+        record = CallRecord(
+            service=service,
+            operation=operation,
+            start_time=start_time,
+            duration=duration,
+            status_code=status_code,
+            error_code=error_code,
+            retries=retries,
+            request_bytes=context.pop(_REQUEST_BYTES_KEY, 0),
+            response_bytes=response_bytes,
+            model_id=model_id,
+        )
+        key = (service, operation)
+        status = "ok" if error_code is None else error_code
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self._buckets)
+            histogram.counts[bisect.bisect_left(self._buckets, duration)] += 1
+            histogram.sum += duration
+            histogram.count += 1
+            call_key = (service, operation, status)
+            self._calls[call_key] = self._calls.get(call_key, 0) + 1
+            self._retries[key] = self._retries.get(key, 0) + retries
+            self._request_bytes[key] = (
+                self._request_bytes.get(key, 0) + record.request_bytes
+            )
+            self._response_bytes[key] = (
+                self._response_bytes.get(key, 0) + response_bytes
+            )
+        for callback in self._callbacks:
+            # callbacks run inside botocore's hooks, where an exception would fail the API call itself
+            try:
+                callback(record)
+            except Exception:
+                logger.exception("Instrumentation callback %r failed", callback)
+
+
+class OpenTelemetryExporter:
+    """
+    Instrumentation callback emitting one span per API call, as a child of the span current on the calling
+    thread. Requires opentelemetry-api and a configured tracer provider.
+    """
+
+    def __init__(self, tracer=None):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError(
+                "opentelemetry-api is required to export spans: pip install 'bedrock-snippet[otel]'"
+            ) from e
+        self._trace = trace
+        self._tracer = tracer if tracer is not None else trace.get_tracer(__name__)
+
+    def __call__(self, record: CallRecord):
+        start_ns = int(record.start_time * 1e9)
+        attributes = {
+            "rpc.system": "aws-api",
+            "rpc.service": record.service,
+            "rpc.method": record.operation,
+            "aws.retries": record.retries,
+            "aws.request_bytes": record.request_bytes,
+            "aws.response_bytes": record.response_bytes,
+        }
+        if record.status_code is not None:
+            attributes["http.response.status_code"] = record.status_code
+        if record.model_id is not None:
+            attributes["gen_ai.request.model"] = record.model_id
+        span = self._tracer.start_span(
+            f"{record.service}.{record.operation}",
+            kind=self._trace.SpanKind.CLIENT,
+            start_time=start_ns,
+            attributes=attributes,
+        )
+        if record.error_code is not None:
+            span.set_status(
+                self._trace.Status(self._trace.StatusCode.ERROR, record.error_code)
+            )
+        span.end(end_time=start_ns + int(record.duration * 1e9))
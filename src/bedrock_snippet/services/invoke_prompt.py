@@ -1,87 +1,220 @@
+import functools
 import json
 import pathlib
+import threading
+import time
 
 import boto3
-from base64 import b64encode
-from typing import Dict, Optional
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Optional, Any, Iterable, List, Tuple
 from bedrock_snippet.models.prompt import (
     PromptVariant,
     AnthropicMessage,
     AnthropicContentBlock,
-    AnthropicImageContent,
 )
 from bedrock_snippet.models.request import (
     AnthropicModelRequestBody,
     AnthropicModelRequest,
 )
+from bedrock_snippet.models.response import InvocationBatchResult
+from bedrock_snippet.services.response_stream import InvocationStream
+from bedrock_snippet.services.prompt_rendering import PromptRenderer
+from bedrock_snippet.services.image_encoding import (
+    ImageSource,
+    open_image,
+    guess_media_type,
+    peek,
+    downsize,
+)
+from bedrock_snippet.services.request_body import RequestBodyTemplate
+from bedrock_snippet.services.conversation import Conversation
+from bedrock_snippet.services.word_filter import GuardrailWordFilter
+from bedrock_snippet.services.rate_limit import RateLimiter
+from bedrock_snippet.services.response_cache import ResponseCache, request_cache_key
+from bedrock_snippet.services.snapshot_store import PromptSnapshotStore
+from bedrock_snippet.services.client_pool import ClientPool, default_client_pool
+from bedrock_snippet.services.instrumentation import Instrumentation
+from bedrock_snippet.services.routing import InvocationRouter
+from bedrock_snippet.services.token_accounting import (
+    IMAGE_HEADER_SIZE,
+    TokenAccountant,
+    TokenBudget,
+    estimate_body_tokens,
+    estimate_image_tokens,
+    estimate_text_tokens,
+)
+from bedrock_snippet.services.resolution import (
+    ResolutionCache,
+    default_resolution_cache,
+    find_summary,
+    resolution_key,
+)
 
 
 class PromptInvocationService:
 
     def __init__(
-        self, prompt_name: str, session: boto3.Session, version: Optional[int] = None
+        self,
+        prompt_name: str,
+        session: boto3.Session,
+        version: Optional[int] = None,
+        resolution_cache: Optional[ResolutionCache] = None,
+        client_config: Optional[Config] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
+        force_response_cache: bool = False,
+        client_pool: Optional[ClientPool] = None,
+        lazy: bool = False,
+        prefetch: bool = False,
+        snapshot_store: Optional[PromptSnapshotStore] = None,
+        guardrail_word_filter: Optional[GuardrailWordFilter] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        token_budget: Optional[TokenBudget] = None,
+        token_accountant: Optional[TokenAccountant] = None,
+        router: Optional[InvocationRouter] = None,
     ):
+        """
+        If `response_cache` is given, responses of `invoke_text` and `invoke_multimodal` are cached as long as
+        the prompt is deterministic (temperature 0), or always with `force_response_cache`.
+        With `lazy`, the prompt definition is fetched on first invocation instead of here, and with `prefetch`
+        it is fetched on a background thread right away. Use `from_definition` to skip fetching altogether.
+        With `guardrail_word_filter`, text, rendered, multimodal and conversation invocations (streamed or not)
+        check their input against the guardrail's word policy locally and answer with its blocked input message
+        without invoking the model.
+        With `instrumentation`, every API call of the service's clients and the token usage of every model
+        response (streams once exhausted) are recorded.
+        With `token_budget`, the input tokens of every request are estimated locally and requests that don't
+        fit the context window are rejected (or their max_tokens lowered) before any network call. With
+        `token_accountant`, the token usage of every model response is totalled per prompt, version and model.
+        With `router`, calls invoking the variant's model directly (`invoke_rendered`, multimodal and
+        conversation calls) are routed across the router's regions and models; calls addressing the prompt ARN
+        (`invoke_text`, `stream_text`) stay in the session's region. Their token usage is recorded under the
+        model of the target that served them.
+        """
         self._prompt_name = prompt_name
-        self._bedrock_agent = session.client("bedrock-agent")
-        self._bedrock_runtime = session.client("bedrock-runtime")
-        prompt_info = self.get_prompt(version)
-
-        self._prompt_arn = prompt_info.get("arn")
+        client_pool = client_pool if client_pool is not None else default_client_pool
+        self._bedrock_agent = client_pool.client(
+            session, "bedrock-agent", client_config
+        )
+        self._bedrock_runtime = client_pool.client(
+            session, "bedrock-runtime", client_config
+        )
+        self._instrumentation = instrumentation
+        self._token_budget = token_budget
+        self._token_accountant = token_accountant
+        self._router = router
+        if instrumentation is not None:
+            instrumentation.attach(self._bedrock_agent)
+            instrumentation.attach(self._bedrock_runtime)
+            if router is not None:
+                for client in router.clients:
+                    instrumentation.attach(client)
+        self._resolution_cache = (
+            resolution_cache
+            if resolution_cache is not None
+            else default_resolution_cache
+        )
+        self._resolution_key = resolution_key(session, "bedrock-agent", prompt_name)
+        self._rate_limiter = rate_limiter
+        self._snapshot_store = snapshot_store
+        self._guardrail_word_filter = guardrail_word_filter
         self._session = session
+        self._version = version
+        self._candidate_response_cache = response_cache
+        self._force_response_cache = force_response_cache
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        if prefetch:
+            threading.Thread(target=self._ensure_loaded, daemon=True).start()
+        elif not lazy:
+            self._ensure_loaded()
 
-        variant = PromptVariant(**prompt_info.get("variants")[0])
-        self._model_id = variant.modelId
-        self._default_body = self._parse_variant(variant)
-        self._required_variables = {
-            variable.name
-            for variable in variant.templateConfiguration.chat.inputVariables
-        }
+    @classmethod
+    def from_definition(
+        cls,
+        prompt_name: str,
+        session: boto3.Session,
+        definition: Dict[str, Any] | str | pathlib.Path,
+        **kwargs,
+    ) -> "PromptInvocationService":
+        """
+        Build the service from an already fetched `get_prompt` response (or a path to its JSON dump) without
+        any network call. Keyword arguments are passed to the constructor.
+        """
+        if not isinstance(definition, dict):
+            with open(definition, "r") as file:
+                definition = json.load(file)
+        service = cls(prompt_name, session, lazy=True, **kwargs)
+        with service._load_lock:
+            service._load_definition(definition)
+        return service
+
+    @property
+    def required_variables(self) -> List[str]:
+        self._ensure_loaded()
+        return sorted(self._required_variables)
 
     def get_prompt(self, version: Optional[int] = None):
         assert self._is_prompt_created(), f"Prompt '{self._prompt_name}' is not created"
-        if version is None:
-            return self._bedrock_agent.get_prompt(
-                promptIdentifier=self._get_prompt_id()
-            )
-        else:
+        if version is not None:
             assert version > 0, "Prompt version must be greater than 0"
-            return self._bedrock_agent.get_prompt(
-                promptIdentifier=self._get_prompt_id(),
-                promptVersion=str(version),
+        if self._snapshot_store is not None:
+            return self._snapshot_store.get(
+                self._get_prompt_summary(), version, lambda: self._fetch_prompt(version)
             )
+        return self._fetch_prompt(version)
 
     def invoke_multimodal(
         self,
-        image_path: pathlib.Path,
+        image_path: ImageSource,
         return_result_only: bool = False,
         guardrail_identifier: Optional[str] = None,
         guardrail_version: Optional[int | str] = "DRAFT",
+        media_type: Optional[str] = None,
+        max_pixels: Optional[int] = None,
     ):
-        source = AnthropicImageContent(
-            media_type=f"image/{image_path.suffix[1:]}",
-            data=b64encode(open(image_path, "rb").read()).decode("utf8"),
+        """
+        `image_path` may also be bytes, a memoryview or a file-like object; the media type is then detected from
+        the image header unless given. Images with more than `max_pixels` pixels are downsized (requires Pillow).
+        """
+        self._ensure_loaded()
+        result = self._check_words(
+            self._template_texts, guardrail_identifier, guardrail_version
         )
-        image_block = AnthropicContentBlock(type="image", source=source)
-        body = self._default_body.copy()
-        body.messages[0].content.append(image_block)
-        if guardrail_identifier is not None:
-            request = AnthropicModelRequest(
-                modelId=self._model_id,
-                body=body,
-                guardrailIdentifier=guardrail_identifier,
-                guardrailVersion=str(guardrail_version),
+        if result is None:
+            request, input_tokens = self._multimodal_request(
+                image_path,
+                guardrail_identifier,
+                guardrail_version,
+                media_type,
+                max_pixels,
             )
-        else:
-            request = AnthropicModelRequest(modelId=self._model_id, body=body)
-        response = self._bedrock_runtime.invoke_model(
-            **request.model_dump(exclude_none=True)
-        )
-        result = json.loads(response.get("body").read())
+            result = self._invoke_model(request, input_tokens=input_tokens)
         if return_result_only:
             return result.get("content")[0].get("text")
         else:
             return result
 
+    def stream_multimodal(
+        self,
+        image_path: ImageSource,
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+        media_type: Optional[str] = None,
+        max_pixels: Optional[int] = None,
+    ) -> InvocationStream:
+        self._ensure_loaded()
+        result = self._check_words(
+            self._template_texts, guardrail_identifier, guardrail_version
+        )
+        if result is not None:
+            return InvocationStream.from_result(result)
+        request, input_tokens = self._multimodal_request(
+            image_path, guardrail_identifier, guardrail_version, media_type, max_pixels
+        )
+        return self._stream(request, input_tokens)
+
     def invoke_text(
         self,
         prompt_variables: Dict[str, str],
@@ -89,30 +222,435 @@ class PromptInvocationService:
         guardrail_identifier: Optional[str] = None,
         guardrail_version: Optional[int | str] = "DRAFT",
     ):
-        input_variables = set(prompt_variables.keys())
-        missing_variables = self._required_variables.difference(input_variables)
-        if len(missing_variables) > 0:
-            raise ValueError(f"Value for ({missing_variables}) is missing")
-        variable_values = {k: {"text": v} for k, v in prompt_variables.items()}
-        body = json.dumps({"promptVariables": variable_values})
+        request, input_tokens = self._text_request(
+            prompt_variables, guardrail_identifier, guardrail_version
+        )
+        result = self._check_words(
+            prompt_variables.values(), guardrail_identifier, guardrail_version
+        )
+        if result is None:
+            result = self._invoke_model(request, input_tokens=input_tokens)
+        if return_result_only:
+            return result.get("content")[0].get("text")
+        else:
+            return result
 
-        if guardrail_identifier is not None:
-            response = self._bedrock_runtime.invoke_model(
-                modelId=self._prompt_arn,
-                body=body,
-                guardrailIdentifier=guardrail_identifier,
-                guardrailVersion=str(guardrail_version),
+    def stream_text(
+        self,
+        prompt_variables: Dict[str, str],
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+    ) -> InvocationStream:
+        """
+        Same as `invoke_text`, but returns as soon as the response starts. Iterating over the returned stream
+        yields text deltas as they are generated.
+        """
+        request, input_tokens = self._text_request(
+            prompt_variables, guardrail_identifier, guardrail_version
+        )
+        result = self._check_words(
+            prompt_variables.values(), guardrail_identifier, guardrail_version
+        )
+        if result is not None:
+            return InvocationStream.from_result(result)
+        return self._stream(request, input_tokens)
+
+    def invoke_rendered(
+        self,
+        prompt_variables: Dict[str, str],
+        return_result_only: bool = False,
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+        inference_overrides: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Render the prompt template locally and invoke the variant's model directly, skipping server side prompt
+        resolution. `inference_overrides` replaces fields of AnthropicModelRequestBody (e.g. temperature,
+        max_tokens) for this request only.
+        """
+        self._ensure_loaded()
+        if self._renderer is None:
+            self._renderer = PromptRenderer(self._variant)
+        body = self._renderer.render(prompt_variables, inference_overrides)
+        input_tokens = estimate_body_tokens(body)
+        if self._token_budget is not None:
+            max_tokens = self._token_budget.fit(
+                input_tokens, body.max_tokens, truncatable=True
             )
+            if max_tokens != body.max_tokens:
+                body = body.model_copy(update={"max_tokens": max_tokens})
+        request = AnthropicModelRequest.serialize(
+            self._model_id,
+            body,
+            guardrail_identifier,
+            str(guardrail_version) if guardrail_identifier is not None else None,
+        )
+        texts = [block.text for message in body.messages for block in message.content]
+        result = self._check_words(
+            [body.system or "", *texts], guardrail_identifier, guardrail_version
+        )
+        if result is None:
+            # an overridden temperature may make a deterministic prompt non-deterministic
+            cacheable = self._force_response_cache or body.temperature == 0
+            result = self._invoke_model(request, cacheable, input_tokens)
+        if return_result_only:
+            return result.get("content")[0].get("text")
         else:
-            response = self._bedrock_runtime.invoke_model(
-                modelId=self._prompt_arn, body=body
+            return result
+
+    def start_conversation(
+        self,
+        prompt_variables: Optional[Dict[str, str]] = None,
+        inference_overrides: Optional[Dict[str, Any]] = None,
+        max_history_tokens: Optional[int] = None,
+    ) -> Conversation:
+        """
+        Conversation seeded with the locally rendered prompt template, to be continued with `add_user` and
+        `invoke_conversation`.
+        """
+        self._ensure_loaded()
+        if self._renderer is None:
+            self._renderer = PromptRenderer(self._variant)
+        body = self._renderer.render(prompt_variables or {}, inference_overrides)
+        return Conversation(body, max_history_tokens)
+
+    def invoke_conversation(
+        self,
+        conversation: Conversation,
+        return_result_only: bool = False,
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+    ):
+        """
+        Invoke the variant's model with the conversation so far and append the text of the reply to it as
+        assistant turn. A reply without text (e.g. a stop sequence hit right away) is not appended, so the
+        conversation still ends with the user turn and can be invoked again.
+        """
+        self._ensure_loaded()
+        request = self._request_params(guardrail_identifier, guardrail_version)
+        request["body"] = conversation.body()
+        if self._token_budget is not None:
+            self._token_budget.check(
+                conversation.estimated_tokens, conversation.max_tokens
+            )
+        result = self._check_words(
+            conversation.user_texts, guardrail_identifier, guardrail_version
+        )
+        if result is None:
+            cacheable = self._force_response_cache or conversation.temperature == 0
+            result = self._invoke_model(
+                request, cacheable, conversation.estimated_tokens
             )
-        result = json.loads(response.get("body").read())
+        text = "".join(
+            block.get("text", "")
+            for block in result.get("content") or []
+            if block.get("type") == "text"
+        )
+        if text:
+            conversation.add_assistant(text)
         if return_result_only:
-            return result.get("content")[0].get("text")
+            return text
         else:
             return result
 
+    def invoke_text_batch(
+        self,
+        inputs: Iterable[Dict[str, str]],
+        max_concurrency: int = 10,
+        return_result_only: bool = False,
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+    ) -> InvocationBatchResult:
+        """
+        Invoke every set of prompt variables on a thread pool. Inputs are consumed lazily with at most
+        `2 * max_concurrency` invocations queued at a time, and a failing input is recorded in `errors`
+        without aborting the batch. Pass `client_config=Config(max_pool_connections=...)` on construction
+        when `max_concurrency` exceeds botocore's default pool size of 10.
+        """
+        assert max_concurrency > 0, "Max concurrency must be greater than 0"
+        results: List[Any] = []
+        errors: Dict[int, Exception] = {}
+        latencies: List[float] = []
+
+        def invoke(index: int, prompt_variables: Dict[str, str]):
+            start = time.perf_counter()
+            try:
+                results[index] = self.invoke_text(
+                    prompt_variables,
+                    return_result_only=return_result_only,
+                    guardrail_identifier=guardrail_identifier,
+                    guardrail_version=guardrail_version,
+                )
+            except Exception as e:
+                errors[index] = e
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            pending = set()
+            for index, prompt_variables in enumerate(inputs):
+                if len(pending) >= 2 * max_concurrency:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.append(None)
+                pending.add(executor.submit(invoke, index, prompt_variables))
+            wait(pending)
+        elapsed = time.perf_counter() - start
+        return InvocationBatchResult(
+            results=results,
+            errors=errors,
+            elapsed_seconds=elapsed,
+            throughput=(len(results) - len(errors)) / elapsed if elapsed > 0 else 0.0,
+            latency_percentiles=self._latency_percentiles(latencies),
+        )
+
+    @staticmethod
+    def _latency_percentiles(latencies: List[float]) -> Dict[str, float]:
+        if not latencies:
+            return {}
+        latencies = sorted(latencies)
+        last = len(latencies) - 1
+        return {
+            "p50": latencies[round(0.50 * last)],
+            "p90": latencies[round(0.90 * last)],
+            "p99": latencies[round(0.99 * last)],
+            "max": latencies[last],
+        }
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_definition(self.get_prompt(self._version))
+
+    def _load_definition(self, prompt_info: Dict[str, Any]):
+        self._prompt_arn = prompt_info.get("arn")
+        self._prompt_updated_at = str(prompt_info.get("updatedAt"))
+
+        variant = PromptVariant(**prompt_info.get("variants")[0])
+        self._model_id = variant.modelId
+        deterministic = variant.inferenceConfiguration.text.temperature == 0
+        self._response_cache = (
+            self._candidate_response_cache
+            if deterministic or self._force_response_cache
+            else None
+        )
+        self._variant = variant
+        self._renderer: Optional[PromptRenderer] = None
+        self._default_body = self._parse_variant(variant)
+        # placeholders are counted too, which slightly overestimates rendered prompts
+        self._template_tokens = estimate_body_tokens(self._default_body)
+        self._template_texts = [
+            self._default_body.system or "",
+            *(
+                block.text
+                for message in self._default_body.messages
+                for block in message.content
+                if block.type == "text"
+            ),
+        ]
+        self._body_template = RequestBodyTemplate(self._default_body)
+        self._request_params_cache: Dict[Any, Dict[str, Any]] = {}
+        self._required_variables = {
+            variable.name
+            for variable in variant.templateConfiguration.chat.inputVariables
+        }
+        self._loaded = True
+
+    def _check_words(
+        self,
+        texts: Iterable[str],
+        guardrail_identifier: Optional[str],
+        guardrail_version: Optional[int | str],
+    ) -> Optional[Dict[str, Any]]:
+        word_filter = self._guardrail_word_filter
+        if word_filter is None or guardrail_identifier is None:
+            return None
+        if not word_filter.applies_to(guardrail_identifier, guardrail_version):
+            return None
+        return word_filter.check(texts)
+
+    def _invoke_model(
+        self, request: Dict[str, Any], cacheable: bool = True, input_tokens: int = 0
+    ) -> Dict[str, Any]:
+        if self._response_cache is None or not cacheable:
+            response, model_id = self._call_runtime(
+                "invoke_model", request, input_tokens
+            )
+            result = json.loads(response.get("body").read())
+            self._record_usage(model_id, result.get("usage"))
+            return result
+        # DRAFT prompts are mutable, so the prompt's update time is part of the key
+        key = request_cache_key({**request, "promptUpdatedAt": self._prompt_updated_at})
+        payload = self._response_cache.get(key)
+        if payload is None:
+            response, model_id = self._call_runtime(
+                "invoke_model", request, input_tokens
+            )
+            payload = response.get("body").read()
+            self._response_cache.put(key, payload)
+            result = json.loads(payload)
+            self._record_usage(model_id, result.get("usage"))
+            return result
+        return json.loads(payload)
+
+    def _record_usage(self, model_id: str, usage: Optional[Dict[str, int]]):
+        """
+        `model_id` is the one that served the call, which may be a routed target's or the prompt ARN. Both token
+        reports key usage by the model, so calls addressing the prompt ARN count under the variant's model.
+        """
+        if model_id == self._prompt_arn:
+            model_id = self._model_id
+        if self._instrumentation is not None:
+            self._instrumentation.record_usage(model_id, usage)
+        if self._token_accountant is not None:
+            version = str(self._version) if self._version is not None else "DRAFT"
+            self._token_accountant.record(self._prompt_name, version, model_id, usage)
+
+    def _stream(
+        self, request: Dict[str, Any], input_tokens: int = 0
+    ) -> InvocationStream:
+        response, model_id = self._call_runtime(
+            "invoke_model_with_response_stream", request, input_tokens
+        )
+        if (
+            self._instrumentation is None
+            and self._token_accountant is None
+            and self._rate_limiter is None
+        ):
+            return InvocationStream(response)
+
+        def on_complete(stream: InvocationStream):
+            self._record_usage(model_id, stream.usage)
+            if self._rate_limiter is not None and stream.usage:
+                # streams carry no token count headers, so the estimate is corrected once they are exhausted
+                self._rate_limiter.charge(
+                    model_id,
+                    stream.usage.get("input_tokens", 0)
+                    + stream.usage.get("output_tokens", 0),
+                    input_tokens,
+                )
+
+        return InvocationStream(response, on_complete)
+
+    def _call_runtime(
+        self, operation_name: str, request: Dict[str, Any], input_tokens: int = 0
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        The response and the modelId that served it. `input_tokens` is the request's estimated input tokens,
+        charged to the rate limiter's token budget.
+        """
+        if self._router is not None and request.get("modelId") == self._model_id:
+            invoke = None
+            if self._rate_limiter is not None:
+                # throttles go straight to the router, which fails over instead of retrying
+                invoke = functools.partial(
+                    self._invoke_limited, input_tokens=input_tokens, max_attempts=1
+                )
+            return self._router.call(operation_name, request, invoke)
+        operation = getattr(self._bedrock_runtime, operation_name)
+        if self._rate_limiter is None:
+            return operation(**request), request["modelId"]
+        return (
+            self._invoke_limited(operation, request, input_tokens),
+            request["modelId"],
+        )
+
+    def _invoke_limited(
+        self,
+        operation,
+        request: Dict[str, Any],
+        input_tokens: int = 0,
+        max_attempts: Optional[int] = None,
+    ):
+        return self._rate_limiter.call(
+            request.get("modelId"),
+            operation,
+            estimated_tokens=input_tokens,
+            max_attempts=max_attempts,
+            **request,
+        )
+
+    def _multimodal_request(
+        self,
+        image_path: ImageSource,
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+        media_type: Optional[str] = None,
+        max_pixels: Optional[int] = None,
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        The image block is spliced into the pre-serialized default body, base64 encoding the image chunk by
+        chunk straight into the final body buffer. Shared state is only read. Returns the request and its
+        estimated input tokens.
+        """
+        self._ensure_loaded()
+        request = self._request_params(guardrail_identifier, guardrail_version)
+        with open_image(image_path) as image:
+            header = peek(image, IMAGE_HEADER_SIZE)
+            if media_type is None:
+                media_type = guess_media_type(image_path, header)
+            input_tokens = self._template_tokens + estimate_image_tokens(
+                header, max_pixels
+            )
+            if self._token_budget is not None:
+                self._token_budget.check(input_tokens, self._default_body.max_tokens)
+            if max_pixels is not None:
+                resized = downsize(image, max_pixels, media_type)
+                image = resized if resized is not None else image
+            builder = self._body_template.builder().add_image(image, media_type)
+            request["body"] = builder.build()
+        return request, input_tokens
+
+    def _request_params(
+        self,
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+    ) -> Dict[str, Any]:
+        """
+        Parameters of a model invocation without body. Each guardrail setting is validated once.
+        """
+        key = (
+            (guardrail_identifier, str(guardrail_version))
+            if guardrail_identifier is not None
+            else None
+        )
+        params = self._request_params_cache.get(key)
+        if params is None:
+            params = AnthropicModelRequest.fast_params(self._model_id, *(key or ()))
+            self._request_params_cache[key] = params
+        return dict(params)
+
+    def _text_request(
+        self,
+        prompt_variables: Dict[str, str],
+        guardrail_identifier: Optional[str] = None,
+        guardrail_version: Optional[int | str] = "DRAFT",
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Request addressing the prompt ARN, and its estimated input tokens.
+        """
+        self._ensure_loaded()
+        input_variables = set(prompt_variables.keys())
+        missing_variables = self._required_variables.difference(input_variables)
+        if len(missing_variables) > 0:
+            raise ValueError(f"Value for ({missing_variables}) is missing")
+        input_tokens = self._template_tokens + sum(
+            estimate_text_tokens(v) for v in prompt_variables.values()
+        )
+        if self._token_budget is not None:
+            self._token_budget.check(input_tokens, self._default_body.max_tokens)
+        variable_values = {k: {"text": v} for k, v in prompt_variables.items()}
+        request = {
+            "modelId": self._prompt_arn,
+            "body": json.dumps({"promptVariables": variable_values}, sort_keys=True),
+        }
+        if guardrail_identifier is not None:
+            request["guardrailIdentifier"] = guardrail_identifier
+            request["guardrailVersion"] = str(guardrail_version)
+        return request, input_tokens
+
     def _parse_variant(self, variant: PromptVariant) -> AnthropicModelRequestBody:
         template_config = variant.templateConfiguration.chat
         inference_config = variant.inferenceConfiguration.text
@@ -131,15 +669,29 @@ class PromptInvocationService:
             top_p=inference_config.topP,
         )
 
+    def _fetch_prompt(self, version: Optional[int] = None):
+        if version is None:
+            return self._bedrock_agent.get_prompt(
+                promptIdentifier=self._get_prompt_id()
+            )
+        else:
+            return self._bedrock_agent.get_prompt(
+                promptIdentifier=self._get_prompt_id(),
+                promptVersion=str(version),
+            )
+
     def _is_prompt_created(self) -> bool:
-        prompts = self._bedrock_agent.list_prompts().get("promptSummaries")
-        for prompt in prompts:
-            if prompt.get("name") == self._prompt_name:
-                return True
-        return False
+        return self._get_prompt_summary() is not None
 
     def _get_prompt_id(self) -> str:
-        prompts = self._bedrock_agent.list_prompts().get("promptSummaries")
-        test_prompt = [p for p in prompts if p.get("name") == self._prompt_name]
-        assert test_prompt, f"Prompt with name '{self._prompt_name}' doesn't exist"
-        return test_prompt[0].get("id")
+        summary = self._get_prompt_summary()
+        assert summary, f"Prompt with name '{self._prompt_name}' doesn't exist"
+        return summary.get("id")
+
+    def _get_prompt_summary(self) -> Optional[Dict[str, Any]]:
+        summary = self._resolution_cache.get(self._resolution_key)
+        if summary is None:
+            summary = find_summary(self._bedrock_agent, self._prompt_name)
+            if summary is not None:
+                self._resolution_cache.put(self._resolution_key, summary)
+        return summary
@@ -1,12 +1,23 @@
 import boto3
 import pandas as pd
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any
 from bedrock_snippet.models.prompt import *
 from bedrock_snippet.models.request import (
     CreatePromptRequest,
     CreatePromptVersionRequest,
     UpdatePromptRequest,
 )
+from bedrock_snippet.services.snapshot_store import PromptSnapshotStore
+from bedrock_snippet.services.client_pool import ClientPool, default_client_pool
+from bedrock_snippet.services.instrumentation import Instrumentation
+from bedrock_snippet.services.resolution import (
+    ResolutionCache,
+    default_resolution_cache,
+    find_summary,
+    iter_summaries,
+    resolution_key,
+)
 
 
 class PromptManagementService:
@@ -14,11 +25,32 @@ class PromptManagementService:
     Method for CRUD operations on prompt object with certain name
     """
 
-    def __init__(self, prompt_name: str, session: boto3.Session):
+    def __init__(
+        self,
+        prompt_name: str,
+        session: boto3.Session,
+        resolution_cache: Optional[ResolutionCache] = None,
+        client_pool: Optional[ClientPool] = None,
+        snapshot_store: Optional[PromptSnapshotStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         self._prompt_name = prompt_name
         self._session = session
         self._default_variant = f"{prompt_name}-variant"
-        self._client = session.client("bedrock-agent")
+        self._client_pool = (
+            client_pool if client_pool is not None else default_client_pool
+        )
+        self._client = self._client_pool.client(session, "bedrock-agent")
+        self._instrumentation = instrumentation
+        if instrumentation is not None:
+            instrumentation.attach(self._client)
+        self._snapshot_store = snapshot_store
+        self._resolution_cache = (
+            resolution_cache
+            if resolution_cache is not None
+            else default_resolution_cache
+        )
+        self._resolution_key = resolution_key(session, "bedrock-agent", prompt_name)
 
     def create_prompt(
         self,
@@ -55,7 +87,17 @@ class PromptManagementService:
             variants=[variant],
             defaultVariant=self._default_variant,
         )
-        self._client.create_prompt(**request.model_dump(exclude_none=True))
+        response = self._client.create_prompt(**request.model_dump(exclude_none=True))
+        self._resolution_cache.put(
+            self._resolution_key,
+            {
+                "name": self._prompt_name,
+                "id": response.get("id"),
+                "arn": response.get("arn"),
+                "version": response.get("version"),
+                "updatedAt": response.get("updatedAt"),
+            },
+        )
 
     def create_prompt_version(
         self, description: Optional[str] = None, tags: Optional[dict[str, str]] = None
@@ -68,47 +110,41 @@ class PromptManagementService:
 
     def get_prompt(self, version: Optional[int] = None):
         assert self._is_prompt_created(), f"Prompt '{self._prompt_name}' is not created"
-        if version is None:
-            return self._client.get_prompt(promptIdentifier=self._get_prompt_id())
-        else:
+        if version is not None:
             assert version > 0, "Prompt version must be greater than 0"
-            return self._client.get_prompt(
-                promptIdentifier=self._get_prompt_id(),
-                promptVersion=str(version),
+        if self._snapshot_store is not None:
+            return self._snapshot_store.get(
+                self._get_prompt_summary(), version, lambda: self._fetch_prompt(version)
             )
+        return self._fetch_prompt(version)
 
-    def list_available_prompt_versions(self):
-        result = []
-        version = 0
-        prompt_info = self.get_prompt()
-        prompt_arn = prompt_info.get("arn")
-        resource_info = self._client.list_tags_for_resource(resourceArn=prompt_arn)
-        result.append(
+    def list_available_prompt_versions(self, max_workers: int = 8):
+        """
+        Versions are discovered with a single (paginated) version listing, then variants and tags of
+        every version are fetched concurrently. Result is ordered as DRAFT, 1, 2, ...
+        """
+        summary = self._get_prompt_summary()
+        assert summary, f"Prompt '{self._prompt_name}' is not created"
+        prompt_id, prompt_arn = summary.get("id"), summary.get("arn")
+        versions = sorted(
             {
-                "version": "DRAFT",
-                "variant": prompt_info.get("variants")[0],
-                "tags": resource_info.get("tags"),
+                s.get("version")
+                for s in iter_summaries(self._client, promptIdentifier=prompt_id)
             }
+            | {"DRAFT"},
+            key=lambda v: 0 if v == "DRAFT" else int(v),
         )
-        while True:
-            version += 1
-            try:
-                prompt_info = self.get_prompt(version)
-                resource_info = self._client.list_tags_for_resource(
-                    resourceArn=f"{prompt_arn}:{version}"
-                )
-                result.append(
-                    {
-                        "version": str(version),
-                        "variant": prompt_info.get("variants")[0],
-                        "tags": resource_info.get("tags"),
-                    }
-                )
-            except self._client.exceptions.ResourceNotFoundException:
-                return result
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            result = executor.map(
+                lambda v: self._describe_prompt_version(prompt_id, prompt_arn, v),
+                versions,
+            )
+            return [version_info for version_info in result if version_info is not None]
 
     def list_available_foundation_models(self) -> pd.DataFrame:
-        bedrock_client = self._session.client("bedrock")
+        bedrock_client = self._client_pool.client(self._session, "bedrock")
+        if self._instrumentation is not None:
+            self._instrumentation.attach(bedrock_client)
         models = bedrock_client.list_foundation_models().get("modelSummaries")
         models = pd.DataFrame(models)
         return models[["modelId", "inputModalities", "outputModalities"]]
@@ -126,7 +162,9 @@ class PromptManagementService:
         input_variables: Optional[list[dict[str, str]]] = None,
         stop_sequences: Optional[list[str]] = None,
     ):
-        prompt_info = self.get_prompt()
+        # a stored DRAFT may be one resolution TTL stale, and merging onto it would undo other edits
+        assert self._is_prompt_created(), f"Prompt '{self._prompt_name}' is not created"
+        prompt_info = self._fetch_prompt()
         existing_variant = PromptVariant(**prompt_info.get("variants")[0])
         prompt_config = self._update_prompt_template_config(
             prompt_config=existing_variant.templateConfiguration,
@@ -165,10 +203,15 @@ class PromptManagementService:
             variants=[variant],
             defaultVariant=self._default_variant,
         )
-        self._client.update_prompt(**request.model_dump(exclude_none=True))
+        response = self._client.update_prompt(**request.model_dump(exclude_none=True))
+        # cached summary carries the previous updatedAt of the DRAFT
+        self._resolution_cache.invalidate(self._resolution_key)
+        if self._snapshot_store is not None:
+            self._snapshot_store.save(response, "DRAFT")
 
     def delete_prompt(self):
         self._client.delete_prompt(promptIdentifier=self._get_prompt_id())
+        self._resolution_cache.invalidate(self._resolution_key)
 
     def _create_prompt_template_config(
         self,
@@ -258,15 +301,50 @@ class PromptManagementService:
         )
         return PromptInferenceConfiguration(text=inference_config)
 
+    def _describe_prompt_version(
+        self, prompt_id: str, prompt_arn: str, version: str
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            if version == "DRAFT":
+                prompt_info = self._client.get_prompt(promptIdentifier=prompt_id)
+                resource_arn = prompt_arn
+            else:
+                prompt_info = self._client.get_prompt(
+                    promptIdentifier=prompt_id, promptVersion=version
+                )
+                resource_arn = f"{prompt_arn}:{version}"
+            resource_info = self._client.list_tags_for_resource(
+                resourceArn=resource_arn
+            )
+        except self._client.exceptions.ResourceNotFoundException:
+            return None  # version deleted after it was listed
+        return {
+            "version": version,
+            "variant": prompt_info.get("variants")[0],
+            "tags": resource_info.get("tags"),
+        }
+
+    def _fetch_prompt(self, version: Optional[int] = None):
+        if version is None:
+            return self._client.get_prompt(promptIdentifier=self._get_prompt_id())
+        else:
+            return self._client.get_prompt(
+                promptIdentifier=self._get_prompt_id(),
+                promptVersion=str(version),
+            )
+
     def _is_prompt_created(self) -> bool:
-        prompts = self._client.list_prompts().get("promptSummaries")
-        for prompt in prompts:
-            if prompt.get("name") == self._prompt_name:
-                return True
-        return False
+        return self._get_prompt_summary() is not None
 
     def _get_prompt_id(self) -> str:
-        prompts = self._client.list_prompts().get("promptSummaries")
-        test_prompt = [p for p in prompts if p.get("name") == self._prompt_name]
-        assert test_prompt, f"Prompt with name '{self._prompt_name}' doesn't exist"
-        return test_prompt[0].get("id")
+        summary = self._get_prompt_summary()
+        assert summary, f"Prompt with name '{self._prompt_name}' doesn't exist"
+        return summary.get("id")
+
+    def _get_prompt_summary(self) -> Optional[Dict[str, Any]]:
+        summary = self._resolution_cache.get(self._resolution_key)
+        if summary is None:
+            summary = find_summary(self._client, self._prompt_name)
+            if summary is not None:
+                self._resolution_cache.put(self._resolution_key, summary)
+        return summary
@@ -0,0 +1,93 @@
+import re
+from typing import Dict, List, Set, Any, Optional
+from bedrock_snippet.models.prompt import PromptVariant
+from bedrock_snippet.models.request import AnthropicModelRequestBody
+
+VARIABLE_PATTERN = re.compile(r"\{\{([0-9a-zA-Z_-]+)\}\}")
+
+
+class CompiledTemplate:
+    """
+    `{{variable}}` template split once into alternating literals and variable names, so rendering is a single
+    join without any regular expression work.
+    """
+
+    def __init__(self, template: str):
+        parts = VARIABLE_PATTERN.split(template)
+        self.literals: List[str] = parts[0::2]
+        self.variables: List[str] = parts[1::2]
+
+    def render(self, values: Dict[str, str]) -> str:
+        if not self.variables:
+            return self.literals[0]
+        pieces = [self.literals[0]]
+        for variable, literal in zip(self.variables, self.literals[1:]):
+            pieces.append(values[variable])
+            pieces.append(literal)
+        return "".join(pieces)
+
+
+class PromptRenderer:
+    """
+    Compiles a CHAT prompt variant into substitution plans, to build the Anthropic request body locally and
+    invoke the variant's model directly instead of resolving the prompt ARN on server side.
+    Variables used in the template must be declared in `inputVariables`.
+    """
+
+    def __init__(self, variant: PromptVariant):
+        chat = variant.templateConfiguration.chat
+        self.required_variables: Set[str] = {v.name for v in chat.inputVariables}
+        self._messages = [
+            (message.role, [CompiledTemplate(c.text) for c in message.content])
+            for message in chat.messages
+        ]
+        self._system = [CompiledTemplate(s.text) for s in chat.system or []]
+        used_variables = {
+            variable
+            for template in self._templates()
+            for variable in template.variables
+        }
+        undeclared_variables = used_variables.difference(self.required_variables)
+        if undeclared_variables:
+            raise ValueError(
+                f"Template variables ({undeclared_variables}) are not declared as input variables"
+            )
+        inference_config = variant.inferenceConfiguration.text
+        additional_fields = variant.additionalModelRequestFields or {}
+        self._inference_params: Dict[str, Any] = {
+            "max_tokens": inference_config.maxTokens,
+            "stop_sequences": inference_config.stopSequences,
+            "temperature": inference_config.temperature,
+            "top_p": inference_config.topP,
+            "top_k": additional_fields.get("top_k"),
+        }
+
+    def render(
+        self,
+        prompt_variables: Dict[str, str],
+        inference_overrides: Optional[Dict[str, Any]] = None,
+    ) -> AnthropicModelRequestBody:
+        missing_variables = self.required_variables.difference(prompt_variables)
+        if missing_variables:
+            raise ValueError(f"Value for ({missing_variables}) is missing")
+        # plain dicts are validated in a single pydantic-core pass, faster than building nested models
+        messages = [
+            {
+                "role": role,
+                "content": [
+                    {"type": "text", "text": template.render(prompt_variables)}
+                    for template in templates
+                ],
+            }
+            for role, templates in self._messages
+        ]
+        system = "\n".join(t.render(prompt_variables) for t in self._system)
+        params = {k: v for k, v in self._inference_params.items() if v is not None}
+        if inference_overrides:
+            params.update(inference_overrides)
+        return AnthropicModelRequestBody(
+            system=system or None, messages=messages, **params
+        )
+
+    def _templates(self) -> List[CompiledTemplate]:
+        return self._system + [t for _, templates in self._messages for t in templates]
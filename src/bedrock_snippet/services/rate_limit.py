@@ -0,0 +1,246 @@
+import random
+import threading
+import time
+from typing import Optional, Dict, Any, Callable
+from botocore.exceptions import ClientError
+
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "InternalServerException",
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_minute`. The balance may go negative when
+    actual usage is charged after the fact, which delays following acquisitions accordingly.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        assert rate_per_minute > 0, "Rate must be greater than 0"
+        self._rate = rate_per_minute / 60.0
+        self._capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        amount = min(amount, self._capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self._rate
+            time.sleep(wait)
+
+    def charge(self, amount: float):
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency cap adjusted with AIMD: the limit grows by one every `limit` successful calls and is
+    multiplied by `backoff` on every throttled call.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        backoff: float = 0.5,
+    ):
+        assert (
+            0 < minimum <= initial <= maximum
+        ), "Expected minimum <= initial <= maximum"
+        assert 0 < backoff < 1, "Backoff must be between 0 and 1"
+        self.limit = float(initial)
+        self._minimum = minimum
+        self._maximum = maximum
+        self._backoff = backoff
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, throttled: bool = False, succeeded: bool = True):
+        """
+        Only successful calls raise the limit; other failures leave it unchanged.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self.limit = max(self._minimum, self.limit * self._backoff)
+            elif succeeded:
+                self.limit = min(self._maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class _ModelBudget:
+    def __init__(
+        self,
+        requests_per_minute: Optional[float],
+        tokens_per_minute: Optional[float],
+        concurrency: AdaptiveConcurrency,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = concurrency
+        self.metrics = {
+            "calls": 0,
+            "retries": 0,
+            "throttles": 0,
+            "queued_seconds": 0.0,
+            "service_seconds": 0.0,
+        }
+
+
+class RateLimiter:
+    """
+    Client-side limiter for Bedrock runtime calls. Every modelId gets its own requests-per-minute and
+    tokens-per-minute budget and an adaptive concurrency cap. Throttling and 5xx errors are retried with
+    full-jitter exponential backoff. Time spent waiting for budget (queued) and inside the API call (service)
+    is recorded per modelId.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 64,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+    ):
+        assert max_attempts > 0, "Max attempts must be greater than 0"
+        self._requests_per_minute = requests_per_minute
+        self._tokens_per_minute = tokens_per_minute
+        self._initial_concurrency = initial_concurrency
+        self._max_concurrency = max_concurrency
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._budgets: Dict[str, _ModelBudget] = {}
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        model_id: str,
+        operation: Callable[..., Dict[str, Any]],
+        estimated_tokens: int = 0,
+        max_attempts: Optional[int] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Call `operation` with the keyword arguments within the budget of `model_id`. `max_attempts` overrides
+        the limiter's for this call, e.g. 1 to leave retries to an InvocationRouter.
+        """
+        budget = self._budget(model_id)
+        max_attempts = max_attempts if max_attempts is not None else self._max_attempts
+        for attempt in range(1, max_attempts + 1):
+            queued_at = time.perf_counter()
+            if budget.requests is not None:
+                budget.requests.acquire()
+            if budget.tokens is not None and estimated_tokens > 0:
+                budget.tokens.acquire(estimated_tokens)
+            budget.concurrency.acquire()
+            started_at = time.perf_counter()
+            throttled = False
+            succeeded = False
+            try:
+                response = operation(**kwargs)
+                succeeded = True
+            except ClientError as e:
+                throttled = self.is_retryable(e)
+                if not throttled or attempt == max_attempts:
+                    raise
+            finally:
+                budget.concurrency.release(throttled, succeeded)
+                self._record(budget, queued_at, started_at, attempt, throttled)
+            if not throttled:
+                used_tokens = self._used_tokens(response)
+                if budget.tokens is not None and used_tokens is not None:
+                    budget.tokens.charge(used_tokens - estimated_tokens)
+                return response
+            delay = min(self._max_delay, self._base_delay * 2 ** (attempt - 1))
+            time.sleep(random.uniform(0, delay))
+
+    def charge(self, model_id: str, used_tokens: int, estimated_tokens: int = 0):
+        """
+        Correct the token budget of `model_id` once the tokens used by a call are known, e.g. from the usage of
+        an exhausted stream.
+        """
+        budget = self._budget(model_id)
+        if budget.tokens is not None:
+            budget.tokens.charge(used_tokens - estimated_tokens)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                model_id: {**budget.metrics, "concurrency": budget.concurrency.limit}
+                for model_id, budget in self._budgets.items()
+            }
+
+    @staticmethod
+    def is_retryable(error: ClientError) -> bool:
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        code = error.response.get("Error", {}).get("Code")
+        return code in RETRYABLE_ERROR_CODES or status == 429 or status >= 500
+
+    def _budget(self, model_id: str) -> _ModelBudget:
+        with self._lock:
+            if model_id not in self._budgets:
+                self._budgets[model_id] = _ModelBudget(
+                    self._requests_per_minute,
+                    self._tokens_per_minute,
+                    AdaptiveConcurrency(
+                        self._initial_concurrency, maximum=self._max_concurrency
+                    ),
+                )
+            return self._budgets[model_id]
+
+    def _record(
+        self,
+        budget: _ModelBudget,
+        queued_at: float,
+        started_at: float,
+        attempt: int,
+        throttled: bool,
+    ):
+        finished_at = time.perf_counter()
+        with self._lock:
+            budget.metrics["calls"] += 1
+            budget.metrics["retries"] += attempt > 1
+            budget.metrics["throttles"] += throttled
+            budget.metrics["queued_seconds"] += started_at - queued_at
+            budget.metrics["service_seconds"] += finished_at - started_at
+
+    @staticmethod
+    def _used_tokens(response: Dict[str, Any]) -> Optional[int]:
+        headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+        if "x-amzn-bedrock-input-token-count" not in headers:
+            return None  # e.g. streaming responses, keep the estimate
+        return int(headers.get("x-amzn-bedrock-input-token-count")) + int(
+            headers.get("x-amzn-bedrock-output-token-count", 0)
+        )
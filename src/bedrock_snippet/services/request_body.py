@@ -0,0 +1,82 @@
+import json
+from bedrock_snippet.models.prompt import AnthropicContentBlock, AnthropicImageContent
+from bedrock_snippet.models.request import AnthropicModelRequestBody
+from bedrock_snippet.services.image_encoding import write_base64
+
+_MESSAGES_KEY = b'"messages":['
+
+
+class RequestBodyTemplate:
+    """
+    Default request body serialized once and split where new content blocks of the first message go.
+    The template is immutable, so any number of threads can build request bodies from it concurrently.
+    """
+
+    def __init__(self, body: AnthropicModelRequestBody):
+        serialized = body.model_dump_json(exclude_none=True).encode("utf8")
+        message = body.messages[0].model_dump_json(exclude_none=True).encode("utf8")
+        # quotes within string values are escaped, so the key only matches the messages field itself
+        start = serialized.index(_MESSAGES_KEY) + len(_MESSAGES_KEY)
+        assert serialized.startswith(message, start), "Unexpected body serialization"
+        # content is the last field of a message, so its blocks end right before the closing `]}`
+        end = start + len(message) - len(b"]}")
+        self.has_content = len(body.messages[0].content) > 0
+        self.prefix = serialized[:end]
+        self.suffix = serialized[end:]
+
+    def builder(self) -> "RequestBodyBuilder":
+        return RequestBodyBuilder(self)
+
+
+class RequestBodyBuilder:
+    """
+    Appends content blocks to the first message of a RequestBodyTemplate, writing straight into the body buffer.
+    """
+
+    def __init__(self, template: RequestBodyTemplate):
+        self._template = template
+        self._body = bytearray(template.prefix)
+        self._has_content = template.has_content
+
+    def add_block(self, block: AnthropicContentBlock) -> "RequestBodyBuilder":
+        self._separate()
+        self._body += block.model_dump_json(exclude_none=True).encode("utf8")
+        return self
+
+    def add_text(self, text: str) -> "RequestBodyBuilder":
+        self._separate()
+        write_text_block(text, self._body)
+        return self
+
+    def add_image(self, image, media_type: str) -> "RequestBodyBuilder":
+        """
+        `image` is a memoryview or file-like object as provided by `image_encoding.open_image`.
+        """
+        self._separate()
+        write_image_block(image, media_type, self._body)
+        return self
+
+    def build(self) -> bytearray:
+        body, self._body = self._body, bytearray()
+        body += self._template.suffix
+        return body
+
+    def _separate(self):
+        if self._has_content:
+            self._body += b","
+        self._has_content = True
+
+
+def write_text_block(text: str, out: bytearray):
+    out += b'{"type":"text","text":'
+    out += json.dumps(text).encode("utf8")
+    out += b"}"
+
+
+def write_image_block(image, media_type: str, out: bytearray):
+    AnthropicImageContent(media_type=media_type, data="")  # validate media type
+    out += b'{"type":"image","source":{"type":"base64","media_type":'
+    out += json.dumps(media_type).encode("utf8")
+    out += b',"data":"'
+    write_base64(image, out)
+    out += b'"}}'
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Iterator, Iterable
+import boto3
+
+ResolutionKey = Tuple[Optional[str], Optional[str], str, str]
+
+# (list operation, result key) used to resolve resource names per service
+LISTING_OPERATIONS = {
+    "bedrock-agent": ("list_prompts", "promptSummaries"),
+    "bedrock": ("list_guardrails", "guardrails"),
+}
+
+
+class ResolutionCache:
+    """
+    Thread-safe cache from resource name to its summary (id, arn, ...) returned by list APIs.
+    Entries are scoped per credentials/region/service, expire after `ttl` seconds and the least recently
+    used entry is evicted once `max_size` is reached. Only positive lookups are cached.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_size: int = 1024):
+        assert ttl > 0, "TTL must be greater than 0"
+        assert max_size > 0, "Max size must be greater than 0"
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[ResolutionKey, Tuple[float, Dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: ResolutionKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: ResolutionKey, summary: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, summary)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def put_many(self, items: Iterable[Tuple[ResolutionKey, Dict[str, Any]]]) -> int:
+        """
+        Store the first `max_size` items, evicting least recently used entries as needed; the rest would only
+        evict the ones stored before them. Returns the number of items stored.
+        """
+        with self._lock:
+            expires_at = time.monotonic() + self._ttl
+            stored = 0
+            for key, summary in items:
+                if stored == self._max_size:
+                    break
+                self._entries[key] = (expires_at, summary)
+                self._entries.move_to_end(key)
+                stored += 1
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+            return stored
+
+    def invalidate(self, key: ResolutionKey):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+default_resolution_cache = ResolutionCache()
+
+
+def resolution_key(
+    session: boto3.Session, service_name: str, resource_name: str
+) -> ResolutionKey:
+    credentials = session.get_credentials()
+    access_key = credentials.access_key if credentials is not None else None
+    return access_key, session.region_name, service_name, resource_name
+
+
+def iter_summaries(client, **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield resource summaries across all pages. Following pages are only requested when consumed.
+    """
+    operation_name, result_key = LISTING_OPERATIONS[
+        client.meta.service_model.service_name
+    ]
+    paginator = client.get_paginator(operation_name)
+    for page in paginator.paginate(**kwargs):
+        yield from page.get(result_key, [])
+
+
+def find_summary(client, resource_name: str) -> Optional[Dict[str, Any]]:
+    return next(
+        (s for s in iter_summaries(client) if s.get("name") == resource_name), None
+    )
+
+
+def index_summaries(client) -> Dict[str, Dict[str, Any]]:
+    return {summary.get("name"): summary for summary in iter_summaries(client)}
+
+
+def warm_resolution_cache(
+    session: boto3.Session, client, cache: Optional[ResolutionCache] = None
+) -> int:
+    """
+    Resolve every resource of the client's service in a single listing pass and store them in the cache, up to
+    its `max_size`; pass a cache sized for the whole index to hold all of them. Returns the number of resources
+    cached.
+    """
+    cache = cache if cache is not None else default_resolution_cache
+    service_name = client.meta.service_model.service_name
+    return cache.put_many(
+        (resolution_key(session, service_name, name), summary)
+        for name, summary in index_summaries(client).items()
+    )
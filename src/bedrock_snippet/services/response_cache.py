@@ -0,0 +1,196 @@
+import abc
+import hashlib
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+
+def request_cache_key(request: Dict[str, Any]) -> str:
+    """
+    Canonical hash of an invocation request (model or prompt ARN, body, guardrail settings, ...).
+    Binary bodies are represented by their digest.
+    """
+    canonical = json.dumps(
+        request, sort_keys=True, separators=(",", ":"), default=_canonical_value
+    )
+    return hashlib.sha256(canonical.encode("utf8")).hexdigest()
+
+
+def _canonical_value(value: Any) -> str:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(value).hexdigest()
+    return str(value)
+
+
+class ResponseCache(abc.ABC):
+    """
+    Base class of invocation response caches. Values are raw response bodies, so every hit is decoded into a
+    fresh object and callers can't corrupt cached entries.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 10000):
+        assert ttl is None or ttl > 0, "TTL must be greater than 0"
+        assert max_entries > 0, "Max entries must be greater than 0"
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key: str, value: bytes):
+        expires_at = time.time() + self._ttl if self._ttl is not None else None
+        self._put(key, value, expires_at)
+
+    def hit_rate(self) -> float:
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return self.hits / total if total > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[bytes]: ...
+
+    @abc.abstractmethod
+    def _put(self, key: str, value: bytes, expires_at: Optional[float]): ...
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    In-process LRU cache bounded by entry count and total size of cached bodies.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        super().__init__(ttl, max_entries)
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._entries: OrderedDict[str, Tuple[Optional[float], bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **super().stats(),
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _put(self, key: str, value: bytes, expires_at: Optional[float]):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value)
+            self._size += len(value)
+            while (
+                len(self._entries) > self._max_entries or self._size > self._max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+
+class SqliteResponseCache(ResponseCache):
+    """
+    On-disk cache shared by every process pointing at the same file. Least recently used entries beyond
+    `max_entries` are evicted in batches, so the table may briefly exceed the limit by about 1%.
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        ttl: Optional[float] = None,
+        max_entries: int = 100000,
+    ):
+        super().__init__(ttl, max_entries)
+        self._lock = threading.Lock()
+        self._eviction_interval = max(1, max_entries // 100)
+        self._puts_since_eviction = 0
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()
+        return {**super().stats(), "entries": entries}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return bytes(value)
+
+    def _put(self, key: str, value: bytes, expires_at: Optional[float]):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            self._puts_since_eviction += 1
+            if self._puts_since_eviction < self._eviction_interval:
+                return
+            self._puts_since_eviction = 0
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self._max_entries,),
+            )
@@ -0,0 +1,91 @@
+import json
+from typing import Iterator, Dict, Optional, Any, Callable
+
+
+class InvocationStream:
+    """
+    Iterator over text deltas of an Anthropic model response returned by `invoke_model_with_response_stream`.
+    Stop reason, token usage and guardrail action are filled in as the corresponding events arrive, so they are
+    complete once the stream is exhausted. The stream can only be consumed once. `on_complete` is called with the
+    stream once it is exhausted.
+    """
+
+    def __init__(
+        self,
+        response: Dict[str, Any],
+        on_complete: Optional[Callable[["InvocationStream"], None]] = None,
+    ):
+        self._events = response.get("body")
+        self._on_complete = on_complete
+        self.stop_reason: Optional[str] = None
+        self.usage: Dict[str, int] = {}
+        self.guardrail_action: Optional[str] = None
+        self.invocation_metrics: Optional[Dict[str, Any]] = None
+
+    def __iter__(self) -> Iterator[str]:
+        for event in self._events:
+            chunk = event.get("chunk")
+            if chunk is None:
+                continue
+            payload = json.loads(chunk.get("bytes"))
+            self.guardrail_action = payload.get(
+                "amazon-bedrock-guardrailAction", self.guardrail_action
+            )
+            event_type = payload.get("type")
+            if event_type == "content_block_delta":
+                delta = payload.get("delta")
+                if delta.get("type") == "text_delta":
+                    yield delta.get("text")
+            elif event_type == "message_start":
+                self.usage.update(payload.get("message").get("usage", {}))
+            elif event_type == "message_delta":
+                self.stop_reason = payload.get("delta").get("stop_reason")
+                self.usage.update(payload.get("usage", {}))
+            elif event_type == "message_stop":
+                self.invocation_metrics = payload.get(
+                    "amazon-bedrock-invocationMetrics"
+                )
+        if self._on_complete is not None:
+            self._on_complete(self)
+
+    def text(self) -> str:
+        return "".join(self)
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> "InvocationStream":
+        """
+        Stream replaying a complete `invoke_model` response body, e.g. one answered locally.
+        """
+        usage = result.get("usage") or {}
+        events = [
+            {
+                "type": "message_start",
+                "message": {
+                    "role": result.get("role"),
+                    "usage": {"input_tokens": usage.get("input_tokens", 0)},
+                },
+            },
+            *(
+                {
+                    "type": "content_block_delta",
+                    "index": index,
+                    "delta": {"type": "text_delta", "text": block.get("text")},
+                }
+                for index, block in enumerate(result.get("content") or [])
+                if block.get("type") == "text"
+            ),
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": result.get("stop_reason")},
+                "usage": {"output_tokens": usage.get("output_tokens", 0)},
+            },
+            {
+                "type": "message_stop",
+                "amazon-bedrock-guardrailAction": result.get(
+                    "amazon-bedrock-guardrailAction"
+                ),
+            },
+        ]
+        return cls(
+            {"body": [{"chunk": {"bytes": json.dumps(e).encode()}} for e in events]}
+        )
@@ -0,0 +1,195 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Callable
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+from bedrock_snippet.services.client_pool import ClientPool, default_client_pool
+from bedrock_snippet.services.rate_limit import RateLimiter
+
+# failover replaces botocore's own retries, so that a throttled target is left on the first error
+DEFAULT_ROUTER_CONFIG = Config(retries={"mode": "standard", "total_max_attempts": 1})
+
+Operation = Callable[..., Dict[str, Any]]
+Invoke = Callable[[Operation, Dict[str, Any]], Dict[str, Any]]
+
+
+@dataclass
+class _Target:
+    region_name: str
+    model_id: str
+    client: Any
+    latency: Optional[float] = None
+    calls: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+
+
+class _TimedOperation:
+    """
+    Client operation recording the duration of its last call, so that time queued in front of it (e.g. in a
+    RateLimiter) isn't counted as the target's latency.
+    """
+
+    __slots__ = ("_operation", "elapsed")
+
+    def __init__(self, operation: Operation):
+        self._operation = operation
+        self.elapsed = 0.0
+
+    def __call__(self, **params) -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        try:
+            return self._operation(**params)
+        finally:
+            self.elapsed = time.perf_counter() - started_at
+
+
+class InvocationRouter:
+    """
+    Routes runtime calls across an ordered list of (region, modelId or inference profile) targets. Each call goes to
+    the healthy target with the lowest latency EWMA and fails over to the next target on throttling, 5xx and
+    connection errors. Targets without a known latency, i.e. untried ones and ones recovered from a failure, are
+    probed first, in their order. A failing target is skipped for `cooldown` seconds, doubling with consecutive
+    failures up to `max_cooldown`; if every target is cooling down, the one recovering first is tried anyway.
+    Every region gets a pooled runtime client, without botocore retries so that failover is immediate.
+
+    For streams, latency and failover cover the call up to the start of the response, not the stream itself.
+    Guardrails are regional resources, so requests with a guardrail should only be routed within its region.
+    """
+
+    def __init__(
+        self,
+        session: boto3.Session,
+        targets: Iterable[Tuple[str, str]],
+        client_pool: Optional[ClientPool] = None,
+        client_config: Optional[Config] = None,
+        alpha: float = 0.2,
+        cooldown: float = 5.0,
+        max_cooldown: float = 300.0,
+    ):
+        assert 0 < alpha <= 1, "Alpha must be in (0, 1]"
+        assert 0 < cooldown <= max_cooldown, "Cooldown must be in (0, max_cooldown]"
+        client_pool = client_pool if client_pool is not None else default_client_pool
+        client_config = (
+            DEFAULT_ROUTER_CONFIG.merge(client_config)
+            if client_config is not None
+            else DEFAULT_ROUTER_CONFIG
+        )
+        self._targets = [
+            _Target(
+                region_name,
+                model_id,
+                client_pool.client(
+                    session, "bedrock-runtime", client_config, region_name
+                ),
+            )
+            for region_name, model_id in targets
+        ]
+        assert self._targets, "At least one target is required"
+        self._alpha = alpha
+        self._cooldown = cooldown
+        self._max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        operation_name: str,
+        request: Dict[str, Any],
+        invoke: Optional[Invoke] = None,
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Call `operation_name` with the request parameters, replacing `modelId` with the chosen target's. Returns
+        the response and the modelId of the target that served it.
+        `invoke(operation, params)` performs the call, e.g. through a RateLimiter; it should make a single attempt,
+        so that errors reach the router and fail over right away.
+        """
+        last_error = None
+        for target in self._candidates():
+            params = {**request, "modelId": target.model_id}
+            operation = _TimedOperation(getattr(target.client, operation_name))
+            try:
+                if invoke is None:
+                    response = operation(**params)
+                else:
+                    response = invoke(operation, params)
+            except ClientError as e:
+                if not RateLimiter.is_retryable(e):
+                    raise
+                self._record_failure(target)
+                last_error = e
+                continue
+            except (ConnectionError, HTTPClientError) as e:
+                self._record_failure(target)
+                last_error = e
+                continue
+            self._record_success(target, operation.elapsed)
+            return response, target.model_id
+        raise last_error
+
+    @property
+    def clients(self) -> List[Any]:
+        """
+        The runtime client of every region, e.g. to attach an Instrumentation to.
+        """
+        clients = []
+        for target in self._targets:
+            if all(client is not target.client for client in clients):
+                clients.append(target.client)
+        return clients
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "region_name": target.region_name,
+                    "model_id": target.model_id,
+                    "healthy": target.unhealthy_until <= now,
+                    "latency": target.latency,
+                    "calls": target.calls,
+                    "failures": target.failures,
+                }
+                for target in self._targets
+            ]
+
+    def _candidates(self) -> List[_Target]:
+        now = time.monotonic()
+        with self._lock:
+            healthy = [
+                (t.latency is not None, t.latency or 0.0, index, t)
+                for index, t in enumerate(self._targets)
+                if t.unhealthy_until <= now
+            ]
+            cooling = [
+                (t.unhealthy_until, index, t)
+                for index, t in enumerate(self._targets)
+                if t.unhealthy_until > now
+            ]
+        return [t for *_, t in sorted(healthy)] + [t for *_, t in sorted(cooling)]
+
+    def _record_success(self, target: _Target, latency: float):
+        with self._lock:
+            target.calls += 1
+            target.consecutive_failures = 0
+            target.unhealthy_until = 0.0
+            target.latency = (
+                latency
+                if target.latency is None
+                else self._alpha * latency + (1 - self._alpha) * target.latency
+            )
+
+    def _record_failure(self, target: _Target):
+        with self._lock:
+            target.calls += 1
+            target.failures += 1
+            target.consecutive_failures += 1
+            # measured again once it has recovered
+            target.latency = None
+            cooldown = min(
+                self._max_cooldown,
+                self._cooldown * 2 ** (target.consecutive_failures - 1),
+            )
+            target.unhealthy_until = time.monotonic() + cooldown
@@ -0,0 +1,75 @@
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from typing import Optional, Dict, Any, Callable, Tuple
+
+
+class PromptSnapshotStore:
+    """
+    Directory of prompt definitions (`get_prompt` responses) shared by worker processes, laid out as
+    `<root>/<prompt id>/<version>.json`. Numbered versions are immutable and never refetched once stored.
+    DRAFT snapshots are reused while their `updatedAt` matches the one of the prompt summary, which the services
+    take from their name resolution cache, so a DRAFT is at most one resolution TTL stale. Summaries without
+    `updatedAt` keep the stored DRAFT.
+    Timestamps in returned definitions are strings, as they went through JSON, and returned definitions are
+    shared within the process, so treat them as read-only.
+    """
+
+    def __init__(self, root: str | pathlib.Path):
+        self._root = pathlib.Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        # parsed snapshots of this process keyed by path, valid while file mtime is unchanged
+        self._parsed: Dict[pathlib.Path, Tuple[int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        summary: Dict[str, Any],
+        version: Optional[int],
+        fetch: Callable[[], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Return the stored snapshot of the prompt version if it's still current, otherwise `fetch` and store it.
+        """
+        version = "DRAFT" if version is None else str(version)
+        snapshot = self.load(summary.get("id"), version)
+        # a summary without updatedAt can't tell a stale DRAFT apart, so the snapshot is kept
+        if snapshot is not None and (
+            version != "DRAFT"
+            or summary.get("updatedAt") is None
+            or snapshot.get("updatedAt") == str(summary.get("updatedAt"))
+        ):
+            return snapshot
+        return self.save(fetch(), version)
+
+    def load(self, prompt_id: str, version: str) -> Optional[Dict[str, Any]]:
+        path = self._path(prompt_id, version)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            parsed = self._parsed.get(path)
+        if parsed is not None and parsed[0] == mtime:
+            return parsed[1]
+        snapshot = json.loads(path.read_bytes())
+        with self._lock:
+            self._parsed[path] = (mtime, snapshot)
+        return snapshot
+
+    def save(self, prompt_info: Dict[str, Any], version: str) -> Dict[str, Any]:
+        prompt_info = {k: v for k, v in prompt_info.items() if k != "ResponseMetadata"}
+        payload = json.dumps(prompt_info, default=str).encode("utf8")
+        path = self._path(prompt_info.get("id"), version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write then rename so that concurrent readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+        os.replace(temp_path, path)
+        return json.loads(payload)
+
+    def _path(self, prompt_id: str, version: str) -> pathlib.Path:
+        return self._root / prompt_id / f"{version}.json"
@@ -0,0 +1,205 @@
+import base64
+import math
+import struct
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+from bedrock_snippet.models.request import AnthropicModelRequestBody
+
+# images are downsized by the model to about 1.15 megapixels, i.e. at most ~1600 tokens (width * height / 750)
+IMAGE_TOKENS = 1600
+IMAGE_MAX_EDGE = 1568
+IMAGE_MAX_PIXELS = 1_150_000
+# bytes of an image read to find its dimensions, enough for JPEG frame headers after EXIF data
+IMAGE_HEADER_SIZE = 64 * 1024
+
+
+def estimate_text_tokens(text: str) -> int:
+    """
+    Local estimate of the tokens of a text, about 4 characters per token for English prose and code.
+    """
+    return len(text) // 4 + 1
+
+
+def image_dimensions(header: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Width and height from the leading bytes of a jpeg, png, gif or webp image, or None if not found.
+    """
+    if header.startswith(b"\x89PNG\r\n\x1a\n") and len(header) >= 24:
+        return struct.unpack(">II", header[16:24])
+    elif header[:6] in (b"GIF87a", b"GIF89a") and len(header) >= 10:
+        return struct.unpack("<HH", header[6:10])
+    elif header[:4] == b"RIFF" and header[8:12] == b"WEBP" and len(header) >= 30:
+        chunk = header[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", header[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        elif chunk == b"VP8L":
+            bits = int.from_bytes(header[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        elif chunk == b"VP8X":
+            return (
+                int.from_bytes(header[24:27], "little") + 1,
+                int.from_bytes(header[27:30], "little") + 1,
+            )
+    elif header.startswith(b"\xff\xd8"):
+        offset = 2
+        while offset + 9 <= len(header):
+            if header[offset] != 0xFF:
+                return None
+            marker = header[offset + 1]
+            # start of frame markers, except DHT (C4), JPG (C8) and DAC (CC)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", header[offset + 5 : offset + 9])
+                return width, height
+            offset += 2 + struct.unpack(">H", header[offset + 2 : offset + 4])[0]
+    return None
+
+
+def estimate_image_tokens(header: bytes, max_pixels: Optional[int] = None) -> int:
+    """
+    Tokens of an image after the model downsizes it to fit 1568 pixels per edge and about 1.15 megapixels.
+    Falls back to the upper bound if valid dimensions can't be read from `header`.
+    """
+    width, height = image_dimensions(header) or (0, 0)
+    if not width or not height:
+        return IMAGE_TOKENS
+    pixel_limit = min(IMAGE_MAX_PIXELS, max_pixels or IMAGE_MAX_PIXELS)
+    scale = min(
+        1.0,
+        IMAGE_MAX_EDGE / max(width, height),
+        math.sqrt(pixel_limit / (width * height)),
+    )
+    return min(IMAGE_TOKENS, math.ceil(width * height * scale * scale / 750))
+
+
+def estimate_body_tokens(body: AnthropicModelRequestBody) -> int:
+    """
+    Estimated input tokens of a request body: system prompt, text blocks and images.
+    """
+    tokens = estimate_text_tokens(body.system or "")
+    for message in body.messages:
+        for block in message.content:
+            if block.type == "text":
+                tokens += estimate_text_tokens(block.text)
+            else:
+                # base64 needs 4 characters per 3 bytes, and the dimensions are within the first few bytes
+                data = block.source.data
+                header = base64.b64decode(data[: IMAGE_HEADER_SIZE // 3 * 4])
+                tokens += estimate_image_tokens(header)
+    return tokens
+
+
+class TokenBudgetExceeded(ValueError):
+    pass
+
+
+class TokenBudget:
+    """
+    Pre-flight check that the estimated input tokens plus `max_tokens` of a request fit the model's
+    `context_window`. With `truncate`, `max_tokens` of locally rendered requests is lowered to the remaining
+    room instead of rejecting them, as long as at least `min_output_tokens` remain. Requests whose body is
+    serialized ahead (prompt variables, images, conversations) are always rejected.
+    """
+
+    def __init__(
+        self,
+        context_window: int = 200_000,
+        truncate: bool = False,
+        min_output_tokens: int = 1,
+    ):
+        assert context_window > 0, "Context window must be greater than 0"
+        assert min_output_tokens > 0, "Min output tokens must be greater than 0"
+        self.context_window = context_window
+        self.truncate = truncate
+        self.min_output_tokens = min_output_tokens
+
+    def fit(self, input_tokens: int, max_tokens: int, truncatable: bool = False) -> int:
+        """
+        `max_tokens` allowed for the request. Raises TokenBudgetExceeded if it doesn't fit.
+        """
+        room = self.context_window - input_tokens
+        if max_tokens <= room:
+            return max_tokens
+        if self.truncate and truncatable and room >= self.min_output_tokens:
+            return room
+        raise TokenBudgetExceeded(
+            f"Estimated {input_tokens} input tokens and max_tokens {max_tokens} exceed the context window of "
+            f"{self.context_window} tokens"
+        )
+
+    def check(self, input_tokens: int, max_tokens: int):
+        """
+        Raises TokenBudgetExceeded if a request whose body can't be changed anymore doesn't fit.
+        """
+        self.fit(input_tokens, max_tokens)
+
+
+class TokenAccountant:
+    """
+    Thread-safe totals of input and output tokens reported by model responses, per prompt name, prompt version
+    and model. With `prices` of model id to USD per million (input, output) tokens, costs are totalled too.
+    """
+
+    def __init__(self, prices: Optional[Dict[str, Tuple[float, float]]] = None):
+        self._prices = dict(prices or {})
+        self._lock = threading.Lock()
+        # (prompt name, version, model id) -> [calls, input tokens, output tokens]
+        self._totals: Dict[Tuple[str, str, str], List[int]] = {}
+
+    def record(
+        self,
+        prompt_name: str,
+        version: str,
+        model_id: str,
+        usage: Optional[Dict[str, int]],
+    ):
+        if not usage:
+            return
+        key = (prompt_name, version, model_id)
+        with self._lock:
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = [0, 0, 0]
+            totals[0] += 1
+            totals[1] += usage.get("input_tokens", 0)
+            totals[2] += usage.get("output_tokens", 0)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        One row per prompt name, version and model. Cost is None for models without a price.
+        """
+        with self._lock:
+            items = [(key, list(totals)) for key, totals in self._totals.items()]
+        rows = []
+        for (prompt_name, version, model_id), (
+            calls,
+            input_tokens,
+            output_tokens,
+        ) in items:
+            rows.append(
+                {
+                    "prompt_name": prompt_name,
+                    "version": version,
+                    "model_id": model_id,
+                    "calls": calls,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "cost": self.cost(model_id, input_tokens, output_tokens),
+                }
+            )
+        return rows
+
+    def cost(
+        self, model_id: str, input_tokens: int, output_tokens: int
+    ) -> Optional[float]:
+        price = self._prices.get(model_id)
+        if price is None:
+            return None
+        return (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+
+    def total_cost(self) -> float:
+        return sum(row["cost"] or 0.0 for row in self.summary())
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
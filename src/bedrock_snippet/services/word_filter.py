@@ -0,0 +1,153 @@
+from collections import deque
+from typing import Iterable, List, Optional, Dict, Any, Tuple
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class WordFilter:
+    """
+    Aho-Corasick automaton over case-folded words, finding every listed word or phrase in a single pass over
+    the text regardless of the number of words. Like `\\b` in regular expressions, a match must not be
+    adjacent to a letter, digit or underscore on a side where the word itself starts or ends with one, so
+    "ass" doesn't match "class".
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        # (length, left boundary required, right boundary required) of words ending at each state
+        self._outputs: List[Tuple[Tuple[int, bool, bool], ...]] = [()]
+        self._size = 0
+        for word in words:
+            self._add(word.casefold())
+        self._fail = self._link()
+
+    def find(self, text: str) -> Optional[str]:
+        """
+        First listed word in the text (case-folded), or None if it contains none.
+        """
+        for match in self._scan(text):
+            return match
+        return None
+
+    def find_all(self, text: str) -> List[str]:
+        return list(self._scan(text))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _scan(self, text: str):
+        text = text.casefold()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        last = len(text) - 1
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            for length, left, right in outputs[state]:
+                start = index - length + 1
+                if left and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if right and index < last and _is_word_char(text[index + 1]):
+                    continue
+                yield text[start : index + 1]
+
+    def _add(self, word: str):
+        if not word:
+            return
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._outputs.append(())
+            state = next_state
+        if not self._outputs[state]:
+            self._outputs[state] = (
+                (len(word), _is_word_char(word[0]), _is_word_char(word[-1])),
+            )
+            self._size += 1
+
+    def _link(self) -> List[int]:
+        """
+        Failure links in breadth-first order, merging the outputs of each state's failure state into its own so
+        that a scan never follows output links.
+        """
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] += self._outputs[fail[next_state]]
+        return fail
+
+
+class GuardrailWordFilter:
+    """
+    Local pre-check of a guardrail's custom word policy, to answer with the guardrail's blocked input message
+    without a model invocation. Managed word lists (e.g. PROFANITY) and other policies are only evaluated by
+    Bedrock, so passing the pre-check doesn't mean the guardrail won't intervene.
+    """
+
+    def __init__(
+        self,
+        guardrail_id: str,
+        guardrail_arn: str,
+        version: str,
+        blocked_input_message: str,
+        words: Iterable[str],
+    ):
+        self.guardrail_id = guardrail_id
+        self.guardrail_arn = guardrail_arn
+        self.version = version
+        self.blocked_input_message = blocked_input_message
+        self.words = WordFilter(words)
+
+    @classmethod
+    def from_guardrail(cls, guardrail_info: Dict[str, Any]) -> "GuardrailWordFilter":
+        """
+        Compile the word policy of a `get_guardrail` response.
+        """
+        words = (guardrail_info.get("wordPolicy") or {}).get("words", [])
+        return cls(
+            guardrail_id=guardrail_info.get("guardrailId"),
+            guardrail_arn=guardrail_info.get("guardrailArn"),
+            version=str(guardrail_info.get("version")),
+            blocked_input_message=guardrail_info.get("blockedInputMessaging"),
+            words=(word.get("text") for word in words),
+        )
+
+    def applies_to(self, guardrail_identifier: str, guardrail_version: str) -> bool:
+        return (
+            guardrail_identifier in (self.guardrail_id, self.guardrail_arn)
+            and str(guardrail_version) == self.version
+        )
+
+    def check(self, texts: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """
+        Response body in the shape Bedrock returns when the guardrail blocks the input, or None if no text
+        contains a listed word.
+        """
+        for text in texts:
+            if self.words.find(text) is not None:
+                return {
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [{"type": "text", "text": self.blocked_input_message}],
+                    "stop_reason": "end_turn",
+                    "usage": {"input_tokens": 0, "output_tokens": 0},
+                    "amazon-bedrock-guardrailAction": "INTERVENED",
+                }
+        return None
@@ -0,0 +1,82 @@
+import csv
+import io
+import pathlib
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, TextIO, Dict, List
+from bedrock_snippet.models.response import RejectedWord, WordImportReport
+
+WordSource = str | pathlib.Path | TextIO | Iterable[str]
+
+MAX_WORD_LENGTH = 100
+MAX_WORDS = 10000
+
+
+def read_restricted_words(
+    source: WordSource,
+    column: Optional[int | str] = None,
+    max_words: int = MAX_WORDS,
+    max_reported_rejects: int = 100,
+    skip_header: bool = False,
+) -> WordImportReport:
+    """
+    Stream words from a file path, text file object or iterable of lines, one word (or phrase) per line, or from the
+    given `column` of CSV rows. `column` is an index, or the name of a column of the header row. With
+    `skip_header`, the first line (or row) is skipped; a column name implies it. Whitespace is collapsed, blank
+    lines are skipped and words are de-duplicated case-insensitively, keeping the first spelling. Words longer
+    than 100 characters and words beyond `max_words` are rejected. Only the accepted words are held in memory, so
+    the source may be larger than memory.
+    """
+    assert 0 < max_words <= MAX_WORDS, f"Max words must be in (0, {MAX_WORDS}]"
+    # case-folded word to the word as first seen; a dict is an insertion ordered set
+    accepted: Dict[str, str] = {}
+    rejects: List[RejectedWord] = []
+    duplicates = rejected_count = 0
+    with _open_lines(source) as lines:
+        rows = csv.reader(lines) if column is not None else ([line] for line in lines)
+        first_line = 1
+        if skip_header or isinstance(column, str):
+            header = next(rows, [])
+            first_line = 2
+            if isinstance(column, str):
+                if column not in header:
+                    raise ValueError(f"Column '{column}' is not in the header {header}")
+                column = header.index(column)
+        for line_number, row in enumerate(rows, start=first_line):
+            if column is not None and len(row) <= column:
+                continue
+            word = " ".join(row[0 if column is None else column].split())
+            if not word:
+                continue
+            key = word.casefold()
+            if key in accepted:
+                duplicates += 1
+                continue
+            if len(word) > MAX_WORD_LENGTH:
+                reason = "too_long"
+            elif len(accepted) >= max_words:
+                reason = "limit_exceeded"
+            else:
+                accepted[key] = word
+                continue
+            rejected_count += 1
+            if len(rejects) < max_reported_rejects:
+                rejects.append(RejectedWord(line=line_number, text=word, reason=reason))
+    words = list(accepted.values())
+    del accepted
+    return WordImportReport(
+        words=words,
+        duplicates=duplicates,
+        rejected_count=rejected_count,
+        rejects=rejects,
+    )
+
+
+@contextmanager
+def _open_lines(source: WordSource) -> Iterator[Iterable[str]]:
+    if isinstance(source, (str, pathlib.Path)):
+        with open(source, "r", encoding="utf8", newline="") as file:
+            yield file
+    elif isinstance(source, io.TextIOBase):
+        yield source
+    else:
+        yield iter(source)
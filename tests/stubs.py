@@ -0,0 +1,138 @@
+import io
+import json
+from typing import Callable, Dict, Any, NoReturn
+from botocore.awsrequest import AWSResponse
+
+Handler = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+PROMPT_ID = "ABCDE12345"
+PROMPT_ARN = f"arn:aws:bedrock:us-east-1:123456789012:prompt/{PROMPT_ID}"
+MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+
+
+class UnhandledOperation(LookupError):
+    pass
+
+
+def unhandled_operation(operation_name: str, params: Dict[str, Any]) -> NoReturn:
+    """
+    Raised by handlers for calls they have no response for, naming the call so that a missing stub is obvious.
+    """
+    raise UnhandledOperation(
+        f"No stubbed response for {operation_name} with parameters {sorted(params)}"
+    )
+
+
+def serve(target, handler: Handler, service_name: str = "*"):
+    """
+    Short-circuit every API call of a client (or of every client later created from a session) right after
+    parameter validation, answering with `handler(operation_name, params)` so no request leaves the process.
+    """
+
+    def remember(params, context, **kwargs):
+        context["api_params"] = params
+
+    def respond(model, context, **kwargs):
+        return AWSResponse(None, 200, {}, None), handler(
+            model.name, context["api_params"]
+        )
+
+    events = target.meta.events if hasattr(target, "meta") else target.events
+    events.register(f"before-parameter-build.{service_name}.*", remember)
+    events.register_first(f"before-call.{service_name}.*", respond)
+    return target
+
+
+def prompt_info(
+    prompt_name: str, user_prompt: str = "Greet {{name}}.", version: str = "DRAFT"
+) -> Dict[str, Any]:
+    return {
+        "name": prompt_name,
+        "id": PROMPT_ID,
+        "arn": PROMPT_ARN,
+        "version": version,
+        "updatedAt": "2025-01-01T00:00:00Z",
+        "defaultVariant": f"{prompt_name}-variant",
+        "variants": [
+            {
+                "name": f"{prompt_name}-variant",
+                "templateType": "CHAT",
+                "modelId": MODEL_ID,
+                "templateConfiguration": {
+                    "chat": {
+                        "messages": [
+                            {"role": "user", "content": [{"text": user_prompt}]}
+                        ],
+                        "system": [{"text": "You are a helpful assistant."}],
+                        "inputVariables": [{"name": "name"}],
+                    }
+                },
+                "inferenceConfiguration": {
+                    "text": {
+                        "maxTokens": 2000,
+                        "temperature": 0.0,
+                        "topP": 1.0,
+                        "stopSequences": [],
+                    }
+                },
+                "additionalModelRequestFields": {"top_k": 15},
+            }
+        ],
+    }
+
+
+def model_response(text: str) -> Dict[str, Any]:
+    result = {
+        "id": "msg_dummy",
+        "type": "message",
+        "role": "assistant",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    }
+    return {
+        "body": io.BytesIO(json.dumps(result).encode()),
+        "contentType": "application/json",
+    }
+
+
+def prompt_agent_handler(prompt_name: str) -> Handler:
+    def handler(operation_name, params):
+        if operation_name == "ListPrompts":
+            info = prompt_info(prompt_name)
+            return {
+                "promptSummaries": [
+                    {k: info[k] for k in ("name", "id", "arn", "version", "updatedAt")}
+                ]
+            }
+        elif operation_name == "GetPrompt":
+            return prompt_info(
+                prompt_name, version=params.get("promptVersion", "DRAFT")
+            )
+        unhandled_operation(operation_name, params)
+
+    return handler
+
+
+def stream_response(text: str, chunk_size: int = 4) -> Dict[str, Any]:
+    events = [
+        {
+            "type": "message_start",
+            "message": {"role": "assistant", "usage": {"input_tokens": 10}},
+        },
+        *(
+            {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": text[i : i + chunk_size]},
+            }
+            for i in range(0, len(text), chunk_size)
+        ),
+        {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn"},
+            "usage": {"output_tokens": 5},
+        },
+        {"type": "message_stop"},
+    ]
+    return {"body": [{"chunk": {"bytes": json.dumps(e).encode()}} for e in events]}
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+import boto3
+from bedrock_snippet.services import AsyncPromptInvocationService
+from tests.stubs import serve, prompt_agent_handler, model_response
+
+session = boto3.Session(
+    aws_access_key_id="dummy-async-access-key",
+    aws_secret_access_key="dummy-secret-key",
+    region_name="us-east-1",
+)
+serve(session, prompt_agent_handler("test-prompt"), "bedrock-agent")
+
+
+class FakeRuntime:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, operation_name, params):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return model_response(params["body"])
+
+
+runtime = FakeRuntime(latency=0.2)
+serve(session, runtime, "bedrock-runtime")
+
+
+async def invoke_concurrently(count: int):
+    service = await AsyncPromptInvocationService.create(
+        "test-prompt", session, max_workers=count
+    )
+    async with service:
+        return await service.invoke_text_many(
+            [{"name": f"user-{i}"} for i in range(count)], return_result_only=True
+        )
+
+
+def test_hundreds_of_invocations_in_flight():
+    start = time.perf_counter()
+    results = asyncio.run(invoke_concurrently(300))
+    elapsed = time.perf_counter() - start
+    assert runtime.max_in_flight >= 200
+    assert elapsed < 300 * runtime.latency / 10
+    assert '"user-0"' in results[0] and '"user-299"' in results[-1]  # input order
@@ -0,0 +1,38 @@
+import gc
+import boto3
+from bedrock_snippet.services import ClientPool
+
+
+def new_session() -> boto3.Session:
+    return boto3.Session(
+        aws_access_key_id="dummy-access-key",
+        aws_secret_access_key="dummy-secret-key",
+        region_name="us-east-1",
+    )
+
+
+def test_clients_are_shared_per_session():
+    pool = ClientPool()
+    session, other_session = new_session(), new_session()
+    client = pool.client(session, "bedrock-runtime")
+    assert pool.client(session, "bedrock-runtime") is client
+    assert pool.client(other_session, "bedrock-runtime") is not client
+    assert (
+        pool.client(session, "bedrock-runtime", region_name="us-west-2") is not client
+    )
+    assert len(pool) == 3
+
+    del other_session
+    gc.collect()
+    assert len(pool) == 2
+
+
+def test_least_recently_used_client_is_evicted():
+    pool = ClientPool(max_clients=2)
+    session = new_session()
+    client = pool.client(session, "bedrock")
+    pool.client(session, "bedrock-agent")
+    assert pool.client(session, "bedrock") is client
+    pool.client(session, "bedrock-runtime")
+    assert len(pool) == 2
+    assert pool.client(session, "bedrock") is client  # bedrock-agent was evicted
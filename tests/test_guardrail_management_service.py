@@ -0,0 +1,113 @@
+import boto3
+import pytest
+from pydantic import ValidationError
+from bedrock_snippet.services import (
+    GuardrailManagementService,
+    ResolutionCache,
+    read_restricted_words,
+)
+from tests.stubs import serve, unhandled_operation
+
+GUARDRAIL_ID = "abcdefgh1234"
+GUARDRAIL_ARN = f"arn:aws:bedrock:us-east-1:123456789012:guardrail/{GUARDRAIL_ID}"
+
+session = boto3.Session(
+    aws_access_key_id="dummy-guardrail-access-key",
+    aws_secret_access_key="dummy-secret-key",
+    region_name="us-east-1",
+)
+guardrail = {
+    "name": "test-guardrail",
+    "guardrailId": GUARDRAIL_ID,
+    "guardrailArn": GUARDRAIL_ARN,
+    "version": "DRAFT",
+    "description": "test guardrail",
+    "blockedInputMessaging": "Blocked input.",
+    "blockedOutputsMessaging": "Blocked output.",
+    "wordPolicy": {"words": [{"text": "alpha"}, {"text": "beta"}]},
+}
+updates = []
+
+
+def handle_guardrail(operation_name, params):
+    if operation_name == "ListGuardrails":
+        return {
+            "guardrails": [
+                {
+                    "name": guardrail["name"],
+                    "id": GUARDRAIL_ID,
+                    "arn": GUARDRAIL_ARN,
+                    "version": "DRAFT",
+                }
+            ]
+        }
+    elif operation_name == "GetGuardrail":
+        return dict(guardrail)
+    elif operation_name == "UpdateGuardrail":
+        updates.append(params)
+        guardrail["description"] = params.get("description")
+        guardrail["wordPolicy"] = {"words": params["wordPolicyConfig"]["wordsConfig"]}
+        return {"guardrailId": GUARDRAIL_ID}
+    unhandled_operation(operation_name, params)
+
+
+serve(session, handle_guardrail, "bedrock")
+service = GuardrailManagementService(
+    "test-guardrail", session, resolution_cache=ResolutionCache()
+)
+
+
+def words():
+    return [word["text"] for word in guardrail["wordPolicy"]["words"]]
+
+
+def test_word_updates():
+    assert service.add_words(["alpha", "gamma", "Gamma"])
+    assert words() == ["alpha", "beta", "gamma"]
+    # Bedrock matches words case-insensitively
+    assert not service.add_words(["beta", "BETA"])
+    assert service.remove_words(["Alpha", "delta"])
+    assert words() == ["beta", "gamma"]
+    assert not service.remove_words(["delta"])
+    assert not service.update_guardrail(restricted_words=["gamma", "beta"])
+    assert not service.update_guardrail(description="test guardrail")
+    assert len(updates) == 2
+
+    assert service.update_guardrail(description="updated")
+    assert updates[-1]["description"] == "updated"
+    assert updates[-1]["wordPolicyConfig"]["wordsConfig"] == [
+        {"text": "beta"},
+        {"text": "gamma"},
+    ]
+    with pytest.raises(ValidationError):
+        service.add_words(["x" * 101])
+    assert len(updates) == 3
+
+
+def test_import_words(tmp_path):
+    source = tmp_path / "words.csv"
+    source.write_text(
+        "word,note\n"
+        "Gamma,\n"
+        "  delta   ray ,\n"
+        "GAMMA,duplicate\n"
+        f"{'x' * 101},too long\n"
+        ",blank\n"
+        "epsilon,over limit\n"
+    )
+    for kwargs in [{"column": "word"}, {"column": 0, "skip_header": True}]:
+        report = read_restricted_words(source, max_words=2, **kwargs)
+        assert report.words == ["Gamma", "delta ray"]
+        assert report.duplicates == 1
+        assert report.rejected_count == 2
+        assert [(r.line, r.reason) for r in report.rejects] == [
+            (5, "too_long"),
+            (7, "limit_exceeded"),
+        ]
+    with pytest.raises(ValueError):
+        read_restricted_words(source, column="text")
+
+    report = read_restricted_words(["zeta\n", "Zeta\n", "\n", "eta\n"])
+    assert report.words == ["zeta", "eta"]
+    assert service.update_guardrail(restricted_words=report)
+    assert words() == ["zeta", "eta"]
@@ -0,0 +1,178 @@
+import sys
+import types
+
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from bedrock_snippet.local import LocalBedrock
+from bedrock_snippet.services import (
+    CallRecord,
+    ClientPool,
+    Instrumentation,
+    OpenTelemetryExporter,
+    PromptInvocationService,
+    PromptManagementService,
+    ResolutionCache,
+)
+from tests.stubs import MODEL_ID
+
+session = boto3.Session(
+    aws_access_key_id="dummy-instrumentation-access-key",
+    aws_secret_access_key="dummy-secret-key",
+    region_name="us-east-1",
+)
+
+
+def test_calls_tokens_and_exports():
+    records = []
+    instrumentation = Instrumentation(callbacks=[records.append])
+    with LocalBedrock(response_chars=80) as server:
+        kwargs = {
+            "resolution_cache": ResolutionCache(),
+            "client_pool": ClientPool(endpoint_url=server.endpoint_url),
+            "instrumentation": instrumentation,
+        }
+        prompts = PromptManagementService("metered-prompt", session, **kwargs)
+        prompts.create_prompt(MODEL_ID, "metered", "Be brief.", "Greet {{name}}.")
+        service = PromptInvocationService("metered-prompt", session, **kwargs)
+        service.invoke_text({"name": "Alice"})
+        service.stream_text({"name": "Bob"}).text()
+
+        # the same instrumentation is attached once to the shared bedrock-agent client
+        stats = instrumentation.stats()
+        operations = stats["operations"]
+        assert operations["bedrock-agent.CreatePrompt"]["calls"] == 1
+        assert operations["bedrock-runtime.InvokeModel"]["calls"] == 1
+        assert operations["bedrock-runtime.InvokeModel"]["request_bytes"] > 0
+        assert operations["bedrock-runtime.InvokeModel"]["response_bytes"] > 0
+        assert operations["bedrock-runtime.InvokeModelWithResponseStream"]["calls"] == 1
+        # tokens count under the variant's model, calls under the prompt ARN they address
+        assert list(stats["tokens"]) == [MODEL_ID]
+        assert stats["tokens"][MODEL_ID]["output"] == 2 * 21
+        assert records[-1].operation == "InvokeModelWithResponseStream"
+        model_id = records[-1].model_id
+        assert model_id.startswith("arn:aws:bedrock:")
+
+        server.throttle_rate = {"ListTagsForResource": 1.0}
+        client = ClientPool(endpoint_url=server.endpoint_url).client(
+            session, "bedrock-agent", Config(retries={"total_max_attempts": 3})
+        )
+        instrumentation.attach(client)
+        with pytest.raises(ClientError):
+            client.list_tags_for_resource(resourceArn=model_id)
+    assert records[-1].error_code == "ThrottlingException"
+    assert records[-1].retries == 2
+
+    text = instrumentation.prometheus()
+    assert (
+        'bedrock_api_calls_total{service="bedrock-agent",operation="ListTagsForResource",'
+        'status="ThrottlingException"} 1'
+    ) in text
+    assert (
+        'bedrock_api_call_duration_seconds_count{service="bedrock-runtime",operation="InvokeModel"} 1'
+    ) in text
+    assert (
+        f'bedrock_model_tokens_total{{model="{MODEL_ID}",direction="output"}} 42'
+        in text
+    )
+
+
+def test_failing_callback_does_not_fail_the_call(caplog):
+    def broken_exporter(record):
+        raise RuntimeError("exporter unavailable")
+
+    records = []
+    instrumentation = Instrumentation(callbacks=[broken_exporter, records.append])
+    with LocalBedrock() as server:
+        client = ClientPool(endpoint_url=server.endpoint_url).client(
+            session, "bedrock-agent"
+        )
+        instrumentation.attach(client)
+        client.list_prompts()
+    assert [record.operation for record in records] == ["ListPrompts"]
+    assert (
+        instrumentation.stats()["operations"]["bedrock-agent.ListPrompts"]["calls"] == 1
+    )
+    assert "exporter unavailable" in caplog.text
+
+
+class FakeSpan:
+    def __init__(self, name, kind, start_time, attributes):
+        self.name = name
+        self.kind = kind
+        self.start_time = start_time
+        self.attributes = attributes
+        self.status = None
+        self.end_time = None
+
+    def set_status(self, status):
+        self.status = status
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, kind, start_time, attributes):
+        span = FakeSpan(name, kind, start_time, attributes)
+        self.spans.append(span)
+        return span
+
+
+def test_opentelemetry_exporter(monkeypatch):
+    # stands in for opentelemetry-api, which is an optional dependency
+    trace = types.SimpleNamespace(
+        SpanKind=types.SimpleNamespace(CLIENT="client"),
+        StatusCode=types.SimpleNamespace(ERROR="error"),
+        Status=lambda code, description: (code, description),
+        get_tracer=lambda name: pytest.fail("the given tracer should be used"),
+    )
+    opentelemetry = types.ModuleType("opentelemetry")
+    opentelemetry.trace = trace
+    monkeypatch.setitem(sys.modules, "opentelemetry", opentelemetry)
+    tracer = FakeTracer()
+    exporter = OpenTelemetryExporter(tracer)
+
+    exporter(
+        CallRecord(
+            "bedrock-runtime",
+            "InvokeModel",
+            10.0,
+            0.25,
+            200,
+            None,
+            0,
+            120,
+            480,
+            model_id=MODEL_ID,
+        )
+    )
+    exporter(
+        CallRecord(
+            "bedrock-agent",
+            "GetPrompt",
+            11.0,
+            0.5,
+            429,
+            "ThrottlingException",
+            2,
+            40,
+            90,
+        )
+    )
+
+    ok, failed = tracer.spans
+    assert ok.name == "bedrock-runtime.InvokeModel"
+    assert ok.kind == "client"
+    assert (ok.start_time, ok.end_time) == (10_000_000_000, 10_250_000_000)
+    assert ok.attributes["rpc.method"] == "InvokeModel"
+    assert ok.attributes["http.response.status_code"] == 200
+    assert ok.attributes["gen_ai.request.model"] == MODEL_ID
+    assert ok.status is None
+    assert failed.status == ("error", "ThrottlingException")
+    assert failed.attributes["aws.retries"] == 2
+    assert "gen_ai.request.model" not in failed.attributes
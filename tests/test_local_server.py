@@ -0,0 +1,108 @@
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from bedrock_snippet.local import LocalBedrock
+from bedrock_snippet.services import (
+    ClientPool,
+    GuardrailManagementService,
+    PromptInvocationService,
+    PromptManagementService,
+    ResolutionCache,
+)
+from tests.stubs import MODEL_ID
+
+session = boto3.Session(
+    aws_access_key_id="dummy-local-access-key",
+    aws_secret_access_key="dummy-secret-key",
+    region_name="us-east-1",
+)
+
+
+@pytest.fixture
+def server():
+    with LocalBedrock(response_chars=100, stream_chunk_chars=7, seed=0) as server:
+        yield server
+
+
+@pytest.fixture
+def services(server):
+    pool = ClientPool(endpoint_url=server.endpoint_url)
+    kwargs = {"resolution_cache": ResolutionCache(), "client_pool": pool}
+    return (
+        PromptManagementService("local-prompt", session, **kwargs),
+        GuardrailManagementService("local-guardrail", session, **kwargs),
+        lambda: PromptInvocationService("local-prompt", session, **kwargs),
+    )
+
+
+def test_prompt_and_guardrail_lifecycle(server, services):
+    prompts, guardrails, invocation_service = services
+    prompts.create_prompt(
+        MODEL_ID,
+        "local prompt",
+        "You are a helpful assistant.",
+        "Greet {{name}}.",
+        temperature=0.0,
+        input_variables=["name"],
+        tags={"team": "test"},
+    )
+    prompts.update_prompt(user_prompt="Say hello to {{name}}.")
+    prompts.create_prompt_version(tags={"stage": "v1"})
+    versions = prompts.list_available_prompt_versions()
+    assert [v["version"] for v in versions] == ["DRAFT", "1"]
+    assert versions[1]["tags"] == {"stage": "v1"}
+    assert len(prompts.list_available_foundation_models()) == 2
+
+    guardrails.create_guardrail(
+        "local", "Blocked input.", "Blocked output.", ["secret"]
+    )
+    guardrails.create_guardrail_version()
+    assert guardrails.add_words(["classified"])
+    assert [v["version"] for v in guardrails.list_available_guardrail_versions()] == [
+        0,
+        1,
+    ]
+    guardrail_id = guardrails.get_guardrail_id()
+
+    service = invocation_service()
+    result = service.invoke_text({"name": "Alice"})
+    assert len(result["content"][0]["text"]) == 100
+    assert result["usage"]["input_tokens"] > 0
+    blocked = service.invoke_text(
+        {"name": "classified"},
+        return_result_only=True,
+        guardrail_identifier=guardrail_id,
+    )
+    assert blocked == "Blocked input."
+    assert (
+        service.invoke_rendered({"name": "Bob"}, guardrail_identifier=guardrail_id)[
+            "amazon-bedrock-guardrailAction"
+        ]
+        == "NONE"
+    )
+    stream = service.stream_text({"name": "Carol"})
+    assert len(stream.text()) == 100
+    assert stream.stop_reason == "end_turn"
+    assert server.calls["InvokeModelWithResponseStream"] == 1
+
+    guardrails.delete_guardrail()
+    prompts.delete_prompt()
+    assert server.calls["DeletePrompt"] == 1
+
+
+def test_injected_failures(server):
+    server.throttle_rate = {"InvokeModel": 1.0}
+    client = ClientPool(endpoint_url=server.endpoint_url).client(
+        session, "bedrock-runtime", Config(retries={"total_max_attempts": 1})
+    )
+    with pytest.raises(ClientError) as error:
+        client.invoke_model(modelId=MODEL_ID, body=b'{"messages": []}')
+    assert error.value.response["Error"]["Code"] == "ThrottlingException"
+    assert server.calls["InvokeModel"] == 1
+
+    server.throttle_rate = 0.0
+    server.error_rate = {"InvokeModel": 1.0}
+    with pytest.raises(ClientError) as error:
+        client.invoke_model(modelId=MODEL_ID, body=b'{"messages": []}')
+    assert error.value.response["ResponseMetadata"]["HTTPStatusCode"] == 503
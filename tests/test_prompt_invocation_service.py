@@ -0,0 +1,483 @@
+import io
+import json
+import struct
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+import pytest
+from base64 import b64encode
+from bedrock_snippet.services import (
+    PromptInvocationService,
+    PromptManagementService,
+    ResolutionCache,
+    RateLimiter,
+    MemoryResponseCache,
+    SqliteResponseCache,
+    PromptSnapshotStore,
+    GuardrailWordFilter,
+    TokenBudget,
+    TokenBudgetExceeded,
+    TokenAccountant,
+)
+from bedrock_snippet.services.image_encoding import downsize
+from bedrock_snippet.services.token_accounting import (
+    estimate_image_tokens,
+    image_dimensions,
+)
+from tests.stubs import (
+    serve,
+    prompt_agent_handler,
+    prompt_info,
+    model_response,
+    stream_response,
+    MODEL_ID,
+    PROMPT_ID,
+)
+
+session = boto3.Session(
+    aws_access_key_id="dummy-invocation-access-key",
+    aws_secret_access_key="dummy-secret-key",
+    region_name="us-east-1",
+)
+serve(session, prompt_agent_handler("test-prompt"), "bedrock-agent")
+
+
+def echo_variables(operation_name, params):
+    body = json.loads(params["body"])
+    if "messages" in body:  # locally rendered or multimodal request
+        block = body["messages"][-1]["content"][-1]
+        if block["type"] == "image":
+            return model_response(block["source"]["data"])
+        return model_response(block["text"])
+    variables = body.get("promptVariables")
+    if variables["name"]["text"] == "fail":
+        raise RuntimeError("dummy failure")
+    if operation_name == "InvokeModelWithResponseStream":
+        return stream_response(variables["name"]["text"])
+    return model_response(variables["name"]["text"])
+
+
+serve(session, echo_variables, "bedrock-runtime")
+service = PromptInvocationService("test-prompt", session)
+
+
+def test_invoke_text_batch():
+    inputs = [{"name": f"user-{i}"} for i in range(100)]
+    inputs[42] = {"name": "fail"}
+    inputs[43] = {}  # missing variable
+    batch = service.invoke_text_batch(
+        inputs, max_concurrency=8, return_result_only=True
+    )
+    assert batch.results[0] == "user-0" and batch.results[99] == "user-99"
+    assert batch.results[42] is None and isinstance(batch.errors[42], RuntimeError)
+    assert isinstance(batch.errors[43], ValueError)
+    assert len(batch.errors) == 2
+    assert set(batch.latency_percentiles) == {"p50", "p90", "p99", "max"}
+
+
+def test_stream_text():
+    stream = service.stream_text({"name": "streaming user"})
+    assert list(stream) == ["stre", "amin", "g us", "er"]
+    assert stream.stop_reason == "end_turn"
+    assert stream.usage == {"input_tokens": 10, "output_tokens": 5}
+
+
+def test_response_cache(tmp_path):
+    for cache in [MemoryResponseCache(), SqliteResponseCache(tmp_path / "cache.db")]:
+        cached_service = PromptInvocationService(
+            "test-prompt", session, response_cache=cache
+        )
+        for _ in range(3):
+            result = cached_service.invoke_text({"name": "cached user"})
+            assert result["content"][0]["text"] == "cached user"
+        cached_service.invoke_text({"name": "another user"})
+        assert cache.hits == 2 and cache.misses == 2
+
+
+def test_from_definition_makes_no_agent_calls():
+    offline_session = boto3.Session(
+        aws_access_key_id="dummy-offline-access-key",
+        aws_secret_access_key="dummy-secret-key",
+        region_name="us-east-1",
+    )
+    serve(offline_session, echo_variables, "bedrock-runtime")
+    serve(
+        offline_session, lambda *args: pytest.fail("unexpected call"), "bedrock-agent"
+    )
+    offline_service = PromptInvocationService.from_definition(
+        "test-prompt", offline_session, prompt_info("test-prompt")
+    )
+    assert offline_service.required_variables == ["name"]
+    assert offline_service.invoke_text({"name": "offline"}, True) == "offline"
+
+
+def test_snapshot_store(tmp_path):
+    snapshot_session = boto3.Session(
+        aws_access_key_id="dummy-snapshot-access-key",
+        aws_secret_access_key="dummy-secret-key",
+        region_name="us-east-1",
+    )
+    fetched_versions = []
+
+    def handler(operation_name, params):
+        if operation_name == "GetPrompt":
+            fetched_versions.append(params.get("promptVersion", "DRAFT"))
+        return prompt_agent_handler("test-prompt")(operation_name, params)
+
+    serve(snapshot_session, handler, "bedrock-agent")
+    for version in [None, 1, None, 1]:
+        PromptInvocationService(
+            "test-prompt",
+            snapshot_session,
+            version=version,
+            snapshot_store=PromptSnapshotStore(tmp_path),
+        )
+    assert fetched_versions == ["DRAFT", "1"]
+
+    # summaries seeded on create carry the create time; without one the DRAFT is kept
+    store = PromptSnapshotStore(tmp_path)
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return {**prompt_info("test-prompt"), "updatedAt": "2025-01-02"}
+
+    for summary in [{"id": PROMPT_ID}, {"id": PROMPT_ID, "updatedAt": "2025-01-02"}]:
+        store.get(summary, None, fetch)
+        store.get(summary, None, fetch)
+    assert len(fetches) == 1
+
+
+def test_update_prompt_skips_snapshot_store(tmp_path):
+    update_session = boto3.Session(
+        aws_access_key_id="dummy-update-access-key",
+        aws_secret_access_key="dummy-secret-key",
+        region_name="us-east-1",
+    )
+    remote = {**prompt_info("test-prompt"), "description": "original"}
+    updates = []
+
+    def handler(operation_name, params):
+        if operation_name == "GetPrompt":
+            return remote
+        if operation_name == "UpdatePrompt":
+            updates.append(params)
+            return {
+                **remote,
+                "description": params["description"],
+                "updatedAt": "2025-01-03",
+            }
+        return prompt_agent_handler("test-prompt")(operation_name, params)
+
+    serve(update_session, handler, "bedrock-agent")
+    store = PromptSnapshotStore(tmp_path)
+    management = PromptManagementService(
+        "test-prompt",
+        update_session,
+        resolution_cache=ResolutionCache(),
+        snapshot_store=store,
+    )
+    assert management.get_prompt()["description"] == "original"
+    # another process edits the DRAFT while the cached summary still matches the stored snapshot
+    remote = {**remote, "description": "edited elsewhere", "updatedAt": "2025-01-02"}
+    management.update_prompt(temperature=0.0)
+    assert updates[-1]["description"] == "edited elsewhere"
+    assert store.load(PROMPT_ID, "DRAFT")["updatedAt"] == "2025-01-03"
+
+
+def test_invoke_rendered():
+    result = service.invoke_rendered(
+        {"name": "local user"}, inference_overrides={"max_tokens": 100}
+    )
+    assert result["content"][0]["text"] == "Greet local user."
+    with pytest.raises(ValueError):
+        service.invoke_rendered(
+            {"name": "local user"}, inference_overrides={"top_k": 0}
+        )
+    with pytest.raises(ValueError):
+        service.invoke_rendered({"name": "local user"}, guardrail_identifier="INVALID")
+
+
+def test_invoke_multimodal_sources(tmp_path):
+    image = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 3000
+    image_path = tmp_path / "image.png"
+    image_path.write_bytes(image)
+    expected = b64encode(image).decode("utf8")
+    for source in [image_path, image, memoryview(image), io.BytesIO(image)]:
+        assert service.invoke_multimodal(source, return_result_only=True) == expected
+
+
+def test_invoke_multimodal_concurrently():
+    sent_bodies = []
+    concurrent_session = boto3.Session(
+        aws_access_key_id="dummy-access-key",
+        aws_secret_access_key="dummy-secret-key",
+        region_name="us-east-1",
+    )
+
+    def capture(operation_name, params):
+        sent_bodies.append(json.loads(params["body"]))
+        return echo_variables(operation_name, params)
+
+    serve(concurrent_session, capture, "bedrock-runtime")
+    # the text the body template used to split on
+    user_prompt = "__content_placeholder__"
+    concurrent_service = PromptInvocationService.from_definition(
+        "test-prompt", concurrent_session, prompt_info("test-prompt", user_prompt)
+    )
+    default_messages = concurrent_service._default_body.model_dump()["messages"]
+    images = [b"\x89PNG\r\n\x1a\n" + bytes([i]) * 1024 for i in range(64)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(
+            executor.map(
+                lambda image: concurrent_service.invoke_multimodal(image, True), images
+            )
+        )
+    assert results == [b64encode(image).decode("utf8") for image in images]
+    assert len(sent_bodies) == 64
+    for body in sent_bodies:
+        [message] = body["messages"]
+        assert [block["type"] for block in message["content"]] == ["text", "image"]
+        assert message["content"][0]["text"] == user_prompt
+    assert concurrent_service._default_body.model_dump()["messages"] == default_messages
+
+
+def test_rate_limiter_charges_estimated_and_streamed_tokens():
+    class RecordingRateLimiter(RateLimiter):
+        def __init__(self):
+            super().__init__(tokens_per_minute=100_000)
+            self.estimates = []
+            self.charges = []
+
+        def call(self, model_id, operation, estimated_tokens=0, **kwargs):
+            self.estimates.append(estimated_tokens)
+            return super().call(model_id, operation, estimated_tokens, **kwargs)
+
+        def charge(self, model_id, used_tokens, estimated_tokens=0):
+            self.charges.append((used_tokens, estimated_tokens))
+            super().charge(model_id, used_tokens, estimated_tokens)
+
+    limiter = RecordingRateLimiter()
+    limited_service = PromptInvocationService(
+        "test-prompt", session, rate_limiter=limiter
+    )
+    # a megabyte of image data is sized from its header, not from its base64 length
+    image = b"\x89PNG\r\n\x1a\n" + bytes(8) + struct.pack(">II", 200, 150)
+    limited_service.invoke_multimodal(image + bytes(1024 * 1024))
+    assert limiter.estimates[-1] < 100
+    stream = limited_service.stream_text({"name": "streaming user"})
+    assert limiter.charges == []
+    stream.text()
+    assert limiter.charges == [(15, limiter.estimates[-1])]
+
+
+def test_conversation():
+    image = b"\x89PNG\r\n\x1a\n" + bytes(1024)
+    conversation = service.start_conversation({"name": "chat user"})
+    assert service.invoke_conversation(conversation, True) == "Greet chat user."
+    conversation.add_user("first", images=[image, image])
+    assert service.invoke_conversation(conversation, True) == "first"
+    assert conversation.roles == ["user", "assistant", "user", "assistant"]
+    body = json.loads(conversation.add_user("second").body())
+    assert [len(m["content"]) for m in body["messages"]] == [1, 1, 3, 1, 1]
+    assert body["system"] == "You are a helpful assistant." and body["top_k"] == 15
+
+    # consecutive user turns merge, and trimming keeps a history starting with a user turn
+    conversation.add_user("third")
+    conversation.max_history_tokens = 100
+    body = json.loads(conversation.body())
+    assert body["messages"] == [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "second"},
+                {"type": "text", "text": "third"},
+            ],
+        }
+    ]
+    assert conversation.dropped_turns == 4
+
+
+def test_conversation_reply_without_text():
+    empty_session = boto3.Session(
+        aws_access_key_id="dummy-access-key",
+        aws_secret_access_key="dummy-secret-key",
+        region_name="us-east-1",
+    )
+    reply = {"content": [], "stop_reason": "stop_sequence"}
+    serve(
+        empty_session,
+        lambda *args: {"body": io.BytesIO(json.dumps(reply).encode())},
+        "bedrock-runtime",
+    )
+    empty_service = PromptInvocationService.from_definition(
+        "test-prompt", empty_session, prompt_info("test-prompt")
+    )
+    conversation = empty_service.start_conversation({"name": "chat user"})
+    assert empty_service.invoke_conversation(conversation, True) == ""
+    assert conversation.roles == ["user"]
+    with pytest.raises(ValueError):
+        conversation.add_assistant("reply").body()
+
+
+def test_guardrail_word_filter():
+    invoked = []
+    runtime_session = boto3.Session(
+        aws_access_key_id="dummy-word-filter-access-key",
+        aws_secret_access_key="dummy-secret-key",
+        region_name="us-east-1",
+    )
+    serve(runtime_session, lambda *args: invoked.append(args) or echo_variables(*args))
+    word_filter = GuardrailWordFilter(
+        "abcdefgh1234", "", "DRAFT", "Blocked.", ["forbidden"]
+    )
+    filtered_service = PromptInvocationService.from_definition(
+        "test-prompt",
+        runtime_session,
+        prompt_info("test-prompt"),
+        guardrail_word_filter=word_filter,
+    )
+    guardrail = {"guardrail_identifier": "abcdefgh1234"}
+    assert (
+        filtered_service.invoke_text({"name": "Forbidden"}, True, **guardrail)
+        == "Blocked."
+    )
+    assert (
+        filtered_service.invoke_rendered({"name": "forbidden"}, True, **guardrail)
+        == "Blocked."
+    )
+    assert not invoked
+    assert (
+        filtered_service.invoke_text({"name": "allowed"}, True, **guardrail)
+        == "allowed"
+    )
+    assert filtered_service.invoke_text({"name": "forbidden"}, True) == "forbidden"
+    assert len(invoked) == 2
+
+    # streamed and conversation turns are answered locally too
+    stream = filtered_service.stream_text({"name": "forbidden"}, **guardrail)
+    assert stream.text() == "Blocked."
+    assert stream.guardrail_action == "INTERVENED"
+    conversation = filtered_service.start_conversation({"name": "chat user"})
+    assert filtered_service.invoke_conversation(conversation, True, **guardrail)
+    conversation.add_user("something forbidden")
+    assert (
+        filtered_service.invoke_conversation(conversation, True, **guardrail)
+        == "Blocked."
+    )
+    assert conversation.roles == ["user", "assistant", "user", "assistant"]
+    assert len(invoked) == 3
+
+    # multimodal calls send the template's text with the image
+    template_filter = GuardrailWordFilter(
+        "abcdefgh1234", "", "DRAFT", "Blocked.", ["greet"]
+    )
+    template_service = PromptInvocationService.from_definition(
+        "test-prompt",
+        runtime_session,
+        prompt_info("test-prompt"),
+        guardrail_word_filter=template_filter,
+    )
+    image = b"\x89PNG\r\n\x1a\n" + bytes(64)
+    assert template_service.invoke_multimodal(image, True, **guardrail) == "Blocked."
+    assert template_service.stream_multimodal(image, **guardrail).text() == "Blocked."
+    assert len(invoked) == 3
+
+
+def test_token_budget_and_accounting():
+    invoked = []
+    budget_session = boto3.Session(
+        aws_access_key_id="dummy-budget-access-key",
+        aws_secret_access_key="dummy-secret-key",
+        region_name="us-east-1",
+    )
+    serve(budget_session, lambda *args: invoked.append(args) or echo_variables(*args))
+    accountant = TokenAccountant(prices={MODEL_ID: (3.0, 15.0)})
+    budget_service = PromptInvocationService.from_definition(
+        "test-prompt",
+        budget_session,
+        prompt_info("test-prompt"),
+        token_budget=TokenBudget(context_window=2100, truncate=True),
+        token_accountant=accountant,
+    )
+    long_name = "x" * 1000
+    with pytest.raises(TokenBudgetExceeded):
+        budget_service.invoke_text({"name": long_name})
+    # pre-serialized bodies are rejected even with truncate
+    large_image = b"\x89PNG\r\n\x1a\n" + bytes(8) + struct.pack(">II", 1000, 1000)
+    with pytest.raises(TokenBudgetExceeded):
+        budget_service.invoke_multimodal(large_image)
+    conversation = budget_service.start_conversation({"name": "short"})
+    conversation.add_user(long_name)
+    with pytest.raises(TokenBudgetExceeded):
+        budget_service.invoke_conversation(conversation)
+    assert not invoked
+    budget_service.invoke_rendered({"name": long_name})
+    assert json.loads(invoked[-1][1]["body"])["max_tokens"] < 2000
+    budget_service.invoke_text({"name": "short"})
+    budget_service.stream_text({"name": "short"}).text()
+
+    [row] = accountant.summary()
+    assert (row["prompt_name"], row["version"], row["model_id"]) == (
+        "test-prompt",
+        "DRAFT",
+        MODEL_ID,
+    )
+    assert (row["calls"], row["input_tokens"], row["output_tokens"]) == (3, 30, 15)
+    assert accountant.total_cost() == pytest.approx((30 * 3.0 + 15 * 15.0) / 1e6)
+
+
+def test_image_token_estimate():
+    def png(width, height):
+        return b"\x89PNG\r\n\x1a\n" + bytes(8) + struct.pack(">II", width, height)
+
+    assert estimate_image_tokens(png(200, 150)) == 40
+    assert estimate_image_tokens(png(4000, 3000)) <= 1600
+    assert estimate_image_tokens(png(4000, 3000), max_pixels=75_000) == 100
+    assert estimate_image_tokens(b"\x89PNG\r\n\x1a\n") == 1600
+
+
+def test_image_dimensions():
+    assert image_dimensions(b"GIF89a" + struct.pack("<HH", 320, 200)) == (320, 200)
+    # start of frame after an APP0 segment and a Huffman table, whose marker is in the SOF range
+    jpeg = (
+        b"\xff\xd8"
+        + b"\xff\xe0"
+        + struct.pack(">H", 16)
+        + bytes(14)
+        + b"\xff\xc4"
+        + struct.pack(">H", 4)
+        + bytes(2)
+        + b"\xff\xc2"
+        + struct.pack(">HBHH", 17, 8, 480, 640)
+    )
+    assert image_dimensions(jpeg) == (640, 480)
+    assert image_dimensions(b"\xff\xd8\x00" + bytes(16)) is None
+
+    def webp(chunk, payload):
+        return (
+            b"RIFF" + bytes(4) + b"WEBP" + chunk + bytes(4) + payload.ljust(10, b"\0")
+        )
+
+    lossy = b"\0\0\0\x9d\x01\x2a" + struct.pack("<HH", 1024 | 0x4000, 768)
+    assert image_dimensions(webp(b"VP8 ", lossy)) == (1024, 768)
+    lossless = b"\x2f" + (799 | 599 << 14).to_bytes(4, "little")
+    assert image_dimensions(webp(b"VP8L", lossless)) == (800, 600)
+    extended = bytes(4) + (4095).to_bytes(3, "little") + (2047).to_bytes(3, "little")
+    assert image_dimensions(webp(b"VP8X", extended)) == (4096, 2048)
+    assert image_dimensions(b"RIFF" + bytes(4) + b"WEBP") is None
+
+
+def test_downsize():
+    image_module = pytest.importorskip("PIL.Image")
+    encoded = io.BytesIO()
+    image_module.new("RGB", (400, 300)).save(encoded, format="JPEG")
+    image = io.BytesIO(encoded.getvalue())
+    assert downsize(image, 200_000, "image/jpg") is None
+    assert image.tell() == 0
+    # image/jpg is a common alias of image/jpeg
+    resized = downsize(image, 30_000, "image/jpg")
+    with image_module.open(io.BytesIO(resized)) as decoded:
+        assert decoded.format == "JPEG"
+        assert decoded.size[0] * decoded.size[1] <= 30_000
+    with pytest.raises(ValueError):
+        downsize(image, 30_000, "image/tiff")
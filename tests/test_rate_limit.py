@@ -0,0 +1,64 @@
+import time
+import pytest
+from botocore.exceptions import ClientError
+from bedrock_snippet.services.rate_limit import RateLimiter, TokenBucket
+
+
+def throttling_error() -> ClientError:
+    return ClientError(
+        {
+            "Error": {"Code": "ThrottlingException", "Message": "Too many requests"},
+            "ResponseMetadata": {"HTTPStatusCode": 429},
+        },
+        "InvokeModel",
+    )
+
+
+class FlakyOperation:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise throttling_error()
+        return {"body": kwargs.get("body")}
+
+
+def test_throttled_call_is_retried_and_backs_off():
+    limiter = RateLimiter(initial_concurrency=8, base_delay=0.001)
+    operation = FlakyOperation(failures=2)
+    response = limiter.call("model", operation, modelId="model", body="{}")
+    metrics = limiter.metrics()["model"]
+    assert response == {"body": "{}"} and operation.calls == 3
+    assert metrics["throttles"] == 2 and metrics["retries"] == 2
+    assert metrics["concurrency"] < 8
+
+
+def test_gives_up_after_max_attempts():
+    limiter = RateLimiter(max_attempts=2, base_delay=0.001)
+    with pytest.raises(ClientError):
+        limiter.call("model", FlakyOperation(failures=5), modelId="model", body="{}")
+
+
+def test_only_successful_calls_raise_concurrency():
+    limiter = RateLimiter(initial_concurrency=4)
+
+    def failing(**kwargs):
+        raise ConnectionError("connection reset")
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            limiter.call("model", failing, modelId="model", body="{}")
+    assert limiter.metrics()["model"]["concurrency"] == 4
+    limiter.call("model", FlakyOperation(failures=0), modelId="model", body="{}")
+    assert limiter.metrics()["model"]["concurrency"] > 4
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate_per_minute=600, capacity=1)  # 10 per second
+    bucket.acquire()
+    start = time.perf_counter()
+    bucket.acquire()
+    assert time.perf_counter() - start >= 0.08
@@ -0,0 +1,83 @@
+import time
+import boto3
+from botocore.stub import Stubber
+from bedrock_snippet.services.prompt_management import PromptManagementService
+from bedrock_snippet.services.resolution import (
+    ResolutionCache,
+    resolution_key,
+    warm_resolution_cache,
+)
+from tests.stubs import serve
+
+session = boto3.Session(
+    aws_access_key_id="dummy-access-key",
+    aws_secret_access_key="dummy-secret-key",
+    region_name="us-east-1",
+)
+prompt_summary = {
+    "name": "test-prompt",
+    "id": "ABCDE12345",
+    "arn": "arn:aws:bedrock:us-east-1:123456789012:prompt/ABCDE12345",
+    "version": "DRAFT",
+    "createdAt": "2025-01-01T00:00:00Z",
+    "updatedAt": "2025-01-01T00:00:00Z",
+}
+
+
+def test_cache_expires_and_evicts():
+    cache = ResolutionCache(ttl=0.05, max_size=2)
+    cache.put(("a", "r", "s", "1"), {"id": "1"})
+    cache.put(("a", "r", "s", "2"), {"id": "2"})
+    assert cache.get(("a", "r", "s", "1")) == {"id": "1"}
+    cache.put(("a", "r", "s", "3"), {"id": "3"})
+    assert cache.get(("a", "r", "s", "2")) is None  # least recently used
+    time.sleep(0.1)
+    assert cache.get(("a", "r", "s", "1")) is None  # expired
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+
+def test_lookup_is_listed_once_and_invalidated_on_delete():
+    cache = ResolutionCache()
+    service = PromptManagementService("test-prompt", session, resolution_cache=cache)
+    with Stubber(service._client) as stubber:
+        stubber.add_response("list_prompts", {"promptSummaries": [prompt_summary]})
+        for _ in range(2):
+            stubber.add_response(
+                "get_prompt",
+                {**prompt_summary, "version": "DRAFT"},
+                {"promptIdentifier": "ABCDE12345"},
+            )
+        service.get_prompt()
+        service.get_prompt()
+        stubber.add_response(
+            "delete_prompt", {"id": "ABCDE12345"}, {"promptIdentifier": "ABCDE12345"}
+        )
+        service.delete_prompt()
+        stubber.assert_no_pending_responses()
+    assert cache.get(resolution_key(session, "bedrock-agent", "test-prompt")) is None
+    assert cache.hits == 4 and cache.misses == 2
+
+
+def test_warm_cache_within_max_size():
+    summaries = [{**prompt_summary, "name": f"prompt-{i}"} for i in range(50)]
+
+    def handler(operation_name, params):
+        start = int(params.get("nextToken", 0))
+        page = {"promptSummaries": summaries[start : start + 10]}
+        if start + 10 < len(summaries):
+            page["nextToken"] = str(start + 10)
+        return page
+
+    client = serve(session.client("bedrock-agent"), handler)
+    cache = ResolutionCache(max_size=64)
+    assert warm_resolution_cache(session, client, cache) == 50
+    assert cache.get(resolution_key(session, "bedrock-agent", "prompt-49"))
+    assert cache.stats()["size"] == 50
+
+    # a smaller cache is warmed up to its size, which stays fixed
+    cache = ResolutionCache(max_size=8)
+    assert warm_resolution_cache(session, client, cache) == 8
+    assert cache.get(resolution_key(session, "bedrock-agent", "prompt-0"))
+    assert cache.get(resolution_key(session, "bedrock-agent", "prompt-8")) is None
+    cache.put(resolution_key(session, "bedrock-agent", "other"), prompt_summary)
+    assert cache.stats()["size"] == 8
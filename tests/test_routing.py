@@ -0,0 +1,150 @@
+import time
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from bedrock_snippet.services import (
+    ClientPool,
+    Instrumentation,
+    InvocationRouter,
+    PromptInvocationService,
+    RateLimiter,
+    TokenAccountant,
+)
+from tests.stubs import (
+    serve,
+    prompt_info,
+    model_response,
+    stream_response,
+)
+
+session = boto3.Session(
+    aws_access_key_id="dummy-routing-access-key",
+    aws_secret_access_key="dummy-secret-key",
+    region_name="us-east-1",
+)
+calls = []
+throttled_models = {"model-a"}
+
+
+def error(code: str, status: int) -> ClientError:
+    return ClientError(
+        {
+            "Error": {"Code": code, "Message": code},
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        },
+        "InvokeModel",
+    )
+
+
+def handle_runtime(operation_name, params):
+    calls.append(params["modelId"])
+    if params["modelId"] in throttled_models:
+        raise error("ThrottlingException", 429)
+    if params["modelId"] == "invalid-model":
+        raise error("ValidationException", 400)
+    if operation_name == "InvokeModelWithResponseStream":
+        return stream_response(params["modelId"])
+    return model_response(params["modelId"])
+
+
+serve(session, handle_runtime, "bedrock-runtime")
+
+
+def routed_service(targets, service_kwargs=None, **kwargs) -> PromptInvocationService:
+    client_pool = ClientPool()
+    router = InvocationRouter(session, targets, client_pool=client_pool, **kwargs)
+    service = PromptInvocationService.from_definition(
+        "test-prompt",
+        session,
+        prompt_info("test-prompt"),
+        router=router,
+        **(service_kwargs or {}),
+    )
+    return service, router, client_pool
+
+
+def test_failover_and_recovery():
+    calls.clear()
+    service, router, client_pool = routed_service(
+        [("us-east-1", "model-a"), ("us-west-2", "model-b")], cooldown=0.05
+    )
+    assert len(client_pool) == 2  # one runtime client per region
+    assert service.invoke_rendered({"name": "a"}, True) == "model-b"
+    assert calls == ["model-a", "model-b"]
+    [target_a, target_b] = router.stats()
+    assert not target_a["healthy"] and target_a["failures"] == 1
+    assert target_b["healthy"] and target_b["latency"] > 0
+
+    # the throttled target is skipped while cooling down
+    assert service.invoke_rendered({"name": "b"}, True) == "model-b"
+    assert calls[2:] == ["model-b"]
+
+    # once recovered, the target is probed again and its latency measured
+    throttled_models.clear()
+    time.sleep(0.06)
+    assert service.invoke_rendered({"name": "c"}, True) == "model-a"
+    [target_a, target_b] = router.stats()
+    assert target_a["healthy"] and target_a["latency"] > 0
+    # from then on, the faster target is used
+    fastest = "model-a" if target_a["latency"] <= target_b["latency"] else "model-b"
+    assert service.invoke_rendered({"name": "d"}, True) == fastest
+
+
+def test_non_retryable_error_is_raised():
+    calls.clear()
+    service, router, _ = routed_service(
+        [("us-east-1", "invalid-model"), ("us-west-2", "model-b")]
+    )
+    with pytest.raises(ClientError):
+        service.invoke_rendered({"name": "a"})
+    assert calls == ["invalid-model"]
+    assert router.stats()[0]["failures"] == 0
+
+
+def test_rate_limited_routing():
+    class QueueingRateLimiter(RateLimiter):
+        def call(self, model_id, operation, estimated_tokens=0, **kwargs):
+            time.sleep(0.1)  # waiting for budget
+            return super().call(model_id, operation, estimated_tokens, **kwargs)
+
+    calls.clear()
+    throttled_models.add("model-a")
+    limiter = QueueingRateLimiter(max_attempts=5, base_delay=1.0)
+    service, router, _ = routed_service(
+        [("us-east-1", "model-a"), ("us-west-2", "model-b")],
+        {"rate_limiter": limiter},
+    )
+    try:
+        assert service.invoke_rendered({"name": "a"}, True) == "model-b"
+    finally:
+        throttled_models.clear()
+    # the throttle fails over right away instead of being retried by the limiter
+    assert calls == ["model-a", "model-b"]
+    metrics = limiter.metrics()
+    assert metrics["model-a"]["throttles"] == 1 and metrics["model-a"]["retries"] == 0
+    assert metrics["model-b"]["calls"] == 1
+    # time queued in the limiter isn't part of the target's latency
+    assert router.stats()[1]["latency"] < 0.1
+
+
+def test_usage_is_recorded_under_the_serving_target():
+    calls.clear()
+    throttled_models.add("model-a")
+    instrumentation = Instrumentation()
+    accountant = TokenAccountant()
+    service, router, _ = routed_service(
+        [("us-east-1", "model-a"), ("us-west-2", "model-b")],
+        {"instrumentation": instrumentation, "token_accountant": accountant},
+    )
+    try:
+        service.invoke_rendered({"name": "a"})
+        service.stream_multimodal(b"\x89PNG\r\n\x1a\n" + bytes(64)).text()
+    finally:
+        throttled_models.clear()
+    assert calls == ["model-a", "model-b", "model-b"]
+    assert [row["model_id"] for row in accountant.summary()] == ["model-b"]
+    assert list(instrumentation.stats()["tokens"]) == ["model-b"]
+    # the router's clients are instrumented too (stubbed errors skip botocore's hooks)
+    operations = instrumentation.stats()["operations"]
+    assert operations["bedrock-runtime.InvokeModel"]["calls"] == 1
+    assert operations["bedrock-runtime.InvokeModelWithResponseStream"]["calls"] == 1
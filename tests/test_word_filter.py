@@ -0,0 +1,33 @@
+from bedrock_snippet.services import WordFilter, GuardrailWordFilter
+
+
+def test_word_boundaries_and_case():
+    words = WordFilter(["ass", "Secret Project", "c++", "he"])
+    assert words.find("A class of its own") is None
+    assert words.find("the SECRET project is late") == "secret project"
+    assert words.find("written in C++11") == "c++"
+    assert words.find_all("he said: ASS!") == ["he", "ass"]
+    assert len(words) == 4
+
+
+def test_overlapping_words():
+    words = WordFilter(["she", "he", "hers", "her"])
+    assert words.find_all("ushers") == []
+    assert words.find_all("she hers") == ["she", "hers"]
+
+
+def test_guardrail_word_filter():
+    guardrail_info = {
+        "guardrailId": "abcdefgh1234",
+        "guardrailArn": "arn:aws:bedrock:us-east-1:123456789012:guardrail/abcdefgh1234",
+        "version": "DRAFT",
+        "blockedInputMessaging": "Sorry, I can't answer that.",
+        "wordPolicy": {"words": [{"text": "confidential"}]},
+    }
+    word_filter = GuardrailWordFilter.from_guardrail(guardrail_info)
+    assert word_filter.applies_to("abcdefgh1234", "DRAFT")
+    assert not word_filter.applies_to("abcdefgh1234", 1)
+    assert word_filter.check(["hello", "world"]) is None
+    blocked = word_filter.check(["this is Confidential"])
+    assert blocked["content"][0]["text"] == "Sorry, I can't answer that."
+    assert blocked["amazon-bedrock-guardrailAction"] == "INTERVENED"